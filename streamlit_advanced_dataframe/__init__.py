@@ -14,13 +14,42 @@ Usage:
 
 import json
 import os
-from typing import Any, Hashable, Literal
+from typing import Any, Callable, Literal
 
 import pandas as pd
 import streamlit as st
 import streamlit.components.v1 as components
 
-__all__ = ["advanced_dataframe"]
+from ._cache import CacheInfo, dataframe_fingerprint, payload_cache
+from ._delta import delta_payload
+from ._payload import (
+    SUMMARY_AGGREGATES,
+    build_grouped_payload,
+    build_lazy_payload,
+    build_payload,
+    build_sort_ranks,
+    build_sub_rows_payload,
+    build_window_payload,
+    compute_summary,
+    hierarchy_depth,
+    payload_nbytes,
+)
+from ._metadata import dataframe_metadata
+from ._query import query_positions
+from ._selection import (
+    SELECTION_FORMATS,
+    selection_labels,
+    selection_mask,
+    selection_ranges_from_value,
+)
+
+__all__ = [
+    "CacheInfo",
+    "advanced_dataframe",
+    "clear_payload_cache",
+    "payload_cache_info",
+    "selection_mask",
+]
 
 # Create a _RELEASE constant. We'll set this to False while we're developing
 # the component, and True when we're ready to package and distribute it.
@@ -39,44 +68,171 @@ else:
         "advanced_dataframe", path=build_dir
     )
 
+# Session state key prefix of the last DataFrame sent with delta_updates
+_DELTA_STATE_PREFIX = "_sadf_delta_"
+
+
+def _cached_payload(
+    cache_key: tuple[Any, ...],
+    build: Callable[[], dict[str, Any]],
+    data: pd.DataFrame,
+) -> dict[str, Any]:
+    """
+    Return a payload from the payload cache, building it on a miss.
+
+    Parameters
+    ----------
+    cache_key : tuple
+        Cache key whose first element is the DataFrame fingerprint. The
+        payload is not cached when the fingerprint is None.
+    build : Callable[[], dict[str, Any]]
+        Function building the payload.
+    data : pd.DataFrame
+        DataFrame the payload is built from.
+
+    Returns
+    -------
+    dict[str, Any]
+        Payload (component arguments derived from the data).
+    """
+    if cache_key[0] is None:
+        return build()
+
+    payload = payload_cache.get(cache_key)
+    if payload is None:
+        payload = build()
+        payload_cache.put(cache_key, payload, payload_nbytes(payload, data))
+    return payload
+
 
-def _check_max_depth(
-    data: list[dict[Hashable, Any]],
-    sub_rows_key: str,
-    current_depth: int = 1,
+def _requested_window_offset(
+    component_value: Any,
+    row_count: int,
+    window_size: int,
 ) -> int:
     """
-    Recursively check the maximum depth of hierarchical data.
+    Read the window offset requested by the frontend.
 
     Parameters
     ----------
-    data : list[dict]
-        Data to check (records format).
-    sub_rows_key : str
-        Key name for sub-row data.
-    current_depth : int, optional
-        Current depth (internal use). Default is 1.
+    component_value : Any
+        Previous component value (from ``st.session_state``).
+    row_count : int
+        Total number of rows.
+    window_size : int
+        Number of rows per window.
 
     Returns
     -------
     int
-        Maximum depth.
+        Offset of the first row of the window, clamped to the data.
+    """
+    offset = 0
+    if isinstance(component_value, dict):
+        window = component_value.get("window") or {}
+        offset = int(window.get("offset", 0))
+    return max(0, min(offset, row_count - window_size))
+
+
+def _requested_query(
+    component_value: Any,
+) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+    """
+    Read the sorting and column filters requested by the frontend.
+
+    Parameters
+    ----------
+    component_value : Any
+        Previous component value (from ``st.session_state``).
+
+    Returns
+    -------
+    tuple[list[dict], list[dict]]
+        TanStack Table sorting state and column filters.
+    """
+    if not isinstance(component_value, dict):
+        return [], []
+    return (
+        list(component_value.get("sorting") or []),
+        list(component_value.get("filters") or []),
+    )
+
+
+def _requested_sub_rows(component_value: Any) -> list[int] | None:
+    """
+    Read the row whose sub-rows were requested by the frontend.
+
+    Parameters
+    ----------
+    component_value : Any
+        Previous component value (from ``st.session_state``).
+
+    Returns
+    -------
+    list[int] or None
+        Path of the expanded row (top-level row position, then the
+        sub-row position at each level), or None if nothing was requested.
+    """
+    if not isinstance(component_value, dict):
+        return None
+    expand = component_value.get("expand") or {}
+    path = expand.get("path")
+    if not isinstance(path, list):
+        return None
+    return [int(position) for position in path]
+
+
+def _selection_from_value(component_value: Any) -> list[int]:
+    """
+    Extract the selected row indices from the component value.
+
+    Parameters
+    ----------
+    component_value : Any
+        Value returned by the component: a dict with a ``"selection"``
+        list (or a plain list from older frontends).
+
+    Returns
+    -------
+    list[int]
+        Selected row indices.
+    """
+    if isinstance(component_value, dict):
+        return list(component_value.get("selection", []))
+    if isinstance(component_value, list):
+        return component_value
+    return []
+
+
+def payload_cache_info() -> CacheInfo:
     """
-    max_depth = current_depth
+    Return statistics of the process-wide payload cache.
 
-    for row in data:
-        if sub_rows_key in row and isinstance(row[sub_rows_key], list):
-            sub_rows = row[sub_rows_key]
-            if sub_rows:
-                # Recursively check sub-row depth
-                sub_depth = _check_max_depth(
-                    sub_rows,
-                    sub_rows_key,
-                    current_depth + 1,
-                )
-                max_depth = max(max_depth, sub_depth)
+    Serialized table payloads are cached across reruns, keyed by a
+    fingerprint of the DataFrame contents, so reruns with an unchanged
+    DataFrame (e.g. triggered by row selection) skip re-serialization.
 
-    return max_depth
+    Returns
+    -------
+    CacheInfo
+        Named tuple with ``hits``, ``misses``, ``maxsize`` (maximum number
+        of entries), ``currsize`` (current number of entries) and
+        ``nbytes`` (current total size in bytes).
+
+    Examples
+    --------
+    >>> from streamlit_advanced_dataframe import payload_cache_info
+    >>> info = payload_cache_info()
+    >>> st.write(f"hit rate: {info.hits / max(1, info.hits + info.misses):.0%}")
+    """
+    return payload_cache.info()
+
+
+def clear_payload_cache() -> None:
+    """
+    Clear the process-wide payload cache and reset its hit/miss counters.
+    """
+    payload_cache.clear()
 
 
 def advanced_dataframe(
@@ -85,16 +241,23 @@ def advanced_dataframe(
     height: int = 600,
     use_container_width: bool = False,
     selection_mode: Literal["single-row", "multi-row"] | None = None,
+    selection_format: Literal["indices", "ranges", "labels"] = "indices",
     filterable_columns: list[str] | None = None,
     show_row_count: bool = False,
     column_order: list[str] | None = None,
     header_groups: list[dict[str, Any]] | None = None,
     expandable: bool = False,
     sub_rows_key: str = "subRows",
+    lazy_sub_rows: bool = False,
+    group_by: list[str] | None = None,
     show_summary: bool = True,
     column_config: dict[str, dict[str, Any]] | None = None,
+    window_size: int | None = None,
+    delta_updates: bool = False,
+    use_worker: bool = False,
+    precompute_sort: bool = False,
     key: str | None = None,
-) -> list[int]:
+) -> list[int] | list[tuple[int, int]] | pd.Index:
     """
     Advanced DataFrame Component
 
@@ -117,6 +280,15 @@ def advanced_dataframe(
         Row selection mode. Default is None (row selection disabled).
         - "single-row": Single row selection (only one row can be selected)
         - "multi-row": Multiple row selection (multiple rows can be selected)
+    selection_format : {"indices", "ranges", "labels"}, optional
+        Format of the returned selection. Default is "indices".
+        - "indices": list of selected row positions, in selection order
+        - "ranges": sorted list of half-open ``(start, stop)`` ranges of
+          row positions; the frontend sends the selection as ranges, so
+          large contiguous selections stay small on the websocket
+        - "labels": index labels of the selected rows (``pd.Index``),
+          resolved from the ranges in Python
+        Use `selection_mask` to turn indices or ranges into a boolean mask.
     filterable_columns : list[str] or None, optional
         List of column names to enable filtering. Default is None.
         Specified columns will display a filter icon enabling filtering.
@@ -144,10 +316,30 @@ def advanced_dataframe(
         Key name for sub-row data. Default is "subRows".
         Include a list of sub-row dicts under this key in each row
         for hierarchical display.
+    lazy_sub_rows : bool, optional
+        Whether to load sub-rows on demand. Default is False.
+        When True, only the top-level rows are sent, each with its number
+        of sub-rows; the sub-rows of a row are sent from Python when the
+        row is expanded, and the browser keeps a bounded cache of the
+        loaded sub-rows. Sorting, filters and search apply to the rows
+        loaded so far. Requires `expandable=True` and `key`.
+    group_by : list[str] or None, optional
+        Columns to group a flat DataFrame by, outermost level first.
+        Default is None (no grouping).
+        When set, the table is displayed as hierarchical data (as with
+        `expandable=True`) without building nested sub-row lists: each
+        group is a parent row holding its group keys and aggregated
+        values, and the DataFrame rows are the sub-rows of the innermost
+        groups. Numeric columns are summed by default; set the "aggregate"
+        option of `column_config` to "mean", "min", "max", "count",
+        "distinct" or "none" to change it. Not supported with
+        `selection_mode` or `lazy_sub_rows`.
     show_summary : bool, optional
         Whether to display the summary row. Default is True.
         When True, a fixed summary row appears at the bottom of the table.
-        Numeric columns show sum, Boolean columns show True percentage (%).
+        Numeric columns show sum, Boolean columns show True percentage (%),
+        unless another aggregate is set with the "aggregate" option of
+        `column_config`.
         For hierarchical data, only parent rows are included in calculations.
     column_config : dict[str, dict[str, Any]] or None, optional
         Per-column display configuration. Default is None.
@@ -155,6 +347,48 @@ def advanced_dataframe(
         - "prefix": String to display before cell value (e.g., "$", "¥")
         - "suffix": String to display after cell value (e.g., "%", " USD")
         Not applied to Boolean columns (remains True/False display).
+        - "aggregate": Summary row aggregate, one of "sum", "mean", "min",
+          "max" (numeric, datetime and Boolean columns), "count" (non-missing
+          values), "distinct" (distinct values) or "none" (blank).
+    window_size : int or None, optional
+        Number of rows sent to the frontend at a time. Default is None
+        (all rows are sent).
+        When set, only the total row count and a window of `window_size`
+        rows around the viewport are sent; the frontend requests the next
+        window while scrolling, which reruns the script. Requires `key`.
+        Not supported with `expandable`. Sorting and column filters are
+        applied in Python with pandas, as is the summary row (over all
+        filtered rows); global search only covers the loaded window.
+    delta_updates : bool, optional
+        Whether to send only the rows changed since the previous rerun.
+        Default is False.
+        When True, the DataFrame is diffed by index label against the one
+        sent for the same `key` in the previous rerun (kept in the session
+        state), and only inserted/updated rows plus the new row order are
+        sent. The frontend patches its rows in place, keeping sorting,
+        filters and the row selection (selected rows follow their index
+        label). A full payload is sent on the first run, when the columns,
+        dtypes or index uniqueness change, or when more than half of the
+        rows changed. Requires `key`. Not supported with `expandable` or
+        `window_size`.
+    use_worker : bool, optional
+        Whether to compute filtering, sorting and global search in a Web
+        Worker. Default is False.
+        When True, the browser keeps a copy of the data in a background
+        thread, which returns the filtered/sorted row order and search
+        matches as row indices; the page only renders the visible rows, so
+        typing a search or filter does not block scrolling on large
+        tables. Not supported with `expandable` or `window_size`.
+    precompute_sort : bool, optional
+        Whether to precompute the sort order of text columns in Python.
+        Default is False.
+        When True, the rank of each row is computed with pandas for every
+        column that is not numeric, Boolean, datetime or timedelta, and sent
+        along with the data; the frontend then sorts these columns by
+        comparing integer ranks instead of collating strings. Strings are
+        ranked case-insensitively by code point, as in windowed mode, which
+        may differ slightly from the locale-aware order of the browser.
+        Not supported with `expandable`, `window_size` or `delta_updates`.
     key : str or None, optional
         Unique key for the Streamlit component.
 
@@ -166,10 +400,10 @@ def advanced_dataframe(
 
     Returns
     -------
-    list[int]
-        List of selected row indices (0-based).
-        Returns empty list [] when selection_mode is None or no rows
-        are selected.
+    list[int] or list[tuple[int, int]] or pd.Index
+        Selected rows in the format given by `selection_format`; by
+        default a list of selected row indices (0-based).
+        Empty when selection_mode is None or no rows are selected.
 
     Examples
     --------
@@ -244,15 +478,202 @@ def advanced_dataframe(
     ...     key="prefix_suffix_table"
     ... )
     """
-    # Convert DataFrame to JSON format (React-friendly format)
-    # to_json → json.loads converts NaN/NaT to null (NaN is invalid in JSON)
-    data_json: list[dict[Hashable, Any]] = json.loads(
-        data.to_json(orient="records", default_handler=str)
-    )
+    if selection_format not in SELECTION_FORMATS:
+        raise ValueError(
+            f"Invalid selection_format {selection_format!r}; expected one of "
+            f"{', '.join(SELECTION_FORMATS)}."
+        )
+    if group_by is not None:
+        missing = [col for col in group_by if col not in data.columns]
+        if not group_by:
+            raise ValueError("group_by must contain at least one column.")
+        if missing:
+            raise ValueError(f"group_by columns not found: {missing}.")
+        if selection_mode is not None:
+            raise ValueError("selection_mode is not supported with group_by.")
+        if lazy_sub_rows:
+            raise ValueError("lazy_sub_rows is not supported with group_by.")
+        # Groups are displayed as hierarchical data
+        expandable = True
+    if lazy_sub_rows:
+        if not expandable:
+            raise ValueError("lazy_sub_rows requires expandable=True.")
+        if key is None:
+            raise ValueError("lazy_sub_rows requires a key.")
+    if window_size is not None:
+        if key is None:
+            raise ValueError("window_size requires a key.")
+        if expandable:
+            raise ValueError("window_size is not supported with expandable=True.")
+        if window_size < 1:
+            raise ValueError("window_size must be a positive integer.")
+    if use_worker:
+        if expandable:
+            raise ValueError("use_worker is not supported with expandable=True.")
+        if window_size is not None:
+            raise ValueError("use_worker is not supported with window_size.")
+    if precompute_sort:
+        if expandable:
+            raise ValueError("precompute_sort is not supported with expandable=True.")
+        if window_size is not None:
+            raise ValueError("precompute_sort is not supported with window_size.")
+        if delta_updates:
+            raise ValueError(
+                "precompute_sort is not supported with delta_updates=True."
+            )
+    for col, config in (column_config or {}).items():
+        aggregate = config.get("aggregate")
+        if aggregate is not None and aggregate not in SUMMARY_AGGREGATES:
+            raise ValueError(
+                f"Invalid aggregate {aggregate!r} for column {col!r}; expected "
+                f"one of {', '.join(SUMMARY_AGGREGATES)}."
+            )
+    if delta_updates:
+        if key is None:
+            raise ValueError("delta_updates requires a key.")
+        if expandable:
+            raise ValueError("delta_updates is not supported with expandable=True.")
+        if window_size is not None:
+            raise ValueError("delta_updates is not supported with window_size.")
+
+    # Reuse the serialized payload when the DataFrame is unchanged
+    # (e.g. reruns triggered by row selection)
+    data_key = dataframe_fingerprint(data)
+    column_meta: dict[str, dict[str, Any]] = _cached_payload(
+        (data_key, "meta", sub_rows_key if expandable else None),
+        lambda: {
+            "meta": dataframe_metadata(
+                data, exclude=sub_rows_key if expandable else None
+            )
+        },
+        data,
+    )["meta"]
+
+    if window_size is None:
+        delta = None
+        if delta_updates and data_key is not None:
+            # Diff against the DataFrame sent in the previous rerun; a full
+            # payload is sent when the frontend requested a resync
+            delta_state_key = _DELTA_STATE_PREFIX + key
+            delta_state = st.session_state.get(delta_state_key)
+            component_state = st.session_state.get(key)
+            resync = (
+                component_state.get("resync")
+                if isinstance(component_state, dict)
+                else None
+            )
+            delta = delta_payload(delta_state, data, data_key, resync)
+            if delta_state is None or delta_state["token"] != data_key:
+                # Copy so that in-place changes to data do not alter the base
+                delta_state = {"frame": data.copy(), "token": data_key}
+            st.session_state[delta_state_key] = {**delta_state, "resync": resync}
+
+        if lazy_sub_rows:
+            # Top-level rows only; the sub-rows of the row expanded last are
+            # added (the frontend caches the sub-rows it has received)
+            payload = _cached_payload(
+                (data_key, "lazy", sub_rows_key),
+                lambda: build_lazy_payload(data, sub_rows_key),
+                data,
+            )
+            path = _requested_sub_rows(st.session_state.get(key))
+            if path is not None:
+                payload = {
+                    **payload,
+                    **_cached_payload(
+                        (data_key, "sub_rows", sub_rows_key, tuple(path)),
+                        lambda: build_sub_rows_payload(data, sub_rows_key, path),
+                        data,
+                    ),
+                }
+        elif group_by is not None:
+            aggregates = {
+                str(col): config["aggregate"]
+                for col, config in (column_config or {}).items()
+                if "aggregate" in config
+            }
+            payload = _cached_payload(
+                (
+                    data_key,
+                    "group_by",
+                    tuple(group_by),
+                    json.dumps(aggregates, sort_keys=True),
+                ),
+                lambda: build_grouped_payload(data, group_by, aggregates),
+                data,
+            )
+        else:
+            payload = delta or _cached_payload(
+                (data_key, expandable, sub_rows_key),
+                lambda: build_payload(
+                    data, expandable=expandable, sub_rows_key=sub_rows_key
+                ),
+                data,
+            )
+        if precompute_sort:
+            payload = {
+                **payload,
+                **_cached_payload(
+                    (data_key, "sort_ranks"),
+                    lambda: build_sort_ranks(data),
+                    data,
+                ),
+            }
+    else:
+        # Sorting, filters and window requested by the frontend in the
+        # previous component value are applied here
+        component_state = st.session_state.get(key)
+        filter_types = {
+            str(col): column_meta[str(col)]["filterType"]
+            for col in data.columns
+            if filterable_columns and col in filterable_columns
+        }
+        sorting, filters = _requested_query(component_state)
+        filters_key = json.dumps(filters, sort_keys=True, default=str)
+        query_key = json.dumps([sorting, filters], sort_keys=True, default=str)
+        positions = _cached_payload(
+            (data_key, "query", query_key),
+            lambda: {
+                "positions": query_positions(data, sorting, filters, filter_types)
+            },
+            data,
+        )["positions"]
+        row_count = len(data) if positions is None else len(positions)
+
+        offset = _requested_window_offset(component_state, row_count, window_size)
+        payload = _cached_payload(
+            (data_key, "window", query_key, offset, window_size),
+            lambda: build_window_payload(data, positions, offset, window_size),
+            data,
+        )
+        if show_summary:
+            # Summary of the filtered rows (independent of sorting)
+            aggregates = {
+                str(col): config["aggregate"]
+                for col, config in (column_config or {}).items()
+                if "aggregate" in config
+            }
+            aggregates_key = json.dumps(aggregates, sort_keys=True)
+            payload = {
+                **payload,
+                **_cached_payload(
+                    (data_key, "summary", filters_key, aggregates_key),
+                    lambda: {
+                        "summary": compute_summary(
+                            data if positions is None else data.iloc[positions],
+                            aggregates,
+                        )
+                    },
+                    data,
+                ),
+            }
+        if data_key is not None:
+            data_key = f"{data_key}:{query_key}:{offset}:{window_size}"
 
-    # Check maximum depth when expandable is enabled
-    if expandable:
-        max_depth = _check_max_depth(data_json, sub_rows_key)
+    # Check maximum depth when expandable is enabled (the depth is unknown
+    # until expanded when sub-rows are loaded lazily)
+    if expandable and not lazy_sub_rows:
+        max_depth = hierarchy_depth(payload["data"]["parents"])
         if max_depth > 5:
             st.warning(
                 f"⚠️ **Hierarchy depth is {max_depth} levels.**  \n"
@@ -274,13 +695,15 @@ def advanced_dataframe(
             "header": col,
             "enableSorting": True,
             "enableResizing": True,
+            # Column metadata computed from the dtypes
+            "meta": column_meta[str(col)],
         }
 
         # Add filterConfig for columns with filtering enabled
         if filterable_columns and col in filterable_columns:
             col_config["filterConfig"] = {
                 "enabled": True,
-                # type is omitted (auto-detected on frontend)
+                # type is omitted (auto-detected from meta["filterType"])
             }
 
         # Merge prefix/suffix from column_config
@@ -290,27 +713,34 @@ def advanced_dataframe(
                 col_config["prefix"] = config["prefix"]
             if "suffix" in config:
                 col_config["suffix"] = config["suffix"]
+            if "aggregate" in config:
+                col_config["aggregate"] = config["aggregate"]
 
         columns_json.append(col_config)
 
     # Call the component
     component_value = _component_func(
-        data=data_json,
+        **payload,
+        data_key=data_key,
         columns=columns_json,
         height=height,
         use_container_width=use_container_width,
         selection_mode=selection_mode,
+        selection_ranges=selection_format != "indices",
         show_row_count=show_row_count,
         column_order=column_order,
         header_groups=header_groups,
         expandable=expandable,
-        sub_rows_key=sub_rows_key,
         show_summary=show_summary,
+        window_size=window_size,
+        use_worker=use_worker,
         key=key,
-        default=[],
+        default={"selection": []},
     )
 
-    # Always return list[int]
-    if component_value is None:
-        return []
-    return component_value
+    if selection_format == "indices":
+        return _selection_from_value(component_value)
+    ranges = selection_ranges_from_value(component_value)
+    if selection_format == "labels":
+        return selection_labels(data, ranges)
+    return ranges
@@ -0,0 +1,214 @@
+"""
+Process-wide LRU cache for serialized component payloads.
+
+Every Streamlit rerun (including reruns triggered by the component's own
+selection events) calls ``advanced_dataframe()`` again. When the DataFrame
+has not changed, the serialized payload from the previous run is reused
+instead of being rebuilt.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, NamedTuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+# Default bounds of the process-wide payload cache
+_DEFAULT_MAXSIZE = 32
+_DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+class CacheInfo(NamedTuple):
+    """Payload cache statistics returned by ``payload_cache_info()``."""
+
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+    nbytes: int
+
+
+class PayloadCache:
+    """
+    Size-bounded LRU cache.
+
+    Entries are evicted in least-recently-used order when either the
+    number of entries exceeds ``maxsize`` or their total size exceeds
+    ``max_bytes``.
+
+    Parameters
+    ----------
+    maxsize : int
+        Maximum number of entries.
+    max_bytes : int
+        Maximum total size of the cached entries in bytes.
+    """
+
+    def __init__(self, maxsize: int, max_bytes: int) -> None:
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[Hashable, tuple[Any, int]] = OrderedDict()
+        self._nbytes = 0
+        self._hits = 0
+        self._misses = 0
+        # Streamlit runs sessions in separate threads
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Any | None:
+        """
+        Return the cached value for ``key`` (None on a miss).
+
+        Parameters
+        ----------
+        key : Hashable
+            Cache key.
+
+        Returns
+        -------
+        Any or None
+            Cached value, or None if not cached.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, value: Any, nbytes: int) -> None:
+        """
+        Store a value, evicting least-recently-used entries if needed.
+
+        Values larger than ``max_bytes`` are not cached.
+
+        Parameters
+        ----------
+        key : Hashable
+            Cache key.
+        value : Any
+            Value to cache.
+        nbytes : int
+            Size of the value in bytes.
+        """
+        if nbytes > self.max_bytes:
+            return
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._nbytes -= previous[1]
+
+            self._entries[key] = (value, nbytes)
+            self._nbytes += nbytes
+
+            while self._entries and (
+                len(self._entries) > self.maxsize or self._nbytes > self.max_bytes
+            ):
+                _, (_, evicted_nbytes) = self._entries.popitem(last=False)
+                self._nbytes -= evicted_nbytes
+
+    def clear(self) -> None:
+        """Remove all entries and reset the hit/miss counters."""
+        with self._lock:
+            self._entries.clear()
+            self._nbytes = 0
+            self._hits = 0
+            self._misses = 0
+
+    def info(self) -> CacheInfo:
+        """
+        Return cache statistics.
+
+        Returns
+        -------
+        CacheInfo
+            Hits, misses, bounds and current usage.
+        """
+        with self._lock:
+            return CacheInfo(
+                hits=self._hits,
+                misses=self._misses,
+                maxsize=self.maxsize,
+                currsize=len(self._entries),
+                nbytes=self._nbytes,
+            )
+
+
+def _update_with_arrow(digest: Any, array: pa.Array | pa.ChunkedArray) -> None:
+    """
+    Feed the physical buffers of an Arrow array into a hash digest.
+
+    Parameters
+    ----------
+    digest : hashlib hash object
+        Digest to update.
+    array : pa.Array or pa.ChunkedArray
+        Array to hash.
+    """
+    chunks = array.chunks if isinstance(array, pa.ChunkedArray) else [array]
+    for chunk in chunks:
+        digest.update(f"{chunk.type}|{chunk.offset}|{len(chunk)}".encode())
+        for buffer in chunk.buffers():
+            if buffer is not None:
+                digest.update(buffer)
+        if isinstance(chunk, pa.DictionaryArray):
+            _update_with_arrow(digest, chunk.dictionary)
+
+
+def dataframe_fingerprint(data: pd.DataFrame) -> str | None:
+    """
+    Compute a cheap content fingerprint of a DataFrame.
+
+    Numeric columns are hashed from their raw memory, other columns from
+    their Arrow buffers (falling back to ``pd.util.hash_pandas_object``).
+    Column names, dtypes and the shape are part of the fingerprint; the
+    index is not.
+
+    Parameters
+    ----------
+    data : pd.DataFrame
+        DataFrame to fingerprint.
+
+    Returns
+    -------
+    str or None
+        Hex digest, or None if the DataFrame contains unhashable values
+        (e.g. nested sub-row lists).
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(
+        repr(
+            (
+                data.shape,
+                [str(col) for col in data.columns],
+                [str(dtype) for dtype in data.dtypes],
+            )
+        ).encode()
+    )
+
+    for i in range(data.shape[1]):
+        series = data.iloc[:, i]
+        if isinstance(series.dtype, np.dtype) and series.dtype.kind in "biufcmM":
+            digest.update(np.ascontiguousarray(series.to_numpy()).view(np.uint8))
+            continue
+        try:
+            _update_with_arrow(digest, pa.array(series, from_pandas=True))
+            continue
+        except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+            pass
+        try:
+            hashed = pd.util.hash_pandas_object(series, index=False)
+        except TypeError:
+            return None
+        digest.update(hashed.to_numpy().view(np.uint8))
+
+    return digest.hexdigest()
+
+
+# Cache shared by all sessions of this Streamlit process
+payload_cache = PayloadCache(maxsize=_DEFAULT_MAXSIZE, max_bytes=_DEFAULT_MAX_BYTES)
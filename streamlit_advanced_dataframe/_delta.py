@@ -0,0 +1,189 @@
+"""
+Delta updates for keyed tables that are re-rendered with changing data.
+
+The last DataFrame sent for a key is kept in the session. On the next
+rerun the new DataFrame is diffed against it by index label, and only the
+inserted/updated rows are serialized. The new row order is described as
+runs copied either from the previous rows or from the changed rows.
+"""
+
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from ._payload import dataframe_to_arrow
+
+# Run sources in the "ops" list of a delta payload
+_FROM_PREVIOUS = 0
+_FROM_CHANGED = 1
+
+# Above this ratio of changed rows a full payload is sent instead
+_DELTA_MAX_RATIO = 0.5
+
+
+def _unchanged_rows(
+    previous: pd.DataFrame, data: pd.DataFrame, origins: np.ndarray
+) -> np.ndarray | None:
+    """
+    Flag the rows of ``data`` equal to their previous row.
+
+    Parameters
+    ----------
+    previous : pd.DataFrame
+        Previously sent DataFrame.
+    data : pd.DataFrame
+        New DataFrame (same columns and dtypes).
+    origins : np.ndarray
+        Previous position of each new row (-1 for inserted rows).
+
+    Returns
+    -------
+    np.ndarray or None
+        Boolean array over the rows of ``data``, or None if some values
+        cannot be compared.
+    """
+    unchanged = origins >= 0
+    new_positions = np.flatnonzero(unchanged)
+    old_positions = origins[unchanged]
+
+    for i in range(data.shape[1]):
+        before = previous.iloc[old_positions, i].reset_index(drop=True)
+        after = data.iloc[new_positions, i].reset_index(drop=True)
+        try:
+            same = before.eq(after) | (before.isna() & after.isna())
+            same_values = same.to_numpy(dtype=bool, na_value=False)
+        except (TypeError, ValueError):
+            # e.g. categoricals with different categories, list values
+            return None
+        unchanged[new_positions[~same_values]] = False
+
+    return unchanged
+
+
+def diff_frames(
+    previous: pd.DataFrame, data: pd.DataFrame
+) -> dict[str, Any] | None:
+    """
+    Diff two DataFrames by index label.
+
+    Parameters
+    ----------
+    previous : pd.DataFrame
+        Previously sent DataFrame.
+    data : pd.DataFrame
+        New DataFrame.
+
+    Returns
+    -------
+    dict or None
+        ``"ops"`` (``[source, start, length]`` runs building the new rows
+        in order: source 0 copies previous rows from ``start``, source 1
+        takes changed rows from ``start``), ``"origins"`` (previous
+        position of each changed row, -1 for inserted rows) and ``"rows"``
+        (Arrow IPC stream of the changed rows). None if the frames cannot
+        be diffed (different columns or dtypes, duplicate index labels) or
+        too many rows changed.
+    """
+    if [str(col) for col in previous.columns] != [str(col) for col in data.columns]:
+        return None
+    if [str(dtype) for dtype in previous.dtypes] != [
+        str(dtype) for dtype in data.dtypes
+    ]:
+        return None
+    if not previous.index.is_unique or not data.index.is_unique:
+        return None
+
+    origins = previous.index.get_indexer(data.index)
+    unchanged = _unchanged_rows(previous, data, origins)
+    if unchanged is None:
+        return None
+
+    changed = ~unchanged
+    row_count = len(data)
+    if changed.sum() > row_count * _DELTA_MAX_RATIO:
+        return None
+
+    # A new run starts where the source changes, or where copied rows are
+    # not consecutive in the previous frame
+    run_starts = np.ones(row_count, dtype=bool)
+    if row_count > 1:
+        same_source = unchanged[1:] == unchanged[:-1]
+        consecutive = ~unchanged[1:] | (origins[1:] == origins[:-1] + 1)
+        run_starts[1:] = ~(same_source & consecutive)
+
+    starts = np.flatnonzero(run_starts)
+    ends = np.append(starts[1:], row_count)
+    ops: list[list[int]] = []
+    changed_offset = 0
+    for start, end in zip(starts, ends):
+        length = int(end - start)
+        if unchanged[start]:
+            ops.append([_FROM_PREVIOUS, int(origins[start]), length])
+        else:
+            ops.append([_FROM_CHANGED, changed_offset, length])
+            changed_offset += length
+
+    return {
+        "ops": ops,
+        "origins": origins[changed].tolist(),
+        "rows": dataframe_to_arrow(data.iloc[changed]),
+    }
+
+
+def delta_payload(
+    state: dict[str, Any] | None,
+    data: pd.DataFrame,
+    data_key: str,
+    resync: Any,
+) -> dict[str, Any] | None:
+    """
+    Build the component arguments of a delta update.
+
+    Parameters
+    ----------
+    state : dict or None
+        Delta state stored for the key by the previous run (``"frame"``,
+        ``"token"`` and ``"resync"``), or None on the first run.
+    data : pd.DataFrame
+        New DataFrame.
+    data_key : str
+        Fingerprint of ``data``.
+    resync : Any
+        Resync request from the component value. The frontend changes it
+        when it does not hold the rows a delta is based on.
+
+    Returns
+    -------
+    dict or None
+        ``"data_delta"`` (``"base"`` fingerprint of the previous frame,
+        ``"ops"`` and ``"origins"``) and ``"data_delta_rows"`` (Arrow IPC
+        stream of the changed rows, passed as a top-level argument so
+        Streamlit sends it as binary). None if a full payload has to be
+        sent.
+    """
+    if state is None or state["token"] is None or state["resync"] != resync:
+        return None
+
+    if state["token"] == data_key:
+        # Unchanged data: the frontend already holds these rows
+        return {
+            "data_delta": {
+                "base": data_key,
+                "ops": [[_FROM_PREVIOUS, 0, len(data)]],
+                "origins": [],
+            },
+            "data_delta_rows": None,
+        }
+
+    diff = diff_frames(state["frame"], data)
+    if diff is None:
+        return None
+    return {
+        "data_delta": {
+            "base": state["token"],
+            "ops": diff["ops"],
+            "origins": diff["origins"],
+        },
+        "data_delta_rows": diff["rows"],
+    }
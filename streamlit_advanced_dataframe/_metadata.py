@@ -0,0 +1,178 @@
+"""
+Per-column metadata computed from pandas dtypes.
+
+The frontend uses the metadata to decide cell alignment, boolean
+rendering, filter UI types and select-filter options, instead of scanning
+every row of every column in the browser.
+"""
+
+from typing import Any
+
+import pandas as pd
+
+from ._query import cell_text, filter_type
+
+# Columns with at most this many distinct values ship their values
+# (select-filter options; text filters show them as choices up to 10)
+_DISTINCT_VALUES_LIMIT = 10
+
+# pd.api.types.infer_dtype result → logical type
+_LOGICAL_TYPES = {
+    "boolean": "boolean",
+    "integer": "number",
+    "floating": "number",
+    "mixed-integer-float": "number",
+    "timedelta64": "number",
+    "timedelta": "number",
+    "datetime64": "datetime",
+    "datetime": "datetime",
+    "date": "datetime",
+    "string": "string",
+    "decimal": "string",
+    "empty": "empty",
+}
+
+
+def _logical_type(series: pd.Series) -> str:
+    """
+    Infer the logical type of a column as seen by the frontend.
+
+    Timedeltas are sent as milliseconds, hence "number"; decimals are sent
+    as strings.
+
+    Parameters
+    ----------
+    series : pd.Series
+        Column to inspect.
+
+    Returns
+    -------
+    str
+        One of "number", "boolean", "datetime", "string", "empty"
+        (all values missing) or "other" (mixed or nested values).
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        if series.isna().all():
+            return "empty"
+        inferred = pd.api.types.infer_dtype(series.dtype.categories, skipna=True)
+    else:
+        inferred = pd.api.types.infer_dtype(series, skipna=True)
+    return _LOGICAL_TYPES.get(inferred, "other")
+
+
+def _to_json_scalar(value: Any, logical_type: str) -> Any:
+    """
+    Convert a min/max value to a JSON scalar matching the cell values.
+
+    Parameters
+    ----------
+    value : Any
+        Scalar returned by ``min()``/``max()``.
+    logical_type : str
+        Logical type of the column.
+
+    Returns
+    -------
+    Any
+        Epoch milliseconds for datetimes, milliseconds for timedeltas,
+        a Python number otherwise.
+    """
+    if isinstance(value, pd.Timedelta):
+        return value // pd.Timedelta(milliseconds=1)
+    if logical_type == "datetime":
+        return pd.Timestamp(value).value // 1_000_000
+    return value.item() if hasattr(value, "item") else value
+
+
+def column_metadata(series: pd.Series) -> dict[str, Any]:
+    """
+    Compute the metadata of one column with vectorized pandas operations.
+
+    Parameters
+    ----------
+    series : pd.Series
+        Column to describe.
+
+    Returns
+    -------
+    dict[str, Any]
+        ``"type"`` (logical type), ``"filterType"`` (auto-detected filter
+        UI type), ``"nullable"`` (whether the column has missing values),
+        ``"cardinality"`` (number of distinct values, None if the values
+        are unhashable), ``"min"``/``"max"`` (number and datetime columns),
+        ``"values"`` (sorted distinct cell texts, for text and select
+        filter columns with at most 10 distinct values) and, for
+        ``datetime64`` columns, ``"dtype"``, ``"timezone"`` (None if naive)
+        and ``"dateOnly"`` (whether every value is at midnight).
+    """
+    logical_type = _logical_type(series)
+    meta: dict[str, Any] = {
+        "type": logical_type,
+        "filterType": filter_type(series),
+        "nullable": bool(series.isna().any()),
+    }
+
+    try:
+        meta["cardinality"] = int(series.nunique(dropna=True))
+    except TypeError:
+        # Unhashable values (e.g. lists)
+        meta["cardinality"] = None
+
+    values = series.dropna()
+    if logical_type in ("number", "datetime") and not values.empty:
+        try:
+            meta["min"] = _to_json_scalar(values.min(), logical_type)
+            meta["max"] = _to_json_scalar(values.max(), logical_type)
+        except TypeError:
+            # Values that cannot be compared (e.g. mixed timezones)
+            pass
+
+    if pd.api.types.is_datetime64_any_dtype(series):
+        # Sent as epoch milliseconds; the frontend formats the visible cells
+        # in this timezone
+        meta["dtype"] = str(series.dtype)
+        tz = series.dt.tz
+        meta["timezone"] = None if tz is None else str(tz)
+        meta["dateOnly"] = bool((values == values.dt.normalize()).all())
+    elif (
+        logical_type == "datetime"
+        and pd.api.types.infer_dtype(values, skipna=True) == "date"
+    ):
+        # datetime.date objects are sent as naive midnight timestamps
+        meta["timezone"] = None
+        meta["dateOnly"] = True
+
+    if (
+        meta["filterType"] in ("text", "select")
+        and meta["cardinality"] is not None
+        and meta["cardinality"] <= _DISTINCT_VALUES_LIMIT
+    ):
+        texts = cell_text(values)
+        meta["values"] = sorted(texts[texts != ""].unique().tolist())
+
+    return meta
+
+
+def dataframe_metadata(
+    data: pd.DataFrame, exclude: str | None = None
+) -> dict[str, dict[str, Any]]:
+    """
+    Compute the metadata of every column of a DataFrame.
+
+    Parameters
+    ----------
+    data : pd.DataFrame
+        DataFrame to describe.
+    exclude : str or None, optional
+        Column to skip (the sub-row column of hierarchical data).
+
+    Returns
+    -------
+    dict[str, dict[str, Any]]
+        Metadata per column id (column name converted to a string).
+    """
+    return {
+        str(col): column_metadata(data.iloc[:, i])
+        for i, col in enumerate(data.columns)
+        if col != exclude
+    }
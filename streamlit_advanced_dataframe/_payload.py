@@ -0,0 +1,761 @@
+"""
+Payload serialization for the advanced_dataframe component.
+
+Flat DataFrames are sent to the frontend as an Apache Arrow IPC stream
+(passed to Streamlit as bytes), so column names are written once and
+values travel as typed buffers instead of per-row JSON objects.
+Hierarchical data is sent as JSON in the same columnar layout: one array
+per column over all rows (sub-rows included), plus the parent of each row.
+"""
+
+import json
+import math
+from collections import deque
+from typing import Any, Hashable
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from ._query import sort_ranks
+
+# String columns are dictionary-encoded when they have at least this many
+# rows and at most this ratio of distinct values to rows
+_DICTIONARY_MIN_ROWS = 16
+_DICTIONARY_MAX_RATIO = 0.5
+
+# Aggregate functions accepted for the summary row in column_config
+SUMMARY_AGGREGATES = ("sum", "mean", "min", "max", "count", "distinct", "none")
+
+
+def _stringify(series: pd.Series) -> pa.Array:
+    """
+    Convert a column to an Arrow string array, keeping nulls.
+
+    Mirrors ``to_json(default_handler=str)`` for values Arrow (or the
+    frontend) cannot represent natively.
+
+    Parameters
+    ----------
+    series : pd.Series
+        Column to convert.
+
+    Returns
+    -------
+    pa.Array
+        String array with null for missing values.
+    """
+    values = [None if _is_missing(value) else str(value) for value in series]
+    return pa.array(values, type=pa.string())
+
+
+def _is_missing(value: object) -> bool:
+    """
+    Return True if a scalar cell value should be sent as null.
+
+    Parameters
+    ----------
+    value : object
+        Cell value.
+
+    Returns
+    -------
+    bool
+        Whether the value is None/NaN/NaT.
+    """
+    try:
+        return bool(pd.isna(value))
+    except (TypeError, ValueError):
+        # list-like values (pd.isna returns an array)
+        return False
+
+
+def _dictionary_encode_repeated(array: pa.Array) -> pa.Array:
+    """
+    Dictionary-encode a string array whose values repeat enough.
+
+    Low-cardinality columns (status, category, ...) are sent as a
+    dictionary plus integer codes, which the frontend filters and sorts
+    by code.
+
+    Parameters
+    ----------
+    array : pa.Array
+        String array.
+
+    Returns
+    -------
+    pa.Array
+        Dictionary array, or ``array`` unchanged when the column is short
+        or mostly distinct.
+    """
+    if len(array) < _DICTIONARY_MIN_ROWS:
+        return array
+    encoded = array.dictionary_encode()
+    if len(encoded.dictionary) > len(array) * _DICTIONARY_MAX_RATIO:
+        return array
+    return encoded
+
+
+def _to_arrow_array(series: pd.Series) -> pa.Array:
+    """
+    Convert a column to an Arrow array the frontend can decode.
+
+    Values are kept compatible with the former JSON records payload:
+    datetimes and dates become epoch milliseconds, timedeltas become
+    milliseconds, and unsupported types fall back to strings.
+
+    Parameters
+    ----------
+    series : pd.Series
+        Column to convert.
+
+    Returns
+    -------
+    pa.Array
+        Arrow array for the column.
+    """
+    try:
+        array = pa.array(series, from_pandas=True)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+        return _stringify(series)
+
+    array_type = array.type
+
+    if pa.types.is_dictionary(array_type):
+        # Arrow JS (v11) cannot read large_string dictionaries
+        if pa.types.is_large_string(array_type.value_type):
+            array = array.cast(pa.dictionary(array_type.index_type, pa.string()))
+        return array
+    if pa.types.is_large_string(array_type):
+        return _dictionary_encode_repeated(array.cast(pa.string()))
+    if pa.types.is_string(array_type):
+        return _dictionary_encode_repeated(array)
+    if pa.types.is_timestamp(array_type):
+        return array.cast(pa.timestamp("ms", tz=array_type.tz), safe=False)
+    if pa.types.is_date(array_type):
+        return array.cast(pa.timestamp("ms"))
+    if pa.types.is_duration(array_type):
+        return array.cast(pa.duration("ms"), safe=False).cast(pa.int64())
+    if (
+        pa.types.is_null(array_type)
+        or pa.types.is_boolean(array_type)
+        or pa.types.is_integer(array_type)
+        or pa.types.is_floating(array_type)
+        or pa.types.is_string(array_type)
+    ):
+        return array
+
+    # decimal, time, binary, nested types, etc.
+    return _stringify(series)
+
+
+def dataframe_to_arrow(data: pd.DataFrame) -> bytes:
+    """
+    Serialize a DataFrame into an Arrow IPC stream.
+
+    The index is not included. Column names are converted to strings,
+    matching the keys produced by ``to_json(orient="records")``.
+
+    Parameters
+    ----------
+    data : pd.DataFrame
+        DataFrame to serialize.
+
+    Returns
+    -------
+    bytes
+        Arrow IPC stream (schema + one record batch).
+    """
+    arrays = [_to_arrow_array(data.iloc[:, i]) for i in range(data.shape[1])]
+    names = [str(col) for col in data.columns]
+    table = pa.Table.from_arrays(arrays, names=names)
+
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def flatten_hierarchy(
+    records: list[dict[Hashable, Any]],
+    columns: list[str],
+    sub_rows_key: str,
+) -> dict[str, Any]:
+    """
+    Flatten nested records into columnar arrays.
+
+    Rows are numbered breadth-first, so the top-level rows come first and
+    their positions match the DataFrame rows.
+
+    Parameters
+    ----------
+    records : list[dict]
+        Top-level records with nested sub-row lists.
+    columns : list[str]
+        Column names to extract.
+    sub_rows_key : str
+        Key name for sub-row data.
+
+    Returns
+    -------
+    dict[str, Any]
+        ``"row_count"`` (number of rows including sub-rows), ``"columns"``
+        (list of values per column) and ``"parents"`` (position of the
+        parent row, -1 for top-level rows).
+    """
+    values: dict[str, list[Any]] = {col: [] for col in columns}
+    parents: list[int] = []
+
+    queue = deque((record, -1) for record in records)
+    while queue:
+        record, parent = queue.popleft()
+        position = len(parents)
+        parents.append(parent)
+        for col in columns:
+            values[col].append(record.get(col))
+
+        sub_rows = record.get(sub_rows_key)
+        if isinstance(sub_rows, list):
+            queue.extend((row, position) for row in sub_rows if isinstance(row, dict))
+
+    return {"row_count": len(parents), "columns": values, "parents": parents}
+
+
+def hierarchy_depth(parents: list[int]) -> int:
+    """
+    Return the maximum depth of flattened hierarchical data.
+
+    Parameters
+    ----------
+    parents : list[int]
+        Parent positions returned by ``flatten_hierarchy`` (parents always
+        precede their sub-rows).
+
+    Returns
+    -------
+    int
+        Maximum depth (1 for data without sub-rows).
+    """
+    depths: list[int] = []
+    for parent in parents:
+        depths.append(1 if parent < 0 else depths[parent] + 1)
+    return max(depths, default=1)
+
+
+def build_payload(
+    data: pd.DataFrame, *, expandable: bool, sub_rows_key: str = "subRows"
+) -> dict[str, Any]:
+    """
+    Build the data-dependent component arguments.
+
+    Parameters
+    ----------
+    data : pd.DataFrame
+        DataFrame to display.
+    expandable : bool
+        Whether the data contains nested sub-rows.
+    sub_rows_key : str, optional
+        Key name for sub-row data. Default is "subRows".
+
+    Returns
+    -------
+    dict[str, Any]
+        Component arguments derived from the data. ``"data"`` holds an
+        Arrow IPC stream for flat data, or the columnar JSON returned by
+        ``flatten_hierarchy`` for hierarchical data (nested sub-rows).
+    """
+    if expandable:
+        # to_json → json.loads converts NaN/NaT to null (NaN is invalid in JSON)
+        records: list[dict[Hashable, Any]] = json.loads(
+            data.to_json(orient="records", default_handler=str)
+        )
+        columns = [str(col) for col in data.columns if col != sub_rows_key]
+        return {"data": flatten_hierarchy(records, columns, sub_rows_key)}
+
+    return {"data": dataframe_to_arrow(data)}
+
+
+def _sub_row_records(value: Any) -> list[dict[Hashable, Any]]:
+    """
+    Return the sub-row dicts of a row (other values are ignored, as in
+    ``flatten_hierarchy``).
+    """
+    if not isinstance(value, list):
+        return []
+    return [row for row in value if isinstance(row, dict)]
+
+
+def _columnar_records(
+    records: list[dict[Hashable, Any]], columns: list[str], sub_rows_key: str
+) -> dict[str, Any]:
+    """
+    Convert one level of records to columnar JSON with the sub-row count
+    of each row.
+
+    Parameters
+    ----------
+    records : list[dict]
+        Rows of one level of the hierarchy.
+    columns : list[str]
+        Column names to extract.
+    sub_rows_key : str
+        Key name for sub-row data.
+
+    Returns
+    -------
+    dict[str, Any]
+        ``flatten_hierarchy`` output for the records without their sub-rows,
+        plus ``"child_counts"`` (number of sub-rows of each row).
+    """
+    # to_json → json.loads converts NaN/NaT to null, like build_payload
+    frame = pd.DataFrame.from_records(records, columns=columns)
+    level = json.loads(frame.to_json(orient="records", default_handler=str))
+    payload = flatten_hierarchy(level, columns, sub_rows_key)
+    payload["child_counts"] = [
+        len(_sub_row_records(record.get(sub_rows_key))) for record in records
+    ]
+    return payload
+
+
+def build_lazy_payload(data: pd.DataFrame, sub_rows_key: str) -> dict[str, Any]:
+    """
+    Build the component arguments for hierarchical data with lazily loaded
+    sub-rows: only the top-level rows are sent.
+
+    Parameters
+    ----------
+    data : pd.DataFrame
+        DataFrame whose ``sub_rows_key`` column holds nested sub-row lists.
+    sub_rows_key : str
+        Key name for sub-row data.
+
+    Returns
+    -------
+    dict[str, Any]
+        ``"data"``: columnar JSON of the top-level rows with the number of
+        sub-rows of each row (``"child_counts"``).
+    """
+    columns = [str(col) for col in data.columns if col != sub_rows_key]
+    records: list[dict[Hashable, Any]] = json.loads(
+        data.drop(columns=[sub_rows_key], errors="ignore").to_json(
+            orient="records", default_handler=str
+        )
+    )
+    payload = flatten_hierarchy(records, columns, sub_rows_key)
+    if sub_rows_key in data.columns:
+        payload["child_counts"] = [
+            len(_sub_row_records(value)) for value in data[sub_rows_key]
+        ]
+    else:
+        payload["child_counts"] = [0] * len(records)
+    return {"data": payload}
+
+
+def build_sub_rows_payload(
+    data: pd.DataFrame, sub_rows_key: str, path: list[int]
+) -> dict[str, Any]:
+    """
+    Build the sub-rows of one row for lazily loaded hierarchical data.
+
+    Parameters
+    ----------
+    data : pd.DataFrame
+        DataFrame whose ``sub_rows_key`` column holds nested sub-row lists.
+    sub_rows_key : str
+        Key name for sub-row data.
+    path : list[int]
+        Position of the row: its top-level row position, followed by its
+        position among the sub-rows at each level.
+
+    Returns
+    -------
+    dict[str, Any]
+        ``"sub_rows"``: ``{"path": path, "data": ...}`` where ``"data"`` is
+        the columnar JSON of the sub-rows with their own sub-row counts
+        (no sub-rows if the path does not exist).
+    """
+    columns = [str(col) for col in data.columns if col != sub_rows_key]
+    records: list[dict[Hashable, Any]] = []
+    if path and sub_rows_key in data.columns and 0 <= path[0] < len(data):
+        records = _sub_row_records(data[sub_rows_key].iloc[path[0]])
+        for position in path[1:]:
+            if not 0 <= position < len(records):
+                records = []
+                break
+            records = _sub_row_records(records[position].get(sub_rows_key))
+    return {
+        "sub_rows": {
+            "path": path,
+            "data": _columnar_records(records, columns, sub_rows_key),
+        }
+    }
+
+
+# pandas aggregation for the group rows of group_by, per aggregate function
+_GROUP_AGGREGATES = {
+    "sum": "sum",
+    "mean": "mean",
+    "min": "min",
+    "max": "max",
+    "count": "count",
+    "distinct": "nunique",
+}
+
+
+def _group_aggregate(series: pd.Series, aggregate: str | None) -> str | None:
+    """
+    Return the pandas aggregation for a column of the group rows, or None
+    if the group rows leave the column blank.
+
+    Numeric columns are summed by default; other aggregates are applied
+    to the column types they support (as in the summary row).
+    """
+    is_bool = pd.api.types.is_bool_dtype(series)
+    is_numeric = not is_bool and (
+        pd.api.types.is_numeric_dtype(series)
+        or pd.api.types.is_timedelta64_dtype(series)
+    )
+    if aggregate is None:
+        aggregate = "sum" if is_numeric else None
+
+    if aggregate in ("sum", "mean"):
+        return _GROUP_AGGREGATES[aggregate] if is_numeric or is_bool else None
+    if aggregate in ("min", "max"):
+        is_ordered = is_numeric or pd.api.types.is_datetime64_any_dtype(series)
+        return _GROUP_AGGREGATES[aggregate] if is_ordered else None
+    return _GROUP_AGGREGATES.get(aggregate or "")
+
+
+def build_grouped_payload(
+    data: pd.DataFrame,
+    group_by: list[Hashable],
+    aggregates: dict[str, str] | None = None,
+) -> dict[str, Any]:
+    """
+    Build hierarchical data from a flat DataFrame grouped by columns.
+
+    Each level of ``group_by`` is one ``groupby`` pass: its groups become
+    rows holding the group keys and the aggregated values of the other
+    columns, and the DataFrame rows are the sub-rows of the last level.
+    Rows are numbered level by level (all first-level groups, then all
+    second-level groups, ..., then the DataFrame rows), so parents always
+    precede their sub-rows, as in ``flatten_hierarchy``.
+
+    Parameters
+    ----------
+    data : pd.DataFrame
+        Flat DataFrame to group.
+    group_by : list
+        Columns to group by, outermost level first.
+    aggregates : dict[str, str] or None, optional
+        Aggregate function per column id for the group rows ("sum",
+        "mean", "min", "max", "count", "distinct" or "none"). By default
+        numeric columns are summed and other columns are left blank.
+
+    Returns
+    -------
+    dict[str, Any]
+        ``"data"``: columnar JSON of the group rows and the DataFrame rows,
+        in the format returned by ``flatten_hierarchy``.
+    """
+    aggregates = aggregates or {}
+    value_columns = [col for col in data.columns if col not in group_by]
+    functions: dict[Hashable, str] = {}
+    for col in value_columns:
+        function = _group_aggregate(data[col], aggregates.get(str(col)))
+        if function is not None:
+            functions[col] = function
+
+    frames: list[pd.DataFrame] = []
+    parents: list[np.ndarray] = []
+    # Group of each DataFrame row at the previous level, and the position
+    # of the first row of that level
+    previous_codes = np.full(len(data), -1, dtype=np.int64)
+    previous_offset = 0
+    offset = 0
+    for depth in range(1, len(group_by) + 1):
+        grouped = data.groupby(
+            group_by[:depth], sort=True, dropna=False, observed=True
+        )
+        codes = grouped.ngroup().to_numpy()
+        keys = grouped.size().index.to_frame(index=False)
+        if functions:
+            values = grouped.agg(functions).reset_index(drop=True)
+            keys = pd.concat([keys, values], axis=1)
+        frames.append(keys)
+
+        # The parent of a group is the group of the previous level that
+        # contains its rows
+        level_parents = np.full(len(keys), -1, dtype=np.int64)
+        if depth > 1:
+            level_parents[codes] = previous_codes + previous_offset
+        parents.append(level_parents)
+        previous_codes, previous_offset = codes, offset
+        offset += len(keys)
+
+    # The DataFrame rows are the sub-rows of the last level
+    frames.append(data.reset_index(drop=True))
+    parents.append(
+        previous_codes + previous_offset
+        if group_by
+        else np.full(len(data), -1, dtype=np.int64)
+    )
+
+    # Each level is serialized on its own so that the aggregated values do
+    # not change the dtype of the DataFrame rows; to_json → json.loads
+    # converts NaN/NaT to null, like build_payload
+    values: dict[str, list[Any]] = {str(col): [] for col in data.columns}
+    for frame in frames:
+        split = json.loads(
+            frame.reindex(columns=data.columns).to_json(
+                orient="split", index=False, default_handler=str
+            )
+        )
+        for col, column_values in zip(values.values(), zip(*split["data"])):
+            col.extend(column_values)
+
+    return {
+        "data": {
+            "row_count": sum(len(frame) for frame in frames),
+            "columns": values,
+            "parents": np.concatenate(parents).tolist(),
+        }
+    }
+
+
+def build_sort_ranks(data: pd.DataFrame) -> dict[str, Any]:
+    """
+    Precompute the sort ranks of the columns the frontend compares as text.
+
+    Numeric, Boolean, datetime and timedelta columns are held in typed
+    arrays by the frontend and compared directly, so only the other
+    columns are ranked.
+
+    Parameters
+    ----------
+    data : pd.DataFrame
+        DataFrame to display (flat data).
+
+    Returns
+    -------
+    dict[str, Any]
+        ``"sort_ranks"``: Arrow IPC stream with one int32 column of ranks
+        per ranked column (-1 for missing values).
+    """
+    arrays: list[pa.Array] = []
+    names: list[str] = []
+    for i, col in enumerate(data.columns):
+        series = data.iloc[:, i]
+        if (
+            pd.api.types.is_numeric_dtype(series)
+            or pd.api.types.is_bool_dtype(series)
+            or pd.api.types.is_datetime64_any_dtype(series)
+            or pd.api.types.is_timedelta64_dtype(series)
+        ):
+            continue
+        arrays.append(pa.array(sort_ranks(series), type=pa.int32()))
+        names.append(str(col))
+
+    table = pa.Table.from_arrays(arrays, names=names)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return {"sort_ranks": sink.getvalue().to_pybytes()}
+
+
+def payload_nbytes(payload: dict[str, Any], data: pd.DataFrame) -> int:
+    """
+    Estimate the memory size of a payload for the cache size bound.
+
+    Parameters
+    ----------
+    payload : dict[str, Any]
+        Payload returned by ``build_payload`` (or by the other ``build_*``
+        functions).
+    data : pd.DataFrame
+        DataFrame the payload was built from (used to estimate the size
+        of hierarchical JSON data).
+
+    Returns
+    -------
+    int
+        Estimated size in bytes.
+    """
+    nbytes = 0
+    for value in payload.values():
+        if isinstance(value, bytes):
+            nbytes += len(value)
+        elif isinstance(value, np.ndarray):
+            nbytes += value.nbytes
+        elif isinstance(value, dict) and "parents" in value:
+            # Columnar JSON of hierarchical data
+            nbytes += int(data.memory_usage(index=False, deep=True).sum())
+        elif isinstance(value, dict) and "path" in value:
+            # Columnar JSON of lazily loaded sub-rows
+            nbytes += len(json.dumps(value["data"], default=str))
+    return nbytes
+
+
+def build_window_payload(
+    data: pd.DataFrame,
+    positions: np.ndarray | None,
+    offset: int,
+    size: int,
+) -> dict[str, Any]:
+    """
+    Build the data-dependent component arguments for one row window.
+
+    Parameters
+    ----------
+    data : pd.DataFrame
+        Full DataFrame.
+    positions : np.ndarray or None
+        Row positions of the sorted/filtered view in display order, or
+        None to display the rows of ``data`` as they are.
+    offset : int
+        Position of the first row of the window in the view.
+    size : int
+        Number of rows in the window.
+
+    Returns
+    -------
+    dict[str, Any]
+        ``"data"`` (Arrow IPC stream of the window), ``"row_count"``
+        (number of rows in the view), ``"total_row_count"`` (number of
+        rows in ``data``), ``"row_offset"`` (window position) and, for
+        sorted/filtered views, ``"row_positions"`` (position of each
+        window row in ``data``).
+    """
+    if positions is None:
+        return {
+            "data": dataframe_to_arrow(data.iloc[offset : offset + size]),
+            "row_count": len(data),
+            "total_row_count": len(data),
+            "row_offset": offset,
+        }
+
+    window_positions = positions[offset : offset + size]
+    return {
+        "data": dataframe_to_arrow(data.iloc[window_positions]),
+        "row_count": len(positions),
+        "total_row_count": len(data),
+        "row_offset": offset,
+        "row_positions": window_positions.tolist(),
+    }
+
+
+def _true_percentage(values: pd.Series) -> str:
+    """
+    Format the percentage of True values, rounded like ``Math.round``.
+
+    Parameters
+    ----------
+    values : pd.Series
+        Boolean values without missing values.
+
+    Returns
+    -------
+    str
+        Percentage such as ``"67%"``.
+    """
+    percentage = values.astype(bool).mean() * 100
+    return f"{math.floor(percentage + 0.5)}%"
+
+
+def _aggregate(values: pd.Series, aggregate: str | None) -> Any:
+    """
+    Aggregate the non-missing values of one column for the summary row.
+
+    Parameters
+    ----------
+    values : pd.Series
+        Column values without missing values (not empty).
+    aggregate : str or None
+        Aggregate function from ``column_config`` ("sum", "mean", "min",
+        "max", "count", "distinct" or "none"), or None for the default
+        (sum of numeric columns, True percentage of boolean columns).
+
+    Returns
+    -------
+    Any
+        Summary value, or "" when the aggregate does not apply.
+    """
+    is_bool = pd.api.types.is_bool_dtype(values) or (
+        values.dtype == object and values.map(type).eq(bool).all()
+    )
+    if aggregate is None:
+        if is_bool:
+            return _true_percentage(values)
+        aggregate = "sum"
+
+    if aggregate == "count":
+        return len(values)
+    if aggregate == "distinct":
+        try:
+            return int(values.nunique())
+        except TypeError:
+            # Unhashable values (e.g. lists)
+            return int(values.astype(str).nunique())
+
+    if is_bool:
+        numbers = values.astype(bool).astype(int)
+    elif pd.api.types.is_datetime64_any_dtype(values):
+        # Epoch milliseconds, like the values sent to the frontend
+        if aggregate not in ("min", "max"):
+            return ""
+        if values.dt.tz is not None:
+            # tz-aware values are sent as UTC epoch milliseconds
+            values = values.dt.tz_convert("UTC").dt.tz_localize(None)
+        numbers = values.astype("datetime64[ms]").astype("int64")
+    elif pd.api.types.is_timedelta64_dtype(values):
+        numbers = values / pd.Timedelta(milliseconds=1)
+    elif pd.api.types.is_numeric_dtype(values):
+        numbers = values
+    else:
+        return ""
+
+    if aggregate == "sum":
+        return numbers.sum().item()
+    if aggregate == "mean":
+        return numbers.mean().item()
+    if aggregate == "min":
+        return numbers.min().item()
+    if aggregate == "max":
+        return numbers.max().item()
+    return ""
+
+
+def compute_summary(
+    data: pd.DataFrame, aggregates: dict[str, str] | None = None
+) -> dict[str, Any]:
+    """
+    Compute the summary row over all rows of a DataFrame.
+
+    Same rules as the summary row computed by the frontend: numeric
+    columns show the sum, boolean columns the True percentage, other
+    columns are left blank, unless an aggregate function is configured
+    for the column.
+
+    Parameters
+    ----------
+    data : pd.DataFrame
+        DataFrame to summarize.
+    aggregates : dict[str, str] or None, optional
+        Aggregate function per column id (see ``_aggregate``).
+
+    Returns
+    -------
+    dict[str, Any]
+        Summary value per column name.
+    """
+    aggregates = aggregates or {}
+    summary: dict[str, Any] = {}
+    for i, col in enumerate(data.columns):
+        aggregate = aggregates.get(str(col))
+        values = data.iloc[:, i].dropna()
+        if values.empty or aggregate == "none":
+            summary[str(col)] = ""
+        else:
+            summary[str(col)] = _aggregate(values, aggregate)
+    return summary
@@ -0,0 +1,296 @@
+"""
+Server-side sorting and filtering for the windowed data mode.
+
+In windowed mode the browser only holds one window of rows, so the sort
+state and column filter values are sent back in the component value and
+applied here with vectorized pandas operations. The result is an array of
+row positions into the original DataFrame, from which windows are sliced.
+"""
+
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+# Same pattern as the date detection of the frontend (useColumnType)
+_ISO_DATE_PATTERN = r"^\d{4}-\d{2}-\d{2}(T\d{2}:\d{2}:\d{2})?"
+
+# Maximum number of distinct values for the "select" filter type
+_SELECT_MAX_UNIQUE = 5
+
+
+def filter_type(series: pd.Series) -> str:
+    """
+    Detect the filter type of a column.
+
+    Follows the auto-detection of the frontend (``useColumnType``), except
+    that datetime columns are detected as "date" rather than "number"
+    (the frontend only sees their epoch milliseconds).
+
+    Parameters
+    ----------
+    series : pd.Series
+        Column to inspect.
+
+    Returns
+    -------
+    str
+        One of "text", "number", "select" or "date".
+    """
+    values = series.dropna()
+    if values.dtype == object or pd.api.types.is_string_dtype(values):
+        values = values[values.astype(str) != ""]
+    if values.empty:
+        return "text"
+
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return "date"
+    if values.dtype == object and pd.api.types.infer_dtype(values) in (
+        "datetime",
+        "date",
+    ):
+        return "date"
+    if pd.api.types.is_timedelta64_dtype(values):
+        # Sent to the frontend as milliseconds
+        return "number"
+    if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(
+        values
+    ):
+        return "number"
+    if pd.api.types.is_string_dtype(values):
+        strings = values.astype(str)
+        if strings.str.match(_ISO_DATE_PATTERN).all():
+            return "date"
+    if values.astype(str).nunique() <= _SELECT_MAX_UNIQUE:
+        return "select"
+    return "text"
+
+
+def _column_positions(data: pd.DataFrame) -> dict[str, int]:
+    """
+    Map column ids (column names converted to strings) to positions.
+
+    Parameters
+    ----------
+    data : pd.DataFrame
+        DataFrame whose columns are mapped.
+
+    Returns
+    -------
+    dict[str, int]
+        Column position per column id.
+    """
+    return {str(col): i for i, col in enumerate(data.columns)}
+
+
+def cell_text(series: pd.Series) -> pd.Series:
+    """
+    Convert a column to the cell text compared by text filters.
+
+    Missing values become empty strings and booleans lowercase, like
+    ``String(value ?? '')`` in the frontend.
+
+    Parameters
+    ----------
+    series : pd.Series
+        Column to convert.
+
+    Returns
+    -------
+    pd.Series
+        String column without missing values.
+    """
+    if pd.api.types.is_bool_dtype(series) or series.dtype == object:
+        series = series.map(
+            lambda value: str(value).lower() if isinstance(value, bool) else value
+        )
+    return series.astype("string").fillna("")
+
+
+def _filter_mask(series: pd.Series, column_type: str, value: Any) -> pd.Series:
+    """
+    Compute the boolean mask of rows matching one column filter.
+
+    Parameters
+    ----------
+    series : pd.Series
+        Column to filter.
+    column_type : str
+        Filter type of the column (see ``filter_type``).
+    value : Any
+        Filter value sent by the frontend: a search string, a
+        ``{"type": "multiselect", "values": [...]}`` object, a numeric
+        ``[min, max]`` range or a ``["yyyy-MM-dd", "yyyy-MM-dd"]`` date
+        range (either bound may be null).
+
+    Returns
+    -------
+    pd.Series
+        Boolean mask (True for rows to keep).
+    """
+    keep_all = pd.Series(True, index=series.index)
+
+    if isinstance(value, dict) and value.get("type") == "multiselect":
+        selected = [str(v) for v in value.get("values", [])]
+        if not selected:
+            return keep_all
+        return cell_text(series).isin(selected)
+
+    if column_type == "number" and isinstance(value, list):
+        low, high = (value + [None, None])[:2]
+        if low is None and high is None:
+            return keep_all
+        if pd.api.types.is_timedelta64_dtype(series):
+            # Compare in milliseconds, like the values sent to the frontend
+            numbers = series / pd.Timedelta(milliseconds=1)
+        else:
+            numbers = pd.to_numeric(series, errors="coerce")
+        if low is not None and high is not None:
+            return numbers.between(low, high).fillna(False).astype(bool)
+        if low is not None:
+            return (numbers >= low).fillna(False).astype(bool)
+        return (numbers <= high).fillna(False).astype(bool)
+
+    if column_type == "date" and isinstance(value, list):
+        start, end = (value + [None, None])[:2]
+        if start is None and end is None:
+            return keep_all
+        dates = pd.to_datetime(series, errors="coerce")
+        if isinstance(dates.dtype, pd.DatetimeTZDtype):
+            # Compare in the wall-clock time of the column's timezone
+            dates = dates.dt.tz_localize(None)
+        days = dates.dt.normalize()
+        mask = days.notna()
+        if start is not None:
+            mask &= days >= pd.Timestamp(start)
+        if end is not None:
+            mask &= days <= pd.Timestamp(end)
+        return mask
+
+    if isinstance(value, str):
+        if value == "":
+            return keep_all
+        text = cell_text(series).str.lower()
+        return text.str.contains(value.lower(), regex=False)
+
+    return keep_all
+
+
+def _sort_key(series: pd.Series) -> pd.Series:
+    """
+    Normalize a column for sorting.
+
+    Strings are compared case-insensitively, approximating the
+    ``localeCompare(..., {sensitivity: 'base'})`` sort of the frontend.
+
+    Parameters
+    ----------
+    series : pd.Series
+        Column to sort.
+
+    Returns
+    -------
+    pd.Series
+        Sort keys.
+    """
+    if pd.api.types.is_string_dtype(series.dropna()):
+        return series.astype("string").str.lower()
+    return series
+
+
+def sort_ranks(series: pd.Series) -> np.ndarray:
+    """
+    Compute the sort rank of each row of a column.
+
+    Rows are ranked with the same keys as ``query_positions``; equal keys
+    share a rank, so a stable sort by rank keeps their original order.
+
+    Parameters
+    ----------
+    series : pd.Series
+        Column to rank.
+
+    Returns
+    -------
+    np.ndarray
+        Dense ranks starting at 0 (int32), with -1 for missing values.
+    """
+    missing = series.isna().to_numpy()
+    try:
+        ranks = _sort_key(series).rank(method="dense")
+    except TypeError:
+        # Mixed types that cannot be compared: rank by their text
+        ranks = series.astype(str).rank(method="dense")
+    result = ranks.to_numpy(dtype=np.float64, na_value=0).astype(np.int32) - 1
+    result[missing] = -1
+    return result
+
+
+def query_positions(
+    data: pd.DataFrame,
+    sorting: list[dict[str, Any]],
+    filters: list[dict[str, Any]],
+    filter_types: dict[str, str],
+) -> np.ndarray | None:
+    """
+    Apply sorting and column filters to a DataFrame.
+
+    Parameters
+    ----------
+    data : pd.DataFrame
+        DataFrame to query.
+    sorting : list[dict]
+        TanStack Table sorting state (``[{"id": ..., "desc": ...}]``).
+    filters : list[dict]
+        TanStack Table column filters (``[{"id": ..., "value": ...}]``).
+        Filters on columns without a filter type are ignored.
+    filter_types : dict[str, str]
+        Filter type per filterable column id.
+
+    Returns
+    -------
+    np.ndarray or None
+        Positions of the resulting rows in ``data`` (in display order),
+        or None if neither sorting nor filters apply.
+    """
+    columns = _column_positions(data)
+    sorting = [spec for spec in sorting if spec.get("id") in columns]
+    filters = [spec for spec in filters if spec.get("id") in filter_types]
+    if not sorting and not filters:
+        return None
+
+    positions = np.arange(len(data))
+
+    if filters:
+        mask = np.ones(len(data), dtype=bool)
+        for spec in filters:
+            series = data.iloc[:, columns[spec["id"]]]
+            column_mask = _filter_mask(
+                series, filter_types[spec["id"]], spec.get("value")
+            )
+            mask &= column_mask.to_numpy(dtype=bool, na_value=False)
+        positions = positions[mask]
+
+    # Stable sorts from the least significant sort column to the most
+    # significant one
+    for spec in reversed(sorting):
+        descending = bool(spec.get("desc"))
+        series = data.iloc[positions, columns[spec["id"]]].reset_index(drop=True)
+        try:
+            keys = _sort_key(series)
+            order = keys.sort_values(
+                ascending=not descending,
+                # The frontend sorts nulls last, reversed for descending order
+                na_position="first" if descending else "last",
+                kind="stable",
+            ).index.to_numpy()
+        except TypeError:
+            # Mixed types that cannot be compared: sort by their text
+            order = (
+                series.astype(str)
+                .sort_values(ascending=not descending, kind="stable")
+                .index.to_numpy()
+            )
+        positions = positions[order]
+
+    return positions
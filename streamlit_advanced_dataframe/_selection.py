@@ -0,0 +1,131 @@
+"""
+Compact encodings of the row selection returned to Python.
+
+With ``selection_format="ranges"`` (or ``"labels"``) the frontend sends
+the selected row positions as sorted, half-open ``[start, stop)`` ranges
+instead of one integer per row, so selecting tens of thousands of
+contiguous rows costs a few numbers on the websocket. The ranges are
+expanded with vectorized numpy operations.
+"""
+
+from typing import Any, Sequence
+
+import numpy as np
+import pandas as pd
+
+# Accepted values of the selection_format parameter
+SELECTION_FORMATS = ("indices", "ranges", "labels")
+
+
+def ranges_from_indices(indices: Sequence[int]) -> list[tuple[int, int]]:
+    """
+    Encode row positions as sorted, half-open ranges.
+
+    Parameters
+    ----------
+    indices : Sequence[int]
+        Row positions, in any order (duplicates are ignored).
+
+    Returns
+    -------
+    list[tuple[int, int]]
+        ``(start, stop)`` ranges covering exactly the given positions.
+    """
+    positions = np.unique(np.asarray(indices, dtype=np.int64))
+    if len(positions) == 0:
+        return []
+    # A range ends wherever the next position is not the following row
+    breaks = np.flatnonzero(np.diff(positions) != 1) + 1
+    starts = positions[np.r_[0, breaks]]
+    stops = positions[np.r_[breaks - 1, len(positions) - 1]] + 1
+    return list(zip(starts.tolist(), stops.tolist()))
+
+
+def selection_ranges_from_value(component_value: Any) -> list[tuple[int, int]]:
+    """
+    Extract the selected row ranges from the component value.
+
+    Parameters
+    ----------
+    component_value : Any
+        Value returned by the component: a dict with a
+        ``"selection_ranges"`` list of ``[start, stop]`` pairs, or with a
+        ``"selection"`` list of row positions (before the first selection).
+
+    Returns
+    -------
+    list[tuple[int, int]]
+        Sorted, half-open ``(start, stop)`` ranges.
+    """
+    if not isinstance(component_value, dict):
+        return []
+    ranges = component_value.get("selection_ranges")
+    if ranges is None:
+        return ranges_from_indices(component_value.get("selection") or [])
+    return [(int(start), int(stop)) for start, stop in ranges]
+
+
+def selection_mask(
+    selection: Sequence[int] | Sequence[tuple[int, int]], length: int
+) -> np.ndarray:
+    """
+    Convert a selection into a boolean mask over the rows.
+
+    Parameters
+    ----------
+    selection : Sequence[int] or Sequence[tuple[int, int]]
+        Selected row positions (``selection_format="indices"``) or
+        half-open ``(start, stop)`` ranges (``selection_format="ranges"``).
+    length : int
+        Number of rows of the DataFrame.
+
+    Returns
+    -------
+    np.ndarray
+        Boolean array of length ``length``, usable with ``df[mask]`` or
+        ``df.iloc[mask]``.
+
+    Examples
+    --------
+    >>> selected = advanced_dataframe(
+    ...     df, selection_mode="multi-row", selection_format="ranges"
+    ... )
+    >>> st.dataframe(df[selection_mask(selected, len(df))])
+    """
+    mask = np.zeros(length, dtype=bool)
+    if len(selection) == 0:
+        return mask
+
+    values = np.asarray(selection, dtype=np.int64)
+    if values.ndim == 1:
+        mask[values] = True
+        return mask
+
+    # +1 at each range start and -1 at each stop; the running sum is
+    # positive inside the ranges
+    bounds = np.clip(values.reshape(-1, 2), 0, length)
+    counts = np.zeros(length + 1, dtype=np.int64)
+    np.add.at(counts, bounds[:, 0], 1)
+    np.add.at(counts, bounds[:, 1], -1)
+    return np.cumsum(counts[:-1]) > 0
+
+
+def selection_labels(
+    data: pd.DataFrame, ranges: Sequence[tuple[int, int]]
+) -> pd.Index:
+    """
+    Resolve selected row ranges to index labels of the DataFrame.
+
+    Parameters
+    ----------
+    data : pd.DataFrame
+        DataFrame passed to the component.
+    ranges : Sequence[tuple[int, int]]
+        Half-open ``(start, stop)`` ranges of row positions.
+
+    Returns
+    -------
+    pd.Index
+        Index labels of the selected rows, in row order.
+    """
+    return data.index[selection_mask(ranges, len(data))]
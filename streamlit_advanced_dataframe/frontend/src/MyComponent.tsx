@@ -1,8 +1,26 @@
 import { AdvancedDataFrame } from '@/components/AdvancedDataFrame'
 import { ErrorBoundary } from '@/components/ErrorBoundary'
 import { useStreamlitTheme } from '@/hooks/useStreamlitTheme'
-import { StreamlitProps } from '@/types/table'
-import { useEffect, useMemo } from 'react'
+import { decodeArrowColumns, decodeSortRanks } from '@/lib/arrow'
+import { sendComponentValue } from '@/lib/componentValue'
+import {
+  columnStoreFromHierarchy,
+  EMPTY_COLUMN_STORE,
+  HierarchicalPayload,
+} from '@/lib/columnStore'
+import { applyDelta, DataDelta } from '@/lib/delta'
+import {
+  isLazyPayload,
+  lazyColumnStore,
+  updateSubRowsCache,
+} from '@/lib/subRows'
+import {
+  ColumnConfig,
+  ColumnGroup,
+  ColumnStore,
+  StreamlitProps,
+} from '@/types/table'
+import { useEffect, useMemo, useRef } from 'react'
 import { Streamlit } from 'streamlit-component-lib'
 import { useRenderData } from 'streamlit-component-lib-react-hooks'
 
@@ -14,24 +32,101 @@ function MyComponent() {
   const renderData = useRenderData()
   const { isDark } = useStreamlitTheme()
 
-  // Pythonから渡された引数を取得（useMemoで参照を安定化）
-  const data = useMemo(
-    () => renderData.args['data'] || [],
-    [renderData.args],
-  )
-  const columns = useMemo(
-    () => renderData.args['columns'] || [],
-    [renderData.args],
+  // 前回のデータ・カラム設定（内容が同じなら同じ参照を返し、再計算を防ぐ）
+  // 差分更新では前回のストアに差分を適用する
+  const dataCacheRef = useRef<{ key: string; store: ColumnStore } | null>(
+    null,
   )
+  const columnsCacheRef = useRef<{
+    json: string
+    columns: ColumnConfig[]
+    headerGroups?: ColumnGroup[]
+  } | null>(null)
+
+  // Pythonから渡された引数を取得（useMemoで参照を安定化）
+  // フラットなデータはArrow IPC（バイト列）、階層データはカラム単位のJSONで届く
+  // 差分更新では全データの代わりに差分（data_delta）と変更された行が届く
+  const delta: DataDelta | null = renderData.args['data_delta'] ?? null
+  const data = useMemo(() => {
+    const rawData = renderData.args['data']
+    // data_keyはDataFrameのフィンガープリント（同じなら再デコード不要）
+    let dataKey: string | null = renderData.args['data_key'] ?? null
+    // サブ行の遅延読み込み: 届いたサブ行をキャッシュし、キャッシュが変わった
+    // 場合のみストアを作り直す
+    const isLazy = isLazyPayload(rawData)
+    if (isLazy) {
+      const version = updateSubRowsCache(
+        dataKey,
+        renderData.args['sub_rows'] ?? undefined,
+      )
+      if (dataKey !== null) dataKey = `${dataKey}:${version}`
+    }
+    if (dataKey !== null && dataCacheRef.current?.key === dataKey) {
+      return dataCacheRef.current.store
+    }
+
+    if (delta) {
+      const cached = dataCacheRef.current
+      // 差分の基準となるデータを持っていない場合は再送を待つ（前回の表示を維持）
+      if (dataKey === null || cached?.key !== delta.base) {
+        return cached?.store ?? EMPTY_COLUMN_STORE
+      }
+      const rawRows = renderData.args['data_delta_rows']
+      const changedRows =
+        rawRows instanceof Uint8Array
+          ? decodeArrowColumns(rawRows)
+          : EMPTY_COLUMN_STORE
+      const store = applyDelta(cached.store, delta, changedRows)
+      dataCacheRef.current = { key: dataKey, store }
+      return store
+    }
+
+    let store: ColumnStore =
+      rawData instanceof Uint8Array
+        ? decodeArrowColumns(rawData)
+        : isLazy
+          ? lazyColumnStore(rawData)
+          : rawData
+            ? columnStoreFromHierarchy(rawData as HierarchicalPayload)
+            : EMPTY_COLUMN_STORE
+    // Pythonで計算したソート用の順位（precompute_sort指定時のみ）
+    const rawRanks = renderData.args['sort_ranks']
+    if (rawRanks instanceof Uint8Array) {
+      store = { ...store, sortRanks: decodeSortRanks(rawRanks) }
+    }
+    dataCacheRef.current = dataKey !== null ? { key: dataKey, store } : null
+    return store
+  }, [renderData.args, delta])
+  // ヘッダーグループもカラム定義の作成に使うため、カラム設定と合わせて安定化
+  const { columns, headerGroups } = useMemo(() => {
+    const rawColumns: ColumnConfig[] = renderData.args['columns'] || []
+    const rawHeaderGroups: ColumnGroup[] | undefined =
+      renderData.args['header_groups'] ?? undefined
+    const json = JSON.stringify([rawColumns, rawHeaderGroups ?? null])
+    if (columnsCacheRef.current?.json !== json) {
+      columnsCacheRef.current = {
+        json,
+        columns: rawColumns,
+        headerGroups: rawHeaderGroups,
+      }
+    }
+    return columnsCacheRef.current
+  }, [renderData.args])
   const height = renderData.args['height']
   const useContainerWidth = renderData.args['use_container_width']
   const selectionMode = renderData.args['selection_mode']
+  const selectionRanges = renderData.args['selection_ranges']
   const showRowCount = renderData.args['show_row_count']
   const columnOrder = renderData.args['column_order']
-  const headerGroups = renderData.args['header_groups']
   const expandable = renderData.args['expandable']
-  const subRowsKey = renderData.args['sub_rows_key']
   const showSummary = renderData.args['show_summary']
+  const windowSize = renderData.args['window_size'] ?? undefined
+  const rowCount = renderData.args['row_count']
+  const totalRowCount = renderData.args['total_row_count']
+  const rowOffset = renderData.args['row_offset']
+  const rowPositions = renderData.args['row_positions']
+  const summary = renderData.args['summary']
+  const useWorker = renderData.args['use_worker']
 
   // StreamlitPropsに変換
   const props: StreamlitProps = {
@@ -40,14 +135,30 @@ function MyComponent() {
     height,
     useContainerWidth,
     selectionMode,
+    selectionRanges,
     showRowCount,
     columnOrder,
     headerGroups,
     expandable,
-    subRowsKey,
     showSummary,
+    windowSize,
+    rowCount,
+    totalRowCount,
+    rowOffset,
+    rowPositions,
+    summary,
+    useWorker,
   }
 
+  // 差分を適用できなかった場合は全データの再送を要求
+  const needsResync =
+    delta !== null && dataCacheRef.current?.key !== renderData.args['data_key']
+  useEffect(() => {
+    if (needsResync) {
+      sendComponentValue({ resync: Date.now() })
+    }
+  }, [needsResync, delta])
+
   // データやpropsが変わった時にStreamlitにフレームの高さを通知
   useEffect(() => {
     Streamlit.setFrameHeight()
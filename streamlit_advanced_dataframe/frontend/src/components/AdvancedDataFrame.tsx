@@ -16,14 +16,36 @@
 
 import { ColumnFilter } from '@/components/ColumnFilter'
 import { FilterStatus } from '@/components/FilterStatus'
+import {
+  ColumnSpacer,
+  RowColors,
+  TableBodyRow,
+} from '@/components/TableBodyRow'
 import { TableToolbar } from '@/components/TableToolbar'
 import { Checkbox } from '@/components/ui/checkbox'
 import { useColumnType } from '@/hooks/useColumnType'
 import { useStreamlitTheme } from '@/hooks/useStreamlitTheme'
+import { useTableEngine } from '@/hooks/useTableEngine'
+import {
+  EMPTY_COLUMN_STORE,
+  getCellValue,
+  topLevelRowIndices,
+} from '@/lib/columnStore'
+import { AggregateSpec, createSummaryAggregator } from '@/lib/aggregate'
+import { createSelectionMasks, groupMatchesByRow } from '@/lib/cellLookup'
+import { getCellText } from '@/lib/cellText'
+import { createColumnWindow, windowHeaders } from '@/lib/columnWindow'
+import { formatDateTime } from '@/lib/datetime'
+import { selectionRanges, sendComponentValue } from '@/lib/componentValue'
+import { matchesColumnFilter } from '@/lib/filter'
+import { getRowComparator, sortRowIndices } from '@/lib/sortEngine'
+import { createRowFilter, EngineQuery } from '@/lib/tableEngine'
+import { displayPositions, findSearchMatches } from '@/lib/textIndex'
 import { cn } from '@/lib/utils'
 import {
   CellPosition,
   CellSelection,
+  ColumnMeta,
   RowData,
   StreamlitProps,
   type ColumnConfig,
@@ -43,27 +65,24 @@ import {
   useReactTable,
 } from '@tanstack/react-table'
 import { useVirtualizer } from '@tanstack/react-virtual'
+import { format } from 'date-fns'
 import { useCallback, useEffect, useMemo, useRef, useState } from 'react'
 import { Streamlit } from 'streamlit-component-lib'
+import { useDebouncedCallback } from 'use-debounce'
 
 /**
- * 複数選択フィルタの値の型
- */
-interface MultiSelectFilterValue {
-  type: 'multiselect'
-  values: string[]
-}
-
-/**
- * フィルタ値がMultiSelectFilterValueかどうかを判定する型ガード
+ * カラムフィルタをPython側に送信する形式に変換（ウィンドウモード用）
+ * 日付はローカル日付の'yyyy-MM-dd'文字列にする（タイムゾーンのずれを防ぐ）
  */
-function isMultiSelectFilter(value: unknown): value is MultiSelectFilterValue {
-  return (
-    typeof value === 'object' &&
-    value !== null &&
-    'type' in value &&
-    (value as MultiSelectFilterValue).type === 'multiselect'
-  )
+function toQueryFilters(filters: ColumnFiltersState): ColumnFiltersState {
+  return filters.map(({ id, value }) => ({
+    id,
+    value: Array.isArray(value)
+      ? value.map((v) =>
+          v instanceof Date ? format(v, 'yyyy-MM-dd') : (v ?? null),
+        )
+      : value,
+  }))
 }
 
 /**
@@ -72,6 +91,9 @@ function isMultiSelectFilter(value: unknown): value is MultiSelectFilterValue {
  */
 const ROW_HEIGHT = 36
 
+// カラム定義のヘルパー（レンダリングごとに作り直さない）
+const columnHelper = createColumnHelper<RowData>()
+
 /**
  * AdvancedDataFrameコンポーネント
  */
@@ -81,16 +103,27 @@ export function AdvancedDataFrame({
   height,
   useContainerWidth = false,
   selectionMode,
+  selectionRanges: sendsSelectionRanges = false,
   showRowCount = false,
   columnOrder,
   headerGroups,
   expandable = false,
-  subRowsKey = 'subRows',
   showSummary = true,
+  windowSize,
+  rowCount,
+  totalRowCount,
+  rowOffset = 0,
+  rowPositions,
+  summary,
+  useWorker = false,
 }: StreamlitProps) {
-  // データとカラムの検証（undefinedやnullの場合は空配列にフォールバック）
-  const data = Array.isArray(rawData) ? rawData : []
+  // データとカラムの検証（undefinedやnullの場合は空のストア・配列にフォールバック）
+  const store = rawData ?? EMPTY_COLUMN_STORE
   const columns = Array.isArray(rawColumns) ? rawColumns : []
+  // TanStack Tableに渡すトップレベルの行インデックス（値はstoreから取得）
+  const data = useMemo(() => topLevelRowIndices(store), [store])
+  // ウィンドウモード: dataは全体のうち rowOffset 行目からの一部の行のみ
+  const isWindowed = rowCount !== undefined
 
   const { theme, isDark, secondaryBackgroundColor, textColor } =
     useStreamlitTheme()
@@ -129,20 +162,46 @@ export function AdvancedDataFrame({
     }
   }, [expandedCount, expandable])
 
-  // 行選択状態管理（選択された行のインデックス配列）
-  const [selectedRowIndices, setSelectedRowIndices] = useState<number[]>([])
+  // 行選択状態管理（選択された行の元のインデックスの集合、選択した順序を保持）
+  // 状態の集合は直接更新せず、変更時はコピーした集合で新しい状態を作る
+  const [rowSelection, setRowSelection] = useState(() => ({
+    rows: new Set<number>(),
+  }))
   // ユーザーが選択を変更したかどうかのフラグ（初回レンダリング時のsetComponentValue呼び出しを防ぐ）
   const hasUserSelectedRef = useRef(false)
 
+  // 差分更新: 行の挿入・削除・並べ替えに合わせて選択中の行の位置を引き継ぐ
+  // （位置が変わった場合は下の通知用のuseEffectでPythonにも送られる）
+  useEffect(() => {
+    const remap = store.remapPosition
+    if (!remap) return
+    setRowSelection((prev) => {
+      const next = new Set<number>()
+      let unchanged = true
+      prev.rows.forEach((index) => {
+        const position = remap(index)
+        if (position !== index) unchanged = false
+        if (position >= 0) next.add(position)
+      })
+      return unchanged ? prev : { rows: next }
+    })
+  }, [store])
+
+  // 行データの位置から元のDataFrameの位置を取得
+  // （ウィンドウモードではPython側でソート・フィルタされた行が届くため変換が必要）
+  const getOriginalIndex = useCallback(
+    (dataIndex: number) => rowPositions?.[dataIndex] ?? rowOffset + dataIndex,
+    [rowPositions, rowOffset],
+  )
+
   // カラムリサイズモード
   const [columnResizeMode] = useState<ColumnResizeMode>('onChange')
 
   // セル選択状態管理
   const [selectedCells, setSelectedCells] = useState<CellSelection[]>([])
-  const [isSelecting, setIsSelecting] = useState(false)
-  const [selectionStart, setSelectionStart] = useState<CellPosition | null>(
-    null,
-  )
+  // ドラッグ中の選択開始セル（ドラッグ中でない場合はnull）
+  // 描画には使わないためrefで持ち、セルのイベントハンドラを安定させる
+  const selectionStartRef = useRef<CellPosition | null>(null)
   const tableRef = useRef<HTMLDivElement>(null)
 
   // ヘッダのhover状態管理
@@ -235,56 +294,44 @@ export function AdvancedDataFrame({
   )
 
   /**
-   * 数値カラムを判定
-   * カラムのすべての値（nullを除く）が数値の場合、そのカラムを数値カラムとする
+   * 数値カラムを判定（Python側で計算したメタデータの論理型を使用）
+   * 日時カラムもエポックミリ秒の数値として届くため数値カラムとする
    */
   const numericColumns = useMemo(() => {
     const numericCols = new Set<string>()
 
     columns.forEach((col) => {
-      const values = data.map((row) => row[col.id]).filter((val) => val != null)
-
-      if (values.length === 0) return
-
-      const allNumeric = values.every((val) => typeof val === 'number')
-      if (allNumeric) {
+      if (col.meta?.type === 'number' || col.meta?.type === 'datetime') {
         numericCols.add(col.id)
       }
     })
 
     return numericCols
-  }, [data, columns])
+  }, [columns])
 
   /**
-   * boolean型カラムを判定
-   * カラムのすべての値（nullを除く）がbooleanの場合、そのカラムをbooleanカラムとする
+   * boolean型カラムを判定（Python側で計算したメタデータの論理型を使用）
    */
   const booleanColumns = useMemo(() => {
     const booleanCols = new Set<string>()
 
     columns.forEach((col) => {
-      const values = data.map((row) => row[col.id]).filter((val) => val != null)
-
-      if (values.length === 0) return
-
-      const allBoolean = values.every((val) => typeof val === 'boolean')
-      if (allBoolean) {
+      if (col.meta?.type === 'boolean') {
         booleanCols.add(col.id)
       }
     })
 
     return booleanCols
-  }, [data, columns])
+  }, [columns])
 
   /**
    * カラムタイプマップを取得（フィルタUIの種類を決定）
    */
-  const columnTypeMap = useColumnType(data, columns)
+  const columnTypeMap = useColumnType(columns)
 
   /**
    * テキスト・セレクトカラムのユニーク値を取得
-   * - textタイプ: 10個以下の場合のみ
-   * - selectタイプ: 常に取得
+   * Python側でユニーク値が10個以下の場合のみmeta.valuesに含まれる
    */
   const uniqueValuesMap = useMemo(() => {
     const map = new Map<string, string[]>()
@@ -293,22 +340,24 @@ export function AdvancedDataFrame({
       const colType = columnTypeMap.get(col.id)
       if (colType !== 'text' && colType !== 'select') return
 
-      const values = data
-        .map((row) => String(row[col.id] ?? ''))
-        .filter((val) => val !== '')
-
-      const uniqueValues = Array.from(new Set(values)).sort()
-      // selectタイプは常に、textタイプは10個以下の場合のみ
-      if (
-        uniqueValues.length > 0 &&
-        (colType === 'select' || uniqueValues.length <= 10)
-      ) {
+      const uniqueValues = col.meta?.values
+      if (uniqueValues && uniqueValues.length > 0) {
         map.set(col.id, uniqueValues)
       }
     })
 
     return map
-  }, [data, columns, columnTypeMap])
+  }, [columns, columnTypeMap])
+
+  // 日時カラムのメタデータ（日付範囲フィルタを表示と同じタイムゾーンで判定し、
+  // 検索・コピーのテキストを表示と同じフォーマットにする）
+  const datetimeMetaMap = useMemo(() => {
+    const map = new Map<string, ColumnMeta>()
+    columns.forEach((col) => {
+      if (col.meta?.type === 'datetime') map.set(col.id, col.meta)
+    })
+    return map
+  }, [columns])
 
   /**
    * カラムの推定幅を計算（コンテンツfit）
@@ -336,14 +385,17 @@ export function AdvancedDataFrame({
 
       // データの最大文字幅を計算（最大100行まで）
       const sampleSize = Math.min(100, data.length)
+      const meta = columns.find((col) => col.id === columnId)?.meta
       let maxDataWidth = 0
 
       for (let i = 0; i < sampleSize; i++) {
-        const rawValue = data[i][columnId]
-        // 数値の場合は3桁区切りフォーマット後の文字列を使用
+        const rawValue = getCellValue(store, i, columnId)
+        // 数値の場合は3桁区切り、日時の場合は表示フォーマット後の文字列を使用
         const value =
           typeof rawValue === 'number'
-            ? rawValue.toLocaleString()
+            ? meta?.type === 'datetime'
+              ? formatDateTime(rawValue, meta)
+              : rawValue.toLocaleString()
             : String(rawValue ?? '')
         const chars = value.split('')
         const width = chars.reduce((sum, char) => {
@@ -357,188 +409,194 @@ export function AdvancedDataFrame({
       // ヘッダとデータの最大幅を採用、最小80px、最大500px
       return Math.max(80, Math.min(500, Math.max(headerWidth, dataWidth)))
     },
-    [data, booleanColumns],
+    [data, store, columns, booleanColumns],
+  )
+
+  /**
+   * Web Workerモード: フィルタ・ソート・グローバル検索をWorkerで計算
+   * （ウィンドウモードではPython側で計算するため、階層データはサブ行のため対象外）
+   */
+  const isWorkerEnabled = useWorker && !isWindowed && !expandable
+  const engineQuery = useMemo<EngineQuery>(
+    () => ({
+      sorting,
+      filters: columnFilters,
+      columnTypes: columnTypeMap,
+      datetimeMeta: datetimeMetaMap,
+      searchQuery,
+      searchColumns: columns.map((col) => col.id),
+    }),
+    [
+      sorting,
+      columnFilters,
+      columnTypeMap,
+      datetimeMetaMap,
+      searchQuery,
+      columns,
+    ],
   )
+  const engineState = useTableEngine(isWorkerEnabled, store, engineQuery)
+  // フィルタ・ソートをPythonまたはWorkerで適用するか
+  // Workerを作成できない場合や、データの変更後に最初の結果が届くまでは
+  // メインスレッドで計算する（ソート・フィルタ・検索を無視しない）
+  const isManualQuery = isWindowed || engineState !== null
+
+  /**
+   * カラムフィルタの判定関数（行インデックスで判定）
+   * 型付き配列・辞書・トライグラム索引を使う判定関数をフィルタ値の変更時に
+   * 一度だけ作成し、行ごとのセル値の変換を避ける
+   * （フィルタをPythonまたはWorkerで適用する場合は索引を作らない）
+   */
+  const filterPredicates = useMemo(() => {
+    const map = new Map<string, (rowIndex: number) => boolean>()
+    if (isManualQuery) return map
+
+    columnFilters.forEach(({ id, value }) => {
+      const colType = columnTypeMap.get(id)
+      if (!colType) return
+      const timeZone = datetimeMetaMap.get(id)?.timezone ?? undefined
+      map.set(id, createRowFilter(store, id, colType, value, timeZone))
+    })
+
+    return map
+  }, [isManualQuery, columnFilters, store, columnTypeMap, datetimeMetaMap])
+
+  // カラム定義のセル・ソート・フィルタ関数から参照する最新の状態
+  // 行選択・テーマ・データが変わるたびにカラム定義を作り直すと、TanStack Tableが
+  // 行モデルを再計算して表示中のすべての行が再描画されるため、変わる値は
+  // 依存配列ではなくrefを通して参照する
+  const columnState = {
+    store,
+    filterPredicates,
+    numericColumns,
+    booleanColumns,
+    columnTypeMap,
+    datetimeMetaMap,
+    rowSelection,
+    isWindowed,
+    isDark,
+    primaryColor: theme.primaryColor,
+    getOriginalIndex,
+    estimateColumnWidth,
+  }
+  const columnStateRef = useRef(columnState)
+  columnStateRef.current = columnState
+
+  // カラム定義の作成に使うカラム設定（カラムIDと型が変わった場合のみ更新）
+  // データが変わるたびに件数・最小値・最大値などのメタデータも変わるため、
+  // メタデータを除いた設定と型をキーにしてカラム定義の作り直しを避ける
+  const columnDefsKey = JSON.stringify(
+    columns.map(({ meta, ...config }) => [
+      config,
+      meta?.type,
+      columnTypeMap.get(config.id),
+    ]),
+  )
+  const columnDefsCacheRef = useRef({ key: columnDefsKey, columns })
+  if (columnDefsCacheRef.current.key !== columnDefsKey) {
+    columnDefsCacheRef.current = { key: columnDefsKey, columns }
+  }
+  const columnDefsSource = columnDefsCacheRef.current.columns
 
   // カラム定義をTanStack Table形式に変換
-  const columnHelper = createColumnHelper<RowData>()
   const tableColumns: ColumnDef<RowData, unknown>[] = useMemo(() => {
     // カラム定義を作成する共通関数
     const createColumnDef = (
       col: ColumnConfig,
     ): ColumnDef<RowData, unknown> => {
-      return columnHelper.accessor(col.id, {
-        id: col.id,
-        header: col.header,
-        size: estimateColumnWidth(col.id, col.header),
-        enableSorting: col.enableSorting ?? true,
-        enableResizing: col.enableResizing ?? true,
-        // セルの表示フォーマット（数値カラムは3桁区切り、booleanはチェックボックス）
-        cell: (info) => {
-          const value = info.getValue()
-
-          // boolean型カラムの場合、チェックボックスで表示（読み取り専用）
-          // prefix/suffixは適用しない
-          if (booleanColumns.has(col.id) && typeof value === 'boolean') {
-            return (
-              <div className="flex items-center justify-center">
-                <Checkbox
-                  checked={value}
-                  disabled
-                  style={{
-                    borderColor: isDark
-                      ? 'rgba(250, 250, 250, 0.4)'
-                      : 'rgba(0, 0, 0, 0.3)',
-                    opacity: 0.7,
-                    cursor: 'default',
-                  }}
-                />
-              </div>
-            )
-          }
-
-          // prefix/suffixを適用
-          const prefix = col.prefix ?? ''
-          const suffix = col.suffix ?? ''
-
-          // 数値カラムの場合、ユーザーのロケールに従って3桁区切りでフォーマット
-          if (numericColumns.has(col.id) && typeof value === 'number') {
-            return `${prefix}${value.toLocaleString()}${suffix}`
-          }
-
-          // nullやundefinedの場合はそのまま表示（prefix/suffixなし）
-          if (value == null || value === '') {
-            return value as string
-          }
-
-          return `${prefix}${value}${suffix}`
-        },
-        // 日本語対応のカスタムソート関数
-        sortingFn: (rowA, rowB, columnId) => {
-          const a = rowA.getValue(columnId)
-          const b = rowB.getValue(columnId)
-
-          // nullやundefinedの処理
-          if (a == null && b == null) return 0
-          if (a == null) return 1
-          if (b == null) return -1
-
-          // 文字列の場合は日本語対応のlocaleCompareを使用
-          if (typeof a === 'string' && typeof b === 'string') {
-            return a.localeCompare(b, 'ja', { sensitivity: 'base' })
-          }
-
-          // 数値の場合は通常の比較
-          if (typeof a === 'number' && typeof b === 'number') {
-            return a - b
-          }
-
-          // その他の型はデフォルトの比較
-          return a < b ? -1 : a > b ? 1 : 0
-        },
-        // カスタムフィルタ関数（カラムタイプに応じて処理）
-        filterFn: (row, columnId, filterValue) => {
-          const cellValue = row.getValue(columnId)
-          const colType = columnTypeMap.get(columnId)
-
-          // フィルタが有効でない場合はすべて表示
-          if (!colType) return true
-
-          switch (colType) {
-            case 'text': {
-              // テキストフィルタ: 文字列の場合は部分一致、オブジェクトの場合は複数選択
-              if (!filterValue || filterValue === '') return true
-
-              // 複数選択フィルタの場合
-              if (isMultiSelectFilter(filterValue)) {
-                const selectedValues = filterValue.values
-                if (selectedValues.length === 0) return true
-                const cellText = String(cellValue ?? '')
-                return selectedValues.includes(cellText)
-              }
-
-              // テキスト検索の場合
-              const searchValue = String(filterValue).toLowerCase()
-              const cellText = String(cellValue ?? '').toLowerCase()
-              return cellText.includes(searchValue)
+      const { estimateColumnWidth } = columnStateRef.current
+      return columnHelper.accessor(
+        (rowIndex) =>
+          getCellValue(columnStateRef.current.store, rowIndex, col.id),
+        {
+          id: col.id,
+          header: col.header,
+          // 幅はカラム定義の作成時のデータから推定
+          size: estimateColumnWidth(col.id, col.header),
+          enableSorting: col.enableSorting ?? true,
+          enableResizing: col.enableResizing ?? true,
+          // セルの表示フォーマット（数値カラムは3桁区切り、booleanはチェックボックス）
+          cell: (info) => {
+            const value = info.getValue()
+            const { numericColumns, booleanColumns, datetimeMetaMap } =
+              columnStateRef.current
+
+            // boolean型カラムの場合、チェックボックスで表示（読み取り専用）
+            // prefix/suffixは適用しない
+            if (booleanColumns.has(col.id) && typeof value === 'boolean') {
+              return (
+                <div className="flex items-center justify-center">
+                  <Checkbox
+                    checked={value}
+                    disabled
+                    style={{
+                      borderColor: columnStateRef.current.isDark
+                        ? 'rgba(250, 250, 250, 0.4)'
+                        : 'rgba(0, 0, 0, 0.3)',
+                      opacity: 0.7,
+                      cursor: 'default',
+                    }}
+                  />
+                </div>
+              )
             }
-            case 'number': {
-              // 数値範囲フィルタ: [min, max]
-              if (!filterValue) return true
-              const [min, max] = filterValue as [
-                number | undefined,
-                number | undefined,
-              ]
-              if (min === undefined && max === undefined) return true
 
-              const numValue = Number(cellValue)
-              if (isNaN(numValue)) return false
+            // prefix/suffixを適用
+            const prefix = col.prefix ?? ''
+            const suffix = col.suffix ?? ''
 
-              if (min !== undefined && numValue < min) return false
-              if (max !== undefined && numValue > max) return false
-              return true
+            // 日時カラムの場合、描画するセルのみカラムのタイムゾーンでフォーマット
+            const datetimeMeta = datetimeMetaMap.get(col.id)
+            if (datetimeMeta && typeof value === 'number') {
+              return `${prefix}${formatDateTime(value, datetimeMeta)}${suffix}`
             }
-            case 'date': {
-              // 日付範囲フィルタ: [start, end]
-              if (!filterValue) return true
-              const [start, end] = filterValue as [
-                Date | undefined,
-                Date | undefined,
-              ]
-              if (start === undefined && end === undefined) return true
-
-              // セル値をDateオブジェクトに変換
-              let cellDate: Date | null = null
-              if (cellValue instanceof Date) {
-                cellDate = cellValue
-              } else if (typeof cellValue === 'string') {
-                cellDate = new Date(cellValue)
-              }
-
-              if (!cellDate || isNaN(cellDate.getTime())) return false
-
-              // 開始日チェック（start <= cellDate）
-              if (start !== undefined) {
-                const startTime = new Date(start).setHours(0, 0, 0, 0)
-                const cellTime = new Date(cellDate).setHours(0, 0, 0, 0)
-                if (cellTime < startTime) return false
-              }
-
-              // 終了日チェック（cellDate <= end）
-              if (end !== undefined) {
-                const endTime = new Date(end).setHours(23, 59, 59, 999)
-                const cellTime = new Date(cellDate).setHours(0, 0, 0, 0)
-                if (cellTime > endTime) return false
-              }
 
-              return true
+            // 数値カラムの場合、ユーザーのロケールに従って3桁区切りでフォーマット
+            if (numericColumns.has(col.id) && typeof value === 'number') {
+              return `${prefix}${value.toLocaleString()}${suffix}`
             }
-            case 'select': {
-              // セレクトフィルタ: 複数選択のみ
-              if (!filterValue || filterValue === '') return true
-
-              // 複数選択フィルタの場合
-              if (isMultiSelectFilter(filterValue)) {
-                const selectedValues = filterValue.values
-                if (selectedValues.length === 0) return true
-                const cellText = String(cellValue ?? '')
-                return selectedValues.includes(cellText)
-              }
 
-              // テキスト検索の場合（フォールバック）
-              const searchValue = String(filterValue).toLowerCase()
-              const cellText = String(cellValue ?? '').toLowerCase()
-              return cellText.includes(searchValue)
+            // nullやundefinedの場合はそのまま表示（prefix/suffixなし）
+            if (value == null || value === '') {
+              return value as string
             }
-            default:
-              return true
-          }
+
+            return `${prefix}${value}${suffix}`
+          },
+          // 日本語対応のカスタムソート関数（階層データのみ、フラットなデータは
+          // ソートエンジンでソート済み）
+          // 型付き配列の値、またはカラムごとに一度だけ計算した順位で比較する
+          sortingFn: (rowA, rowB, columnId) =>
+            getRowComparator(columnStateRef.current.store, columnId)(
+              rowA.original,
+              rowB.original,
+            ),
+          // カスタムフィルタ関数（カラムタイプに応じて処理）
+          filterFn: (row, columnId, filterValue) => {
+            const { columnTypeMap, datetimeMetaMap, filterPredicates } =
+              columnStateRef.current
+            const colType = columnTypeMap.get(columnId)
+
+            // フィルタが有効でない場合はすべて表示
+            if (!colType) return true
+
+            // 事前に作った判定関数を使用
+            const predicate = filterPredicates.get(columnId)
+            if (predicate) return predicate(row.original)
+
+            return matchesColumnFilter(
+              row.getValue(columnId),
+              colType,
+              filterValue,
+              datetimeMetaMap.get(columnId)?.timezone ?? undefined,
+            )
+          },
         },
-      })
+      )
     }
 
     // データカラムを作成
-    const dataColumns = columns.map(createColumnDef)
+    const dataColumns = columnDefsSource.map(createColumnDef)
 
     // カラムをグループ化（headerGroupsが指定されている場合）
     let finalColumns: ColumnDef<RowData, unknown>[]
@@ -575,11 +633,62 @@ export function AdvancedDataFrame({
     // 特殊カラムを追加（選択、展開）
     const specialColumns: ColumnDef<RowData, unknown>[] = []
 
+    // チェックボックスのスタイル
+    const checkboxStyle = (isChecked: boolean) => {
+      const { primaryColor, isDark } = columnStateRef.current
+      return {
+        // ダークテーマ対応のボーダー色
+        borderColor: isChecked
+          ? primaryColor
+          : isDark
+            ? 'rgba(250, 250, 250, 0.4)'
+            : 'rgba(0, 0, 0, 0.3)',
+        // チェック時の背景色をStreamlitテーマカラーに
+        backgroundColor: isChecked ? primaryColor : 'transparent',
+      }
+    }
+
     // 行選択機能が有効な場合、チェックボックスカラムを先頭に追加
     if (selectionMode) {
       const selectionColumn: ColumnDef<RowData, unknown> = {
         id: '__selection__',
-        header: '',
+        header: ({ table }) => {
+          // 複数選択モード: フィルタ後のすべての行を一括で選択・解除
+          // （ウィンドウモードでは読み込み済みの行しか分からないため表示しない）
+          const { rowSelection, isWindowed, getOriginalIndex } =
+            columnStateRef.current
+          if (selectionMode !== 'multi-row' || isWindowed) return ''
+
+          const filteredIndices = table
+            .getFilteredRowModel()
+            .rows.map((row) => getOriginalIndex(row.original))
+          const isAllChecked =
+            filteredIndices.length > 0 &&
+            filteredIndices.every((index) => rowSelection.rows.has(index))
+
+          return (
+            <div className="flex items-center justify-center">
+              <Checkbox
+                checked={isAllChecked}
+                onCheckedChange={() => {
+                  hasUserSelectedRef.current = true
+                  setRowSelection((prev) => {
+                    const rows = new Set(prev.rows)
+                    filteredIndices.forEach((index) => {
+                      if (isAllChecked) {
+                        rows.delete(index)
+                      } else {
+                        rows.add(index)
+                      }
+                    })
+                    return { ...prev, rows }
+                  })
+                }}
+                style={checkboxStyle(isAllChecked)}
+              />
+            </div>
+          )
+        },
         size: 50,
         enableSorting: false,
         enableResizing: false,
@@ -590,8 +699,9 @@ export function AdvancedDataFrame({
           }
 
           // 親行の元のDataFrameインデックスを取得
-          const originalIndex = data.findIndex((item) => item === row.original)
-          const isChecked = selectedRowIndices.includes(originalIndex)
+          const { rowSelection, getOriginalIndex } = columnStateRef.current
+          const originalIndex = getOriginalIndex(row.original)
+          const isChecked = rowSelection.rows.has(originalIndex)
 
           return (
             <div className="flex items-center justify-center">
@@ -600,32 +710,26 @@ export function AdvancedDataFrame({
                 onCheckedChange={() => {
                   // ユーザー操作フラグを立てる
                   hasUserSelectedRef.current = true
-                  if (selectionMode === 'single-row') {
-                    // 単一選択モード: 同じ行をクリックで解除、別の行で置き換え
-                    setSelectedRowIndices(
-                      isChecked ? [] : [originalIndex],
-                    )
-                  } else {
+                  setRowSelection((prev) => {
+                    const wasChecked = prev.rows.has(originalIndex)
+                    if (selectionMode === 'single-row') {
+                      // 単一選択モード: 同じ行をクリックで解除、別の行で置き換え
+                      return {
+                        ...prev,
+                        rows: new Set(wasChecked ? [] : [originalIndex]),
+                      }
+                    }
                     // 複数選択モード: トグル動作
-                    setSelectedRowIndices((prev) =>
-                      isChecked
-                        ? prev.filter((idx) => idx !== originalIndex)
-                        : [...prev, originalIndex],
-                    )
-                  }
-                }}
-                style={{
-                  // ダークテーマ対応のボーダー色
-                  borderColor: isChecked
-                    ? theme.primaryColor
-                    : isDark
-                      ? 'rgba(250, 250, 250, 0.4)'
-                      : 'rgba(0, 0, 0, 0.3)',
-                  // チェック時の背景色をStreamlitテーマカラーに
-                  backgroundColor: isChecked
-                    ? theme.primaryColor
-                    : 'transparent',
+                    const rows = new Set(prev.rows)
+                    if (wasChecked) {
+                      rows.delete(originalIndex)
+                    } else {
+                      rows.add(originalIndex)
+                    }
+                    return { ...prev, rows }
+                  })
                 }}
+                style={checkboxStyle(isChecked)}
               />
             </div>
           )
@@ -661,25 +765,25 @@ export function AdvancedDataFrame({
     }
 
     return [...specialColumns, ...finalColumns]
-  }, [
-    columns,
-    columnHelper,
-    numericColumns,
-    booleanColumns,
-    selectionMode,
-    selectedRowIndices,
-    headerGroups,
-    columnTypeMap,
-    expandable,
-    estimateColumnWidth,
-    theme.primaryColor,
-    isDark,
-    data,
-  ])
+  }, [columnDefsSource, selectionMode, headerGroups, expandable])
+
+  // フラットなデータはソートエンジンでソートした行を渡す（同じ行に対して方向を
+  // 反転しただけの場合は前回の結果を使い回す）。階層データはサブ行もソートする
+  // ためTanStack Tableでソートする
+  const isManualSorting = isManualQuery || !expandable
+  const sortedData = useMemo(
+    () =>
+      isManualQuery || expandable
+        ? data
+        : Array.from(sortRowIndices(store, data, sorting)),
+    [isManualQuery, expandable, store, data, sorting],
+  )
+  // Workerの結果がない場合はメインスレッドでソートした行を表示
+  const tableData = engineState?.rowIndices ?? sortedData
 
   // TanStack Tableインスタンス作成
   const table = useReactTable({
-    data,
+    data: tableData,
     columns: tableColumns,
     state: {
       sorting,
@@ -693,14 +797,26 @@ export function AdvancedDataFrame({
     onColumnOrderChange: setTableColumnOrder,
     onColumnVisibilityChange: setColumnVisibility,
     onExpandedChange: setExpanded,
+    // ウィンドウモードではソート・フィルタはPython側、Workerモードでは
+    // Workerで適用済み（フラットなデータのソートはソートエンジンで適用済み）
+    manualSorting: isManualSorting,
+    manualFiltering: isManualQuery,
     getCoreRowModel: getCoreRowModel(),
     getSortedRowModel: getSortedRowModel(),
     getFilteredRowModel: getFilteredRowModel(),
     getExpandedRowModel: expandable ? getExpandedRowModel() : undefined,
-    getSubRows: expandable ? (row) => row[subRowsKey] as RowData[] : undefined,
+    getSubRows: expandable
+      ? (rowIndex) => store.children?.[rowIndex]
+      : undefined,
+    // サブ行の遅延読み込みでは、未読み込みのサブ行がある行も展開できる
+    getRowCanExpand: expandable
+      ? (row) =>
+          row.subRows.length > 0 || (store.childCounts?.[row.original] ?? 0) > 0
+      : undefined,
     columnResizeMode,
     enableSortingRemoval: true,
-    enableMultiSort: false, // Phase 1では単一カラムソートのみ
+    // Shift+クリックで複数カラムのソート（先にソートしたカラムを優先）
+    enableMultiSort: true,
     // カラムのデフォルトサイズを設定
     defaultColumn: {
       size: 200,
@@ -712,62 +828,85 @@ export function AdvancedDataFrame({
   // フィルタ・ソート後の行データを取得（依存配列用に変数として抽出）
   const tableRows = table.getRowModel().rows
 
+  // サブ行の遅延読み込み: 展開されたがサブ行が未読み込みの行があれば
+  // Pythonに要求（届くまでは同じ行を再度要求しない）
+  const requestedPathRef = useRef<string | null>(null)
+  useEffect(() => {
+    const { childCounts, rowPaths } = store
+    if (!childCounts || !rowPaths) return
+
+    const missing = tableRows.find(
+      (row) =>
+        row.getIsExpanded() &&
+        childCounts[row.original] > 0 &&
+        row.subRows.length === 0,
+    )
+    if (!missing) {
+      requestedPathRef.current = null
+      return
+    }
+    const pathKey = rowPaths[missing.original]
+    if (requestedPathRef.current === pathKey) return
+    requestedPathRef.current = pathKey
+    sendComponentValue({
+      expand: { path: pathKey.split('/').map(Number), requested: Date.now() },
+    })
+  }, [store, tableRows])
+
   /**
-   * 集計行の値を計算（フィルタ・ソート後のデータを使用、親行のみを対象）
+   * 集計行の集計方法（column_configのaggregate、未指定の場合は型から決定）
    * - 数値カラム: 合計
    * - Boolカラム: True率（%）
    * - その他: 空白
    */
-  const aggregationRow = useMemo(() => {
-    if (!showSummary) return null
-
-    // 親行のみを抽出（階層データの場合）
-    const parentRows = expandable
-      ? tableRows
-          .filter((row) => row.depth === 0) // 深度0が親行
-          .map((row) => row.original)
-      : tableRows.map((row) => row.original)
-
-    const aggregation: Record<string, string | number> = {}
-
-    columns.forEach((col) => {
-      const colId = col.id
-      const values = parentRows
-        .map((row) => row[colId])
-        .filter((val) => val != null)
-
-      if (values.length === 0) {
-        aggregation[colId] = ''
-        return
-      }
+  const aggregateSpecs = useMemo<AggregateSpec[]>(
+    () =>
+      columns.map((col) => ({
+        id: col.id,
+        kind:
+          col.aggregate ??
+          (col.meta?.type === 'number'
+            ? 'sum'
+            : col.meta?.type === 'boolean'
+              ? 'truePercent'
+              : 'none'),
+      })),
+    [columns],
+  )
 
-      // Boolean型カラムの場合: True率を計算
-      if (booleanColumns.has(colId)) {
-        const boolValues = values as boolean[]
-        const trueCount = boolValues.filter((v) => v === true).length
-        const percentage = (trueCount / boolValues.length) * 100
-        aggregation[colId] = `${Math.round(percentage)}%`
-        return
-      }
+  // 集計器（カラムの値を型付き配列で保持し、フィルタの変更時は差分で更新）
+  const summaryAggregator = useMemo(
+    () => createSummaryAggregator(store, aggregateSpecs),
+    [store, aggregateSpecs],
+  )
 
-      // 数値カラムの場合: 合計を計算
-      const allNumbers = values.every((val) => typeof val === 'number')
-      if (allNumbers) {
-        const sum = (values as number[]).reduce((acc, val) => acc + val, 0)
-        aggregation[colId] = sum
-        return
-      }
+  // フィルタ後の親行（フラットなデータではソート済みの行から作られるため、
+  // ソートのたびに変わる。集計は行の順序によらないため、データとフィルタが
+  // 変わった場合のみ集計し直し、最新の行はrefを通して参照する）
+  const filteredParentRows = table.getFilteredRowModel().rows
+  const filteredParentRowsRef = useRef(filteredParentRows)
+  filteredParentRowsRef.current = filteredParentRows
+  // 行の集合を決めるフィルタ（Workerの結果は計算に使ったフィルタ）
+  const summaryFilters = engineState?.filters ?? columnFilters
 
-      // その他（テキスト、日付など）: 空白
-      aggregation[colId] = ''
-    })
+  /**
+   * 集計行の値を計算（フィルタ後のデータを使用、親行のみを対象）
+   * ウィンドウモードでは全行を対象にPython側で計算した値を使用
+   */
+  const aggregationRow = useMemo(() => {
+    if (!showSummary) return null
+    if (summary) return summary
+    return summaryAggregator.update(
+      filteredParentRowsRef.current.map((row) => row.original),
+    )
+  }, [showSummary, summary, summaryAggregator, data, summaryFilters])
 
-    return aggregation
-  }, [showSummary, tableRows, columns, booleanColumns, expandable])
+  // 仮想スクロールの行数（ウィンドウモードでは未読み込みの行も含む全体の行数）
+  const virtualRowCount = rowCount ?? tableRows.length
 
   // 行の仮想化設定
   const rowVirtualizer = useVirtualizer({
-    count: tableRows.length,
+    count: virtualRowCount,
     getScrollElement: () => tableRef.current,
     estimateSize: () => ROW_HEIGHT,
     overscan: 10, // スクロール方向に10行余分にレンダリング
@@ -776,6 +915,62 @@ export function AdvancedDataFrame({
   const virtualRows = rowVirtualizer.getVirtualItems()
   const totalSize = rowVirtualizer.getTotalSize()
 
+  // ウィンドウモード: 表示範囲が読み込み済みの範囲の端に近づいたら次のウィンドウを要求
+  // （スクロール中の連続した要求を避けるためデバウンス）
+  const requestedOffsetRef = useRef(rowOffset)
+  const requestWindow = useDebouncedCallback((offset: number) => {
+    sendComponentValue({ window: { offset } })
+  }, 150)
+  const firstVisibleIndex = virtualRows[0]?.index ?? 0
+  const lastVisibleIndex = virtualRows[virtualRows.length - 1]?.index ?? 0
+
+  useEffect(() => {
+    if (rowCount === undefined || !windowSize) return
+
+    // 読み込み済み範囲の端から1/4ウィンドウ以内に入ったら先読み
+    const loadedEnd = rowOffset + data.length
+    const margin = Math.floor(windowSize / 4)
+    const needsPrevious =
+      rowOffset > 0 && firstVisibleIndex < rowOffset + margin
+    const needsNext =
+      loadedEnd < rowCount && lastVisibleIndex >= loadedEnd - margin
+    if (!needsPrevious && !needsNext) return
+
+    // 表示範囲が中央に来るウィンドウを要求
+    const center = Math.floor((firstVisibleIndex + lastVisibleIndex) / 2)
+    const offset = Math.max(
+      0,
+      Math.min(center - Math.floor(windowSize / 2), rowCount - windowSize),
+    )
+    if (offset === requestedOffsetRef.current) return
+    requestedOffsetRef.current = offset
+    requestWindow(offset)
+  }, [
+    rowCount,
+    windowSize,
+    rowOffset,
+    data.length,
+    firstVisibleIndex,
+    lastVisibleIndex,
+    requestWindow,
+  ])
+
+  // ウィンドウモード: ソート・フィルタが変わったらPython側に送信し、先頭のウィンドウを要求
+  const queryJsonRef = useRef(JSON.stringify([[], []]))
+  useEffect(() => {
+    if (!isWindowed) return
+
+    const filters = toQueryFilters(columnFilters)
+    const queryJson = JSON.stringify([sorting, filters])
+    if (queryJson === queryJsonRef.current) return
+    queryJsonRef.current = queryJson
+
+    requestWindow.cancel()
+    requestedOffsetRef.current = 0
+    rowVirtualizer.scrollToOffset(0)
+    sendComponentValue({ sorting, filters, window: { offset: 0 } })
+  }, [isWindowed, sorting, columnFilters, requestWindow, rowVirtualizer])
+
   // 枠線の色（テーマに応じて変更）
   const borderColor = isDark ? 'rgba(250, 250, 250, 0.2)' : 'rgba(0, 0, 0, 0.1)'
 
@@ -823,6 +1018,45 @@ export function AdvancedDataFrame({
     [shouldStretch, totalContentWidth],
   )
 
+  // カラム幅の状態（リサイズ時に行を再描画する）
+  const columnSizing = table.getState().columnSizing
+
+  /**
+   * カラムの仮想化（横方向）
+   * 横スクロールの表示範囲のカラムのみを描画する（数百カラムのデータ向け）
+   * カラムをコンテナ幅に伸縮する場合はすべてのカラムが表示範囲に収まるため
+   * 仮想化しない
+   */
+  const visibleLeafColumns = table.getVisibleLeafColumns()
+  const columnVirtualizer = useVirtualizer({
+    horizontal: true,
+    count: visibleLeafColumns.length,
+    getScrollElement: () => tableRef.current,
+    estimateSize: (index) => visibleLeafColumns[index].getSize(),
+    overscan: 3, // スクロール方向に3カラム余分にレンダリング
+  })
+
+  // カラム幅・表示・順序が変わったらカラムの位置を再計算
+  useEffect(() => {
+    columnVirtualizer.measure()
+  }, [columnVirtualizer, columnSizing, visibleLeafColumns])
+
+  const columnWindow = shouldStretch
+    ? null
+    : createColumnWindow(
+        columnVirtualizer.getVirtualItems(),
+        columnVirtualizer.getTotalSize(),
+      )
+  // 行・集計行で描画するセルの範囲と左右のスペーサーの幅
+  const columnStart = columnWindow?.startIndex ?? 0
+  const columnEnd = columnWindow?.endIndex ?? visibleLeafColumns.length
+  const columnPaddingLeft = columnWindow?.left ?? 0
+  const columnPaddingRight = columnWindow
+    ? columnWindow.totalWidth - columnWindow.right
+    : 0
+  // 描画するリーフカラム（プレースホルダ行・集計行用）
+  const renderedLeafColumns = visibleLeafColumns.slice(columnStart, columnEnd)
+
   // カラム順序の初期化（tableColumnsが変更されたとき）
   useEffect(() => {
     if (tableColumnOrder.length === 0) {
@@ -866,26 +1100,39 @@ export function AdvancedDataFrame({
    */
   const searchMatches = useMemo(() => {
     if (!searchQuery.trim()) return []
+    // Workerの結果がある場合は一致箇所もWorkerで計算済み
+    if (engineState) return engineState.searchMatches
 
-    const matches: CellPosition[] = []
-    const query = searchQuery.toLowerCase()
-
-    table.getRowModel().rows.forEach((row, rowIndex) => {
-      columnIds.forEach((columnId) => {
-        // 選択カラムはスキップ
-        if (columnId === '__selection__') return
-
-        const cellValue = row.getValue(columnId)
-        const cellText = String(cellValue ?? '').toLowerCase()
-
-        if (cellText.includes(query)) {
-          matches.push({ rowIndex, columnId })
-        }
-      })
-    })
+    // トライグラム索引で一致する行を求め、表示位置に変換
+    const positions = displayPositions(
+      store.rowCount,
+      tableRows.map((row) => row.original),
+    )
+    // 選択・展開カラムはスキップ
+    const searchColumns = columnIds.filter(
+      (columnId) => columnId !== '__selection__' && columnId !== '__expander__',
+    )
 
-    return matches
-  }, [searchQuery, table, columnIds])
+    // ウィンドウモードでは全体の行位置に変換
+    return findSearchMatches(
+      store,
+      searchColumns,
+      searchQuery,
+      positions,
+      datetimeMetaMap,
+    ).map(({ rowIndex, columnId }) => ({
+      rowIndex: rowOffset + rowIndex,
+      columnId,
+    }))
+  }, [
+    searchQuery,
+    engineState,
+    tableRows,
+    store,
+    columnIds,
+    rowOffset,
+    datetimeMetaMap,
+  ])
 
   // 総一致件数
   const totalMatches = searchMatches.length
@@ -983,100 +1230,62 @@ export function AdvancedDataFrame({
   }, [])
 
   /**
-   * セルが検索一致箇所かどうかをチェック
+   * 検索の一致箇所（行→一致したカラムIDの集合）
+   * 行コンポーネントには行ごとの集合を渡し、セルごとの判定を定数時間にする
    */
-  const isCellMatched = useCallback(
-    (rowIndex: number, columnId: string): boolean => {
-      if (!searchQuery.trim()) return false
-      return searchMatches.some(
-        (match) => match.rowIndex === rowIndex && match.columnId === columnId,
-      )
-    },
+  const matchesByRow = useMemo(
+    () =>
+      searchQuery.trim()
+        ? groupMatchesByRow(searchMatches)
+        : new Map<number, Set<string>>(),
     [searchQuery, searchMatches],
   )
 
-  /**
-   * セルが現在の一致箇所かどうかをチェック
-   */
-  const isCurrentMatch = useCallback(
-    (rowIndex: number, columnId: string): boolean => {
-      if (currentMatchIndex === 0 || totalMatches === 0) return false
-      const currentMatch = searchMatches[currentMatchIndex - 1]
-      return (
-        currentMatch?.rowIndex === rowIndex &&
-        currentMatch?.columnId === columnId
-      )
-    },
-    [currentMatchIndex, totalMatches, searchMatches],
-  )
+  // 現在の一致箇所
+  const currentMatch =
+    currentMatchIndex > 0 && totalMatches > 0
+      ? searchMatches[currentMatchIndex - 1]
+      : undefined
 
   /**
-   * セルが選択範囲に含まれるかチェック
+   * セル選択範囲（行→選択されているカラムのマスク）
+   * 選択範囲を行の区間ごとのマスクにしておき、セルごとに選択範囲を走査しない
+   * 同じ区間の行は同じマスクになるため、選択範囲外の行は再描画されない
    */
-  const isCellSelected = useCallback(
-    (rowIndex: number, columnId: string): boolean => {
-      const colIndex = columnIds.indexOf(columnId)
-      if (colIndex === -1) return false
-
-      return selectedCells.some((selection) => {
-        const startColIndex = columnIds.indexOf(selection.start.columnId)
-        const endColIndex = columnIds.indexOf(selection.end.columnId)
-        const minRow = Math.min(
-          selection.start.rowIndex,
-          selection.end.rowIndex,
-        )
-        const maxRow = Math.max(
-          selection.start.rowIndex,
-          selection.end.rowIndex,
-        )
-        const minCol = Math.min(startColIndex, endColIndex)
-        const maxCol = Math.max(startColIndex, endColIndex)
-
-        return (
-          rowIndex >= minRow &&
-          rowIndex <= maxRow &&
-          colIndex >= minCol &&
-          colIndex <= maxCol
-        )
-      })
-    },
+  const selectionMasks = useMemo(
+    () => createSelectionMasks(selectedCells, columnIds),
     [selectedCells, columnIds],
   )
 
-  /**
-   * 選択範囲の境界ボーダーを取得
-   * @returns 上下左右のボーダーが必要かどうか
-   */
-  const getSelectionBorders = useCallback(
-    (
-      rowIndex: number,
-      columnId: string,
-    ): { top: boolean; right: boolean; bottom: boolean; left: boolean } => {
-      const colIndex = columnIds.indexOf(columnId)
-      if (colIndex === -1 || !isCellSelected(rowIndex, columnId)) {
-        return { top: false, right: false, bottom: false, left: false }
-      }
-
-      // 上下左右の隣接セルが選択されているかチェック
-      const topSelected = isCellSelected(rowIndex - 1, columnId)
-      const bottomSelected = isCellSelected(rowIndex + 1, columnId)
-      const leftSelected =
-        colIndex > 0 ? isCellSelected(rowIndex, columnIds[colIndex - 1]) : false
-      const rightSelected =
-        colIndex < columnIds.length - 1
-          ? isCellSelected(rowIndex, columnIds[colIndex + 1])
-          : false
+  // カラムIDからマスクの位置へのマップ
+  const columnPositions = useMemo(
+    () => new Map(columnIds.map((id, i) => [id, i])),
+    [columnIds],
+  )
 
-      return {
-        top: !topSelected,
-        right: !rightSelected,
-        bottom: !bottomSelected,
-        left: !leftSelected,
-      }
-    },
-    [columnIds, isCellSelected],
+  // 行の描画に使う色（テーマが変わった場合のみ作り直す）
+  const rowColors = useMemo<RowColors>(
+    () => ({
+      isDark,
+      primaryColor: theme.primaryColor,
+      borderColor,
+      headerNormalBgColor,
+      headerHoverBgColor,
+      rowHoverBgColor,
+    }),
+    [
+      isDark,
+      theme.primaryColor,
+      borderColor,
+      headerNormalBgColor,
+      headerHoverBgColor,
+      rowHoverBgColor,
+    ],
   )
 
+  // 選択・展開カラムの数（ツリー線を表示する最初のデータカラムの判定用）
+  const specialColumnsCount = (selectionMode ? 1 : 0) + (expandable ? 1 : 0)
+
   /**
    * セルのマウスダウンイベント: 選択開始
    */
@@ -1088,8 +1297,7 @@ export function AdvancedDataFrame({
       }
 
       const position: CellPosition = { rowIndex, columnId }
-      setSelectionStart(position)
-      setIsSelecting(true)
+      selectionStartRef.current = position
 
       // Ctrl/Cmd + クリック: 選択範囲を追加
       if (event.metaKey || event.ctrlKey) {
@@ -1099,19 +1307,22 @@ export function AdvancedDataFrame({
         ])
       }
       // Shift + クリック: 既存の選択を拡張
-      else if (event.shiftKey && selectedCells.length > 0) {
-        const lastSelection = selectedCells[selectedCells.length - 1]
-        setSelectedCells((prev) => [
-          ...prev.slice(0, -1),
-          { start: lastSelection.start, end: position },
-        ])
+      else if (event.shiftKey) {
+        setSelectedCells((prev) =>
+          prev.length > 0
+            ? [
+                ...prev.slice(0, -1),
+                { start: prev[prev.length - 1].start, end: position },
+              ]
+            : [{ start: position, end: position }],
+        )
       }
       // 通常のクリック: 選択をリセット
       else {
         setSelectedCells([{ start: position, end: position }])
       }
     },
-    [selectedCells],
+    [],
   )
 
   /**
@@ -1119,7 +1330,8 @@ export function AdvancedDataFrame({
    */
   const handleCellMouseEnter = useCallback(
     (rowIndex: number, columnId: string) => {
-      if (!isSelecting || !selectionStart) return
+      const selectionStart = selectionStartRef.current
+      if (!selectionStart) return
 
       const position: CellPosition = { rowIndex, columnId }
       setSelectedCells((prev) => {
@@ -1131,7 +1343,7 @@ export function AdvancedDataFrame({
         return [newSelection]
       })
     },
-    [isSelecting, selectionStart],
+    [],
   )
 
   /**
@@ -1139,14 +1351,12 @@ export function AdvancedDataFrame({
    */
   useEffect(() => {
     const handleMouseUp = () => {
-      setIsSelecting(false)
+      selectionStartRef.current = null
     }
 
-    if (isSelecting) {
-      document.addEventListener('mouseup', handleMouseUp)
-      return () => document.removeEventListener('mouseup', handleMouseUp)
-    }
-  }, [isSelecting])
+    document.addEventListener('mouseup', handleMouseUp)
+    return () => document.removeEventListener('mouseup', handleMouseUp)
+  }, [])
 
   /**
    * テーブル外クリック: 選択範囲をクリア
@@ -1209,8 +1419,12 @@ export function AdvancedDataFrame({
             const rowData: string[] = []
             for (let colIndex = minCol; colIndex <= maxCol; colIndex++) {
               const columnId = columnIds[colIndex]
-              const value = rows[rowIndex]?.getValue(columnId)
-              rowData.push(value != null ? String(value) : '')
+              // 文字列化したセルのテキストはキャッシュを使用
+              const row = rows[rowIndex - rowOffset]
+              const meta = datetimeMetaMap.get(columnId)
+              rowData.push(
+                row ? getCellText(store, row.original, columnId, meta) : '',
+              )
             }
             tsvData.push(rowData.join('\t'))
           }
@@ -1227,18 +1441,23 @@ export function AdvancedDataFrame({
 
     document.addEventListener('keydown', handleKeyDown)
     return () => document.removeEventListener('keydown', handleKeyDown)
-  }, [selectedCells, table, columnIds])
+  }, [selectedCells, table, store, columnIds, rowOffset, datetimeMetaMap])
 
   // 行選択状態が変更されたらStreamlitへ通知（ユーザー操作時のみ）
   useEffect(() => {
     if (selectionMode && hasUserSelectedRef.current) {
-      Streamlit.setComponentValue(selectedRowIndices)
+      // 区間で返す場合は昇順の区間に変換して送る（大量の行の選択を小さく送る）
+      sendComponentValue(
+        sendsSelectionRanges
+          ? { selection_ranges: selectionRanges(rowSelection.rows) }
+          : { selection: Array.from(rowSelection.rows) },
+      )
     }
-  }, [selectedRowIndices, selectionMode])
+  }, [rowSelection, selectionMode, sendsSelectionRanges])
 
   // FilterStatus用の値を計算
-  const totalRows = data.length
-  const filteredRows = table.getRowModel().rows.length
+  const totalRows = totalRowCount ?? store.topLevelCount
+  const filteredRows = rowCount ?? table.getRowModel().rows.length
   const isFiltered = columnFilters.length > 0
 
   // カラムがない場合は空のヘッダ + empty行を表示
@@ -1342,210 +1561,225 @@ export function AdvancedDataFrame({
             }}
           >
             {/* ヘッダ行 */}
-            {table.getHeaderGroups().map((headerGroup) => (
-              <tr
-                key={headerGroup.id}
-                style={{
-                  display: 'flex',
-                  width: '100%',
-                }}
-              >
-                {headerGroup.headers.map((header, headerIndex) => {
-                  const isFirstColumn = headerIndex === 0
-
-                  // グループヘッダかどうか（子カラムを持つ場合）
-                  const isGroupHeader =
-                    header.subHeaders && header.subHeaders.length > 0
-                  const isHovered = hoveredHeaderId === header.id
-                  const isNumeric = numericColumns.has(header.column.id)
-                  const isBoolean = booleanColumns.has(header.column.id)
-                  const isSelectionColumn = header.column.id === '__selection__'
-                  const isExpanderColumn = header.column.id === '__expander__'
-                  const isDragging = draggedColumnId === header.column.id
-                  // グループヘッダ、選択カラム、展開カラムはドラッグ不可
-                  const isDraggable =
-                    !isSelectionColumn && !isExpanderColumn && !isGroupHeader
+            {table.getHeaderGroups().map((headerGroup) => {
+              // 描画範囲にかかるヘッダのみ描画（カラムの仮想化）
+              const { indices, paddingLeft, paddingRight } = windowHeaders(
+                headerGroup.headers,
+                columnWindow,
+              )
+              return (
+                <tr
+                  key={headerGroup.id}
+                  style={{
+                    display: 'flex',
+                    width: '100%',
+                  }}
+                >
+                  <ColumnSpacer width={paddingLeft} isHeader />
+                  {headerGroup.headers.map((header, headerIndex) => {
+                    if (!indices.has(headerIndex)) return null
+                    const isFirstColumn = headerIndex === 0
+
+                    // グループヘッダかどうか（子カラムを持つ場合）
+                    const isGroupHeader =
+                      header.subHeaders && header.subHeaders.length > 0
+                    const isHovered = hoveredHeaderId === header.id
+                    const isNumeric = numericColumns.has(header.column.id)
+                    const isBoolean = booleanColumns.has(header.column.id)
+                    const isSelectionColumn =
+                      header.column.id === '__selection__'
+                    const isExpanderColumn = header.column.id === '__expander__'
+                    const isDragging = draggedColumnId === header.column.id
+                    // グループヘッダ、選択カラム、展開カラムはドラッグ不可
+                    const isDraggable =
+                      !isSelectionColumn && !isExpanderColumn && !isGroupHeader
 
-                  return (
-                    <th
-                      key={header.id}
-                      colSpan={header.colSpan}
-                      draggable={isDraggable}
-                      onDragStart={
-                        isDraggable
-                          ? (e) => handleColumnDragStart(header.column.id, e)
-                          : undefined
-                      }
-                      onDragOver={
-                        isDraggable ? handleColumnDragOver : undefined
-                      }
-                      onDrop={
-                        isDraggable
-                          ? (e) => handleColumnDrop(header.column.id, e)
-                          : undefined
-                      }
-                      onDragEnd={isDraggable ? handleColumnDragEnd : undefined}
-                      className={cn(
-                        'px-3 text-sm font-light transition-colors duration-150 select-none',
-                        isBoolean
-                          ? 'text-center'
-                          : isNumeric
-                            ? 'text-right'
-                            : 'text-left',
-                        // グループヘッダ、選択カラム、展開カラムはソート不可
-                        !isGroupHeader &&
+                    return (
+                      <th
+                        key={header.id}
+                        colSpan={header.colSpan}
+                        draggable={isDraggable}
+                        onDragStart={
+                          isDraggable
+                            ? (e) => handleColumnDragStart(header.column.id, e)
+                            : undefined
+                        }
+                        onDragOver={
+                          isDraggable ? handleColumnDragOver : undefined
+                        }
+                        onDrop={
+                          isDraggable
+                            ? (e) => handleColumnDrop(header.column.id, e)
+                            : undefined
+                        }
+                        onDragEnd={
+                          isDraggable ? handleColumnDragEnd : undefined
+                        }
+                        className={cn(
+                          'px-3 text-sm font-light transition-colors duration-150 select-none',
+                          isBoolean
+                            ? 'text-center'
+                            : isNumeric
+                              ? 'text-right'
+                              : 'text-left',
+                          // グループヘッダ、選択カラム、展開カラムはソート不可
+                          !isGroupHeader &&
+                            !isSelectionColumn &&
+                            !isExpanderColumn &&
+                            header.column.getCanSort()
+                            ? 'cursor-pointer'
+                            : 'cursor-default',
+                        )}
+                        style={{
+                          display: 'flex',
+                          alignItems: 'center',
+                          width: getColumnWidth(header.getSize()),
+                          minWidth: header.column.columnDef.minSize ?? 50,
+                          flexGrow: shouldStretch ? 1 : 0,
+                          flexShrink: 0,
+                          height: `${ROW_HEIGHT}px`,
+                          boxSizing: 'border-box',
+                          paddingTop: '0.4375rem',
+                          paddingBottom: '0.4375rem',
+                          backgroundColor: isHovered
+                            ? headerHoverBgColor
+                            : headerNormalBgColor,
+                          borderTop: 'none',
+                          borderLeft: isFirstColumn
+                            ? 'none'
+                            : `1px solid ${borderColor}`,
+                          borderRight: 'none',
+                          borderBottom: `1px solid ${borderColor}`,
+                          opacity: isDragging ? 0.5 : 1,
+                          position: 'relative',
+                          overflow: 'hidden',
+                          zIndex: 100 - headerIndex,
+                        }}
+                        onClick={
+                          !isGroupHeader &&
                           !isSelectionColumn &&
-                          !isExpanderColumn &&
-                          header.column.getCanSort()
-                          ? 'cursor-pointer'
-                          : 'cursor-default',
-                      )}
-                      style={{
-                        display: 'flex',
-                        alignItems: 'center',
-                        width: getColumnWidth(header.getSize()),
-                        minWidth: header.column.columnDef.minSize ?? 50,
-                        flexGrow: shouldStretch ? 1 : 0,
-                        flexShrink: 0,
-                        height: `${ROW_HEIGHT}px`,
-                        boxSizing: 'border-box',
-                        paddingTop: '0.4375rem',
-                        paddingBottom: '0.4375rem',
-                        backgroundColor: isHovered
-                          ? headerHoverBgColor
-                          : headerNormalBgColor,
-                        borderTop: 'none',
-                        borderLeft: isFirstColumn
-                          ? 'none'
-                          : `1px solid ${borderColor}`,
-                        borderRight: 'none',
-                        borderBottom: `1px solid ${borderColor}`,
-                        opacity: isDragging ? 0.5 : 1,
-                        position: 'relative',
-                        overflow: 'hidden',
-                        zIndex: 100 - headerIndex,
-                      }}
-                      onClick={
-                        !isGroupHeader &&
-                        !isSelectionColumn &&
-                        !isExpanderColumn
-                          ? header.column.getToggleSortingHandler()
-                          : undefined
-                      }
-                      onMouseEnter={() => setHoveredHeaderId(header.id)}
-                      onMouseLeave={() => setHoveredHeaderId(null)}
-                    >
-                      <div className="flex w-full items-center justify-between opacity-70">
-                        <div className="flex items-center gap-1 overflow-hidden">
-                          <span className="overflow-hidden text-ellipsis whitespace-nowrap">
-                            {flexRender(
-                              header.column.columnDef.header,
-                              header.getContext(),
-                            )}
-                          </span>
-                          {/* ソートインジケーター（グループヘッダ以外で、ソート中のみ表示） */}
+                          !isExpanderColumn
+                            ? header.column.getToggleSortingHandler()
+                            : undefined
+                        }
+                        onMouseEnter={() => setHoveredHeaderId(header.id)}
+                        onMouseLeave={() => setHoveredHeaderId(null)}
+                      >
+                        <div className="flex w-full items-center justify-between opacity-70">
+                          <div className="flex items-center gap-1 overflow-hidden">
+                            <span className="overflow-hidden text-ellipsis whitespace-nowrap">
+                              {flexRender(
+                                header.column.columnDef.header,
+                                header.getContext(),
+                              )}
+                            </span>
+                            {/* ソートインジケーター（グループヘッダ以外で、ソート中のみ表示） */}
+                            {!isGroupHeader &&
+                              header.column.getCanSort() &&
+                              header.column.getIsSorted() && (
+                                <span className="shrink-0 text-xs opacity-60">
+                                  {header.column.getIsSorted() === 'asc'
+                                    ? '↑'
+                                    : '↓'}
+                                </span>
+                              )}
+                          </div>
+                          {/* フィルタアイコン（グループヘッダ以外で、フィルタ有効カラムのみ、右端に配置） */}
                           {!isGroupHeader &&
-                            header.column.getCanSort() &&
-                            header.column.getIsSorted() && (
-                              <span className="shrink-0 text-xs opacity-60">
-                                {header.column.getIsSorted() === 'asc'
-                                  ? '↑'
-                                  : '↓'}
-                              </span>
+                            columnTypeMap.has(header.column.id) && (
+                              <ColumnFilter
+                                column={header.column}
+                                columnType={
+                                  columnTypeMap.get(header.column.id)!
+                                }
+                                uniqueValues={uniqueValuesMap.get(
+                                  header.column.id,
+                                )}
+                                onOpenChange={(open) => {
+                                  // Popover開いている間はヘッダのホバー状態をクリア
+                                  if (open) {
+                                    setHoveredHeaderId(null)
+                                  }
+                                }}
+                                onPopoverMouseEnter={() => {
+                                  // Popoverコンテンツにマウスが入ったらヘッダのホバー状態をクリア
+                                  setHoveredHeaderId(null)
+                                }}
+                              />
                             )}
                         </div>
-                        {/* フィルタアイコン（グループヘッダ以外で、フィルタ有効カラムのみ、右端に配置） */}
-                        {!isGroupHeader &&
-                          columnTypeMap.has(header.column.id) && (
-                            <ColumnFilter
-                              column={header.column}
-                              columnType={columnTypeMap.get(header.column.id)!}
-                              uniqueValues={uniqueValuesMap.get(
-                                header.column.id,
-                              )}
-                              onOpenChange={(open) => {
-                                // Popover開いている間はヘッダのホバー状態をクリア
-                                if (open) {
-                                  setHoveredHeaderId(null)
-                                }
-                              }}
-                              onPopoverMouseEnter={() => {
-                                // Popoverコンテンツにマウスが入ったらヘッダのホバー状態をクリア
-                                setHoveredHeaderId(null)
-                              }}
-                            />
-                          )}
-                      </div>
 
-                      {/* カラムリサイズハンドル（グループヘッダ以外） */}
-                      {!isGroupHeader && header.column.getCanResize() && (
-                        <div
-                          onClick={(e) => {
-                            e.stopPropagation() // ソートハンドラーの発火を防止
-                          }}
-                          onMouseDown={(e) => {
-                            e.preventDefault() // 親要素のdraggableイベントを抑制
-                            e.stopPropagation() // カラム並び替えのドラッグと競合しないようにする
-                            header.getResizeHandler()(e)
-                          }}
-                          onTouchStart={(e) => {
-                            e.preventDefault() // 親要素のdraggableイベントを抑制
-                            e.stopPropagation() // カラム並び替えのドラッグと競合しないようにする
-                            header.getResizeHandler()(
-                              e as unknown as React.MouseEvent,
-                            )
-                          }}
-                          className="resize-handle absolute top-0 h-full w-2.5 cursor-col-resize touch-none select-none"
-                          style={{
-                            right: '-5px', // カラム境界線の両側に配置（左右5pxずつ）
-                            opacity: header.column.getIsResizing() ? 1 : 0.15, // 通常時も薄く表示
-                            transition: 'opacity 0.15s ease',
-                            zIndex: 1, // 親th内で最前面
-                          }}
-                          onMouseEnter={(e) => {
-                            if (!header.column.getIsResizing()) {
-                              const handleElement =
-                                e.currentTarget as HTMLElement
-                              const thElement =
-                                handleElement.parentElement as HTMLElement
-                              handleElement.style.opacity = '0.6' // ホバー時に濃く表示
-                              if (thElement) {
-                                thElement.style.zIndex = '31' // 親th要素を最前面に
+                        {/* カラムリサイズハンドル（グループヘッダ以外） */}
+                        {!isGroupHeader && header.column.getCanResize() && (
+                          <div
+                            onClick={(e) => {
+                              e.stopPropagation() // ソートハンドラーの発火を防止
+                            }}
+                            onMouseDown={(e) => {
+                              e.preventDefault() // 親要素のdraggableイベントを抑制
+                              e.stopPropagation() // カラム並び替えのドラッグと競合しないようにする
+                              header.getResizeHandler()(e)
+                            }}
+                            onTouchStart={(e) => {
+                              e.preventDefault() // 親要素のdraggableイベントを抑制
+                              e.stopPropagation() // カラム並び替えのドラッグと競合しないようにする
+                              header.getResizeHandler()(
+                                e as unknown as React.MouseEvent,
+                              )
+                            }}
+                            className="resize-handle absolute top-0 h-full w-2.5 cursor-col-resize touch-none select-none"
+                            style={{
+                              right: '-5px', // カラム境界線の両側に配置（左右5pxずつ）
+                              opacity: header.column.getIsResizing() ? 1 : 0.15, // 通常時も薄く表示
+                              transition: 'opacity 0.15s ease',
+                              zIndex: 1, // 親th内で最前面
+                            }}
+                            onMouseEnter={(e) => {
+                              if (!header.column.getIsResizing()) {
+                                const handleElement =
+                                  e.currentTarget as HTMLElement
+                                const thElement =
+                                  handleElement.parentElement as HTMLElement
+                                handleElement.style.opacity = '0.6' // ホバー時に濃く表示
+                                if (thElement) {
+                                  thElement.style.zIndex = '31' // 親th要素を最前面に
+                                }
                               }
-                            }
-                          }}
-                          onMouseLeave={(e) => {
-                            if (!header.column.getIsResizing()) {
-                              const handleElement =
-                                e.currentTarget as HTMLElement
-                              const thElement =
-                                handleElement.parentElement as HTMLElement
-                              handleElement.style.opacity = '0.15' // 元に戻す
-                              if (thElement) {
-                                thElement.style.zIndex = '' // z-indexをリセット
+                            }}
+                            onMouseLeave={(e) => {
+                              if (!header.column.getIsResizing()) {
+                                const handleElement =
+                                  e.currentTarget as HTMLElement
+                                const thElement =
+                                  handleElement.parentElement as HTMLElement
+                                handleElement.style.opacity = '0.15' // 元に戻す
+                                if (thElement) {
+                                  thElement.style.zIndex = '' // z-indexをリセット
+                                }
                               }
-                            }
-                          }}
-                        >
-                          <div className="h-full w-full" />
-                        </div>
-                      )}
-                    </th>
-                  )
-                })}
-              </tr>
-            ))}
+                            }}
+                          >
+                            <div className="h-full w-full" />
+                          </div>
+                        )}
+                      </th>
+                    )
+                  })}
+                  <ColumnSpacer width={paddingRight} isHeader />
+                </tr>
+              )
+            })}
           </thead>
           <tbody
             style={{
               display: 'grid',
-              height: data.length === 0 ? `${ROW_HEIGHT}px` : `${totalSize}px`,
+              height: totalRows === 0 ? `${ROW_HEIGHT}px` : `${totalSize}px`,
               position: 'relative',
               zIndex: 10,
             }}
           >
             {/* 空データ時の「empty」行（セル結合で中央表示） */}
-            {data.length === 0 && (
+            {totalRows === 0 && (
               <tr
                 style={{
                   display: 'flex',
@@ -1574,233 +1808,104 @@ export function AdvancedDataFrame({
               </tr>
             )}
             {virtualRows.map((virtualRow, virtualIndex) => {
-              const row = table.getRowModel().rows[virtualRow.index]
-              if (!row) return null
+              const row = table.getRowModel().rows[virtualRow.index - rowOffset]
               const rowIndex = virtualRow.index
-              const isLastRow = rowIndex === table.getRowModel().rows.length - 1
-              // 仮想スクロールで表示されている最後の行（集計行がない場合のボーダー制御）
-              const isLastVirtualRow = virtualIndex === virtualRows.length - 1
-              const isRowHovered = hoveredRowIndex === rowIndex
-              // 行選択のハイライト判定: 元データのインデックスで比較
-              const rowOriginalIndex =
-                row.depth === 0
-                  ? data.findIndex((item) => item === row.original)
-                  : -1
-              const isRowSelected =
-                selectionMode &&
-                rowOriginalIndex !== -1 &&
-                selectedRowIndices.includes(rowOriginalIndex)
-
-              return (
-                <tr
-                  key={row.id}
-                  style={{
-                    display: 'flex',
-                    position: 'absolute',
-                    width: '100%',
-                    height: `${virtualRow.size}px`,
-                    transform: `translateY(${virtualRow.start}px)`,
-                  }}
-                  onMouseEnter={() => setHoveredRowIndex(rowIndex)}
-                  onMouseLeave={() => setHoveredRowIndex(null)}
-                >
-                  {row.getVisibleCells().map((cell, cellIndex) => {
-                    const isFirstColumn = cellIndex === 0
-
-                    // 選択範囲がないときは選択判定をスキップ（パフォーマンス最適化）
-                    const isSelected =
-                      selectedCells.length > 0
-                        ? isCellSelected(rowIndex, cell.column.id)
-                        : false
-                    const selectionBorders =
-                      selectedCells.length > 0
-                        ? getSelectionBorders(rowIndex, cell.column.id)
-                        : {
-                            top: false,
-                            right: false,
-                            bottom: false,
-                            left: false,
-                          }
-                    const isNumeric = numericColumns.has(cell.column.id)
-                    const isBoolean = booleanColumns.has(cell.column.id)
-                    const isSelectionColumn = cell.column.id === '__selection__'
-                    const isExpanderColumn = cell.column.id === '__expander__'
-                    // 検索クエリがないときは一致判定をスキップ（パフォーマンス最適化）
-                    const isMatched = searchQuery
-                      ? isCellMatched(rowIndex, cell.column.id)
-                      : false
-                    const isCurrentMatchCell = searchQuery
-                      ? isCurrentMatch(rowIndex, cell.column.id)
-                      : false
-
-                    // 最初のデータカラムかどうか（ツリー線表示用）
-                    const specialColumnsCount =
-                      (selectionMode ? 1 : 0) + (expandable ? 1 : 0)
-                    const isFirstDataColumn = cellIndex === specialColumnsCount
-
-                    // ツリー線の深さとインデント
-                    const depth = row.depth
-                    const indentSize = 24 // px per level
-
-                    return (
+              const isLastRow = rowIndex === virtualRowCount - 1
+              // ウィンドウモードで未読み込みの行はプレースホルダを表示
+              if (!row) {
+                if (!isWindowed) return null
+                return (
+                  <tr
+                    key={`placeholder-${rowIndex}`}
+                    style={{
+                      display: 'flex',
+                      position: 'absolute',
+                      width: '100%',
+                      height: `${virtualRow.size}px`,
+                      transform: `translateY(${virtualRow.start}px)`,
+                    }}
+                  >
+                    <ColumnSpacer width={columnPaddingLeft} />
+                    {renderedLeafColumns.map((column, i) => (
                       <td
-                        key={cell.id}
-                        className={cn(
-                          'relative px-3 text-sm select-none',
-                          isSelectionColumn || isExpanderColumn
-                            ? ''
-                            : 'cursor-cell',
-                          isBoolean
-                            ? 'text-center'
-                            : isNumeric
-                              ? 'text-right'
-                              : 'text-left',
-                        )}
+                        key={column.id}
+                        className="px-3 text-sm"
                         style={{
                           display: 'flex',
                           alignItems: 'center',
-                          justifyContent: isBoolean
-                            ? 'center'
-                            : isNumeric
-                              ? 'flex-end'
-                              : 'flex-start',
-                          width: getColumnWidth(cell.column.getSize()),
-                          minWidth: cell.column.columnDef.minSize ?? 50,
+                          width: getColumnWidth(column.getSize()),
+                          minWidth: column.columnDef.minSize ?? 50,
                           flexGrow: shouldStretch ? 1 : 0,
                           flexShrink: 0,
                           height: `${ROW_HEIGHT}px`,
                           boxSizing: 'border-box',
-                          paddingTop: '0.4375rem',
-                          paddingBottom: '0.4375rem',
-                          borderTop: 'none',
-                          borderLeft: isFirstColumn
-                            ? 'none'
-                            : `1px solid ${borderColor}`,
-                          borderRight: 'none',
-                          borderBottom:
-                            isLastRow || (isLastVirtualRow && !showSummary)
+                          borderLeft:
+                            columnStart + i === 0
                               ? 'none'
                               : `1px solid ${borderColor}`,
-                          backgroundColor:
-                            isSelectionColumn || isExpanderColumn
-                              ? isRowSelected
-                                ? isDark
-                                  ? 'rgba(239, 68, 68, 0.15)'
-                                  : 'rgba(239, 68, 68, 0.1)'
-                                : isRowHovered
-                                  ? headerHoverBgColor
-                                  : headerNormalBgColor
-                              : isCurrentMatchCell
-                                ? isDark
-                                  ? 'rgba(239, 68, 68, 0.3)'
-                                  : 'rgba(239, 68, 68, 0.25)'
-                                : isMatched
-                                  ? isDark
-                                    ? 'rgba(239, 68, 68, 0.15)'
-                                    : 'rgba(239, 68, 68, 0.1)'
-                                  : isSelected
-                                    ? isDark
-                                      ? `${theme.primaryColor}20`
-                                      : `${theme.primaryColor}15`
-                                    : isRowSelected
-                                      ? isDark
-                                        ? 'rgba(239, 68, 68, 0.15)'
-                                        : 'rgba(239, 68, 68, 0.1)'
-                                      : isRowHovered
-                                        ? rowHoverBgColor
-                                        : 'transparent',
-                          overflow: 'hidden',
-                          transition: 'background-color 0.1s ease',
+                          borderBottom: isLastRow
+                            ? 'none'
+                            : `1px solid ${borderColor}`,
+                          color: isDark ? '#6b7280' : '#9ca3af',
                         }}
-                        onMouseDown={
-                          isSelectionColumn || isExpanderColumn
-                            ? undefined
-                            : (e) =>
-                                handleCellMouseDown(rowIndex, cell.column.id, e)
-                        }
-                        onMouseEnter={
-                          isSelectionColumn || isExpanderColumn
-                            ? undefined
-                            : () =>
-                                handleCellMouseEnter(rowIndex, cell.column.id)
-                        }
                       >
-                        {/* 上の境界線（横線） */}
-                        {selectionBorders.top && (
-                          <span
-                            className="pointer-events-none absolute z-20"
-                            style={{
-                              backgroundColor: theme.primaryColor,
-                              top: 0,
-                              left: 0,
-                              height: '1px',
-                              width: 'calc(100% + 0.5px)', // セル間のボーダーを確実にカバー
-                            }}
-                          />
-                        )}
-                        {/* 下の境界線（横線） */}
-                        {selectionBorders.bottom && (
-                          <span
-                            className="pointer-events-none absolute z-20"
-                            style={{
-                              backgroundColor: theme.primaryColor,
-                              bottom: 0,
-                              left: 0,
-                              height: '1px',
-                              width: 'calc(100% + 0.5px)', // セル間のボーダーを確実にカバー
-                            }}
-                          />
-                        )}
-                        {/* 左の境界線（縦線） */}
-                        {selectionBorders.left && (
-                          <span
-                            className="pointer-events-none absolute z-20"
-                            style={{
-                              backgroundColor: theme.primaryColor,
-                              left: 0,
-                              top: 0,
-                              width: '1px',
-                              height: 'calc(100% + 0.5px)', // セル間のボーダーを確実にカバー
-                            }}
-                          />
-                        )}
-                        {/* 右の境界線（縦線） */}
-                        {selectionBorders.right && (
-                          <span
-                            className="pointer-events-none absolute z-20"
-                            style={{
-                              backgroundColor: theme.primaryColor,
-                              right: 0,
-                              top: 0,
-                              width: '1px',
-                              height: 'calc(100% + 0.5px)', // セル間のボーダーを確実にカバー
-                            }}
-                          />
-                        )}
-                        <div className="overflow-hidden text-ellipsis whitespace-nowrap">
-                          {isFirstDataColumn && depth > 0 ? (
-                            <div
-                              className="overflow-hidden text-ellipsis whitespace-nowrap"
-                              style={{
-                                paddingLeft: `${depth * indentSize}px`,
-                              }}
-                            >
-                              {flexRender(
-                                cell.column.columnDef.cell,
-                                cell.getContext(),
-                              )}
-                            </div>
-                          ) : (
-                            flexRender(
-                              cell.column.columnDef.cell,
-                              cell.getContext(),
-                            )
-                          )}
-                        </div>
+                        …
                       </td>
-                    )
-                  })}
-                </tr>
+                    ))}
+                    <ColumnSpacer width={columnPaddingRight} />
+                  </tr>
+                )
+              }
+              // 仮想スクロールで表示されている最後の行（集計行がない場合のボーダー制御）
+              const isLastVirtualRow = virtualIndex === virtualRows.length - 1
+              // 行選択のハイライト判定: 元データのインデックスで比較
+              const rowOriginalIndex =
+                row.depth === 0 ? getOriginalIndex(row.original) : -1
+              const isRowSelected =
+                !!selectionMode &&
+                rowOriginalIndex !== -1 &&
+                rowSelection.rows.has(rowOriginalIndex)
+
+              // 行単位の値を渡し、状態が変わった行のみ再描画する
+              return (
+                <TableBodyRow
+                  key={row.id}
+                  row={row}
+                  cells={row.getVisibleCells()}
+                  columnStart={columnStart}
+                  columnEnd={columnEnd}
+                  paddingLeft={columnPaddingLeft}
+                  paddingRight={columnPaddingRight}
+                  columnSizing={columnSizing}
+                  isExpanded={row.getIsExpanded()}
+                  rowIndex={rowIndex}
+                  start={virtualRow.start}
+                  height={virtualRow.size}
+                  hasBottomBorder={
+                    !(isLastRow || (isLastVirtualRow && !showSummary))
+                  }
+                  isRowSelected={isRowSelected}
+                  isRowHovered={hoveredRowIndex === rowIndex}
+                  matchedColumns={matchesByRow.get(rowIndex)}
+                  currentMatchColumn={
+                    currentMatch?.rowIndex === rowIndex
+                      ? currentMatch.columnId
+                      : null
+                  }
+                  selectedColumns={selectionMasks(rowIndex)}
+                  selectedColumnsAbove={selectionMasks(rowIndex - 1)}
+                  selectedColumnsBelow={selectionMasks(rowIndex + 1)}
+                  columnPositions={columnPositions}
+                  specialColumnsCount={specialColumnsCount}
+                  numericColumns={numericColumns}
+                  booleanColumns={booleanColumns}
+                  colors={rowColors}
+                  shouldStretch={shouldStretch}
+                  getColumnWidth={getColumnWidth}
+                  onCellMouseDown={handleCellMouseDown}
+                  onCellMouseEnter={handleCellMouseEnter}
+                  onHoverChange={setHoveredRowIndex}
+                />
               )
             })}
           </tbody>
@@ -1821,11 +1926,12 @@ export function AdvancedDataFrame({
                   width: '100%',
                 }}
               >
-                {table.getVisibleLeafColumns().map((column, columnIndex) => {
+                <ColumnSpacer width={columnPaddingLeft} />
+                {renderedLeafColumns.map((column, i) => {
                   const colId = column.id
                   const isSelectionColumn = colId === '__selection__'
                   const isExpanderColumn = colId === '__expander__'
-                  const isFirstColumn = columnIndex === 0
+                  const isFirstColumn = columnStart + i === 0
 
                   // 集計行の背景色（通常より少しだけ暗め、不透明）
                   const aggregationBgColor = isDark
@@ -1875,10 +1981,21 @@ export function AdvancedDataFrame({
                   const suffix = colConfig?.suffix ?? ''
 
                   // 数値カラムの場合、3桁区切りでフォーマット
-                  // boolカラム（True率）はprefix/suffixを適用しない
+                  // boolカラム（True率）と件数（count/distinct）はprefix/suffixを適用しない
+                  const isCountAggregate =
+                    colConfig?.aggregate === 'count' ||
+                    colConfig?.aggregate === 'distinct'
                   let displayValue: string | number
-                  if (isBoolColumn) {
+                  if (isBoolColumn && !colConfig?.aggregate) {
                     displayValue = value
+                  } else if (typeof value === 'number' && isCountAggregate) {
+                    displayValue = value.toLocaleString()
+                  } else if (
+                    typeof value === 'number' &&
+                    colConfig?.meta?.type === 'datetime'
+                  ) {
+                    // 日時（最小・最大）はセルと同じくカラムのタイムゾーンで表示
+                    displayValue = `${prefix}${formatDateTime(value, colConfig.meta)}${suffix}`
                   } else if (typeof value === 'number') {
                     displayValue = `${prefix}${value.toLocaleString()}${suffix}`
                   } else if (value !== '' && value != null) {
@@ -1938,7 +2055,11 @@ export function AdvancedDataFrame({
                         style={{
                           flex: 1,
                           textAlign:
-                            isNumericColumn || isBoolColumn ? 'right' : 'left',
+                            isNumericColumn ||
+                            isBoolColumn ||
+                            typeof value === 'number'
+                              ? 'right'
+                              : 'left',
                         }}
                       >
                         {displayValue}
@@ -1946,6 +2067,7 @@ export function AdvancedDataFrame({
                     </td>
                   )
                 })}
+                <ColumnSpacer width={columnPaddingRight} />
               </tr>
             </tfoot>
           ) : null}
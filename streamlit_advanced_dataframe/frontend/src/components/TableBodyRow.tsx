@@ -0,0 +1,331 @@
+/**
+ * テーブル本体の行コンポーネント
+ *
+ * 行ごとにメモ化し、行選択・hover・検索・セル選択などの状態が変わった行のみを
+ * 再描画します。propsには行単位の値（その行の一致カラム、選択マスクなど）を
+ * 渡し、変更のない行では同じ参照になるようにしています。
+ */
+
+import { cn } from '@/lib/utils'
+import { RowData } from '@/types/table'
+import { Cell, flexRender, Row } from '@tanstack/react-table'
+import { memo } from 'react'
+
+/**
+ * 行の描画に使う色（テーマから計算）
+ */
+export interface RowColors {
+  /** ダークテーマかどうか */
+  isDark: boolean
+  /** Streamlitテーマのプライマリカラー */
+  primaryColor: string
+  /** 枠線の色 */
+  borderColor: string
+  /** 選択・展開カラムの通常時の背景色 */
+  headerNormalBgColor: string
+  /** 選択・展開カラムのhover時の背景色 */
+  headerHoverBgColor: string
+  /** 行hover時の背景色 */
+  rowHoverBgColor: string
+}
+
+interface TableBodyRowProps {
+  /** TanStack Tableの行 */
+  row: Row<RowData>
+  /** 表示するセル（カラムの表示・順序が変わった場合のみ変わる） */
+  cells: Cell<RowData, unknown>[]
+  /** 描画するセルの範囲（カラムの仮想化、columnStart以上columnEnd未満） */
+  columnStart: number
+  columnEnd: number
+  /** 描画範囲外の左右のカラムの幅の合計（px） */
+  paddingLeft: number
+  paddingRight: number
+  /** カラム幅の状態（リサイズ時の再描画用） */
+  columnSizing: Record<string, number>
+  /** 展開されているか（展開ボタンの再描画用） */
+  isExpanded: boolean
+  /** 全体での行の位置 */
+  rowIndex: number
+  /** 行の上端の位置（px） */
+  start: number
+  /** 行・セルの高さ（px） */
+  height: number
+  /** 下のボーダーを表示するか */
+  hasBottomBorder: boolean
+  /** 行選択されているか */
+  isRowSelected: boolean
+  /** hover中か */
+  isRowHovered: boolean
+  /** この行で検索に一致したカラムID */
+  matchedColumns?: Set<string>
+  /** この行にある現在の一致箇所のカラムID */
+  currentMatchColumn: string | null
+  /** この行・上の行・下の行で選択されているカラムのマスク */
+  selectedColumns?: Uint8Array
+  selectedColumnsAbove?: Uint8Array
+  selectedColumnsBelow?: Uint8Array
+  /** カラムIDからマスクの位置へのマップ */
+  columnPositions: Map<string, number>
+  /** 選択・展開カラムの数（ツリー線を表示する最初のデータカラムの判定用） */
+  specialColumnsCount: number
+  /** 数値カラム（右寄せ） */
+  numericColumns: Set<string>
+  /** booleanカラム（中央寄せ） */
+  booleanColumns: Set<string>
+  /** 行の描画に使う色 */
+  colors: RowColors
+  /** カラムを伸縮するか */
+  shouldStretch: boolean
+  /** カラム幅の計算 */
+  getColumnWidth: (columnSize: number) => number | string
+  /** セルのマウスダウン */
+  onCellMouseDown: (
+    rowIndex: number,
+    columnId: string,
+    event: React.MouseEvent,
+  ) => void
+  /** セルのマウスエンター */
+  onCellMouseEnter: (rowIndex: number, columnId: string) => void
+  /** 行のhover状態の変更 */
+  onHoverChange: (rowIndex: number | null) => void
+}
+
+// ツリー線のインデント（px per level）
+const INDENT_SIZE = 24
+
+/**
+ * カラムの仮想化で描画しないカラムの幅を埋めるスペーサー
+ */
+export function ColumnSpacer({
+  width,
+  isHeader = false,
+}: {
+  width: number
+  isHeader?: boolean
+}) {
+  if (width <= 0) return null
+  const style = { display: 'flex', width: `${width}px`, flexShrink: 0 }
+  return isHeader ? <th style={style} /> : <td style={style} />
+}
+
+/**
+ * 選択範囲の境界線
+ */
+function SelectionBorder({
+  side,
+  color,
+}: {
+  side: 'top' | 'bottom' | 'left' | 'right'
+  color: string
+}) {
+  const isHorizontal = side === 'top' || side === 'bottom'
+  return (
+    <span
+      className="pointer-events-none absolute z-20"
+      style={{
+        backgroundColor: color,
+        [side]: 0,
+        ...(isHorizontal
+          ? {
+              left: 0,
+              height: '1px',
+              width: 'calc(100% + 0.5px)', // セル間のボーダーを確実にカバー
+            }
+          : {
+              top: 0,
+              width: '1px',
+              height: 'calc(100% + 0.5px)', // セル間のボーダーを確実にカバー
+            }),
+      }}
+    />
+  )
+}
+
+export const TableBodyRow = memo(function TableBodyRow({
+  row,
+  cells,
+  columnStart,
+  columnEnd,
+  paddingLeft,
+  paddingRight,
+  rowIndex,
+  start,
+  height,
+  hasBottomBorder,
+  isRowSelected,
+  isRowHovered,
+  matchedColumns,
+  currentMatchColumn,
+  selectedColumns,
+  selectedColumnsAbove,
+  selectedColumnsBelow,
+  columnPositions,
+  specialColumnsCount,
+  numericColumns,
+  booleanColumns,
+  colors,
+  shouldStretch,
+  getColumnWidth,
+  onCellMouseDown,
+  onCellMouseEnter,
+  onHoverChange,
+}: TableBodyRowProps) {
+  const {
+    isDark,
+    primaryColor,
+    borderColor,
+    headerNormalBgColor,
+    headerHoverBgColor,
+    rowHoverBgColor,
+  } = colors
+
+  return (
+    <tr
+      style={{
+        display: 'flex',
+        position: 'absolute',
+        width: '100%',
+        height: `${height}px`,
+        transform: `translateY(${start}px)`,
+      }}
+      onMouseEnter={() => onHoverChange(rowIndex)}
+      onMouseLeave={() => onHoverChange(null)}
+    >
+      <ColumnSpacer width={paddingLeft} />
+      {cells.slice(columnStart, columnEnd).map((cell, i) => {
+        const cellIndex = columnStart + i
+        const columnId = cell.column.id
+        const isFirstColumn = cellIndex === 0
+
+        // 選択範囲の判定（選択範囲のない行はマスクがない）
+        const colIndex = columnPositions.get(columnId) ?? -1
+        const isSelectedAt = (mask: Uint8Array | undefined, index: number) =>
+          index >= 0 && mask?.[index] === 1
+        const isSelected = isSelectedAt(selectedColumns, colIndex)
+        // 上下左右の隣接セルが選択されていない辺に境界線を表示
+        const selectionBorders = isSelected
+          ? {
+              top: !isSelectedAt(selectedColumnsAbove, colIndex),
+              right: !isSelectedAt(selectedColumns, colIndex + 1),
+              bottom: !isSelectedAt(selectedColumnsBelow, colIndex),
+              left: !isSelectedAt(selectedColumns, colIndex - 1),
+            }
+          : { top: false, right: false, bottom: false, left: false }
+        const isNumeric = numericColumns.has(columnId)
+        const isBoolean = booleanColumns.has(columnId)
+        const isSelectionColumn = columnId === '__selection__'
+        const isExpanderColumn = columnId === '__expander__'
+        const isMatched = matchedColumns?.has(columnId) ?? false
+        const isCurrentMatchCell = currentMatchColumn === columnId
+
+        // 最初のデータカラムかどうか（ツリー線表示用）
+        const isFirstDataColumn = cellIndex === specialColumnsCount
+        const depth = row.depth
+
+        return (
+          <td
+            key={cell.id}
+            className={cn(
+              'relative px-3 text-sm select-none',
+              isSelectionColumn || isExpanderColumn ? '' : 'cursor-cell',
+              isBoolean
+                ? 'text-center'
+                : isNumeric
+                  ? 'text-right'
+                  : 'text-left',
+            )}
+            style={{
+              display: 'flex',
+              alignItems: 'center',
+              justifyContent: isBoolean
+                ? 'center'
+                : isNumeric
+                  ? 'flex-end'
+                  : 'flex-start',
+              width: getColumnWidth(cell.column.getSize()),
+              minWidth: cell.column.columnDef.minSize ?? 50,
+              flexGrow: shouldStretch ? 1 : 0,
+              flexShrink: 0,
+              height: `${height}px`,
+              boxSizing: 'border-box',
+              paddingTop: '0.4375rem',
+              paddingBottom: '0.4375rem',
+              borderTop: 'none',
+              borderLeft: isFirstColumn ? 'none' : `1px solid ${borderColor}`,
+              borderRight: 'none',
+              borderBottom: hasBottomBorder
+                ? `1px solid ${borderColor}`
+                : 'none',
+              backgroundColor:
+                isSelectionColumn || isExpanderColumn
+                  ? isRowSelected
+                    ? isDark
+                      ? 'rgba(239, 68, 68, 0.15)'
+                      : 'rgba(239, 68, 68, 0.1)'
+                    : isRowHovered
+                      ? headerHoverBgColor
+                      : headerNormalBgColor
+                  : isCurrentMatchCell
+                    ? isDark
+                      ? 'rgba(239, 68, 68, 0.3)'
+                      : 'rgba(239, 68, 68, 0.25)'
+                    : isMatched
+                      ? isDark
+                        ? 'rgba(239, 68, 68, 0.15)'
+                        : 'rgba(239, 68, 68, 0.1)'
+                      : isSelected
+                        ? isDark
+                          ? `${primaryColor}20`
+                          : `${primaryColor}15`
+                        : isRowSelected
+                          ? isDark
+                            ? 'rgba(239, 68, 68, 0.15)'
+                            : 'rgba(239, 68, 68, 0.1)'
+                          : isRowHovered
+                            ? rowHoverBgColor
+                            : 'transparent',
+              overflow: 'hidden',
+              transition: 'background-color 0.1s ease',
+            }}
+            onMouseDown={
+              isSelectionColumn || isExpanderColumn
+                ? undefined
+                : (e) => onCellMouseDown(rowIndex, columnId, e)
+            }
+            onMouseEnter={
+              isSelectionColumn || isExpanderColumn
+                ? undefined
+                : () => onCellMouseEnter(rowIndex, columnId)
+            }
+          >
+            {selectionBorders.top && (
+              <SelectionBorder side="top" color={primaryColor} />
+            )}
+            {selectionBorders.bottom && (
+              <SelectionBorder side="bottom" color={primaryColor} />
+            )}
+            {selectionBorders.left && (
+              <SelectionBorder side="left" color={primaryColor} />
+            )}
+            {selectionBorders.right && (
+              <SelectionBorder side="right" color={primaryColor} />
+            )}
+            <div className="overflow-hidden text-ellipsis whitespace-nowrap">
+              {isFirstDataColumn && depth > 0 ? (
+                <div
+                  className="overflow-hidden text-ellipsis whitespace-nowrap"
+                  style={{ paddingLeft: `${depth * INDENT_SIZE}px` }}
+                >
+                  {flexRender(cell.column.columnDef.cell, cell.getContext())}
+                </div>
+              ) : (
+                flexRender(cell.column.columnDef.cell, cell.getContext())
+              )}
+            </div>
+          </td>
+        )
+      })}
+      <ColumnSpacer width={paddingRight} />
+    </tr>
+  )
+})
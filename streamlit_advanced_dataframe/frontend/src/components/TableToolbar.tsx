@@ -9,6 +9,7 @@ import { useStreamlitTheme } from '@/hooks/useStreamlitTheme'
 import { cn } from '@/lib/utils'
 import { ChevronDown, ChevronUp, Search, X } from 'lucide-react'
 import { useCallback, useEffect, useRef, useState } from 'react'
+import { useDebouncedCallback } from 'use-debounce'
 
 interface TableToolbarProps {
   /** 検索クエリ */
@@ -42,6 +43,25 @@ export function TableToolbar({
   const [isSearchOpen, setIsSearchOpen] = useState(false)
   const searchInputRef = useRef<HTMLInputElement>(null)
 
+  // ローカル状態で即座に入力を反映し、デバウンス後に親に通知
+  // （入力中の途中のクエリでは検索しない）
+  const [localQuery, setLocalQuery] = useState(searchQuery)
+
+  // 親からの値変更を反映
+  useEffect(() => {
+    setLocalQuery(searchQuery)
+  }, [searchQuery])
+
+  // 150msのデバウンス処理
+  const debouncedSearchChange = useDebouncedCallback((query: string) => {
+    onSearchChange(query)
+  }, 150)
+
+  const handleSearchInputChange = (e: React.ChangeEvent<HTMLInputElement>) => {
+    setLocalQuery(e.target.value)
+    debouncedSearchChange(e.target.value)
+  }
+
   // 検索窓を開く
   const handleSearchIconClick = useCallback(() => {
     setIsSearchOpen(true)
@@ -50,8 +70,11 @@ export function TableToolbar({
   // 検索窓を閉じる
   const handleSearchClose = useCallback(() => {
     setIsSearchOpen(false)
+    // 待機中の検索を破棄してからクリア
+    debouncedSearchChange.cancel()
+    setLocalQuery('')
     onSearchChange('')
-  }, [onSearchChange])
+  }, [debouncedSearchChange, onSearchChange])
 
   // 検索窓が開いたらフォーカス
   useEffect(() => {
@@ -75,11 +98,15 @@ export function TableToolbar({
   // 検索入力欄でのEnterキー押下時に次の一致箇所へジャンプ
   const handleSearchInputKeyDown = useCallback(
     (e: React.KeyboardEvent<HTMLInputElement>) => {
-      if (e.key === 'Enter' && totalMatches > 0) {
+      if (e.key !== 'Enter') return
+      // 待機中の検索があれば先に実行（一致箇所は次の描画で更新される）
+      if (debouncedSearchChange.isPending()) {
+        debouncedSearchChange.flush()
+      } else if (totalMatches > 0) {
         onNextMatch()
       }
     },
-    [totalMatches, onNextMatch],
+    [debouncedSearchChange, totalMatches, onNextMatch],
   )
 
   return (
@@ -102,8 +129,8 @@ export function TableToolbar({
           <input
             ref={searchInputRef}
             type="text"
-            value={searchQuery}
-            onChange={(e) => onSearchChange(e.target.value)}
+            value={localQuery}
+            onChange={handleSearchInputChange}
             onKeyDown={handleSearchInputKeyDown}
             placeholder="Type to search"
             className="w-48 bg-transparent text-sm outline-none"
@@ -0,0 +1,125 @@
+import { EngineQuery, EngineRequest, EngineResponse } from '@/lib/tableEngine'
+import { CellPosition, ColumnStore } from '@/types/table'
+import { ColumnFiltersState } from '@tanstack/react-table'
+import { useEffect, useRef, useState } from 'react'
+
+/**
+ * Web Workerで計算したフィルタ・ソート・検索の結果
+ */
+export interface TableEngineState {
+  /** フィルタ・ソート後の行インデックス（表示順） */
+  rowIndices: number[]
+  /** 検索の一致箇所（rowIndexは表示位置） */
+  searchMatches: CellPosition[]
+  /** 結果の計算に使ったフィルタ（行の集合が変わったかの判定用） */
+  filters: ColumnFiltersState
+}
+
+/**
+ * Web Workerを作成（作成できない環境ではnull）
+ */
+function createEngineWorker(): Worker | null {
+  try {
+    return new Worker(
+      new URL('../workers/tableEngine.worker.ts', import.meta.url),
+      { type: 'module' },
+    )
+  } catch {
+    return null
+  }
+}
+
+/**
+ * フィルタ・ソート・グローバル検索をWeb Workerで計算するフック
+ *
+ * データはWorkerに一度だけ送り、問い合わせごとに結果の行インデックスと
+ * 検索の一致箇所のみを受け取る。メインスレッドは結果の描画のみを行うため、
+ * 大きなテーブルでも検索入力やフィルタ操作中にスクロールが止まらない。
+ * 計算中は前回の結果を返し、古い問い合わせの結果は破棄する。
+ * Workerの作成や読み込みに失敗した場合はnullを返し、呼び出し側は
+ * メインスレッドで計算する。
+ *
+ * @param enabled - Workerを使用するか（falseの場合は常にnull）
+ * @param store - カラム単位のデータストア（フラットなデータ）
+ * @param query - テーブルの状態（変わるたびに再計算）
+ * @returns 計算結果（未計算、またはWorkerを使用できない場合はnull）
+ */
+export function useTableEngine(
+  enabled: boolean,
+  store: ColumnStore,
+  query: EngineQuery,
+): TableEngineState | null {
+  const workerRef = useRef<Worker | null>(null)
+  const queryIdRef = useRef(0)
+  const [result, setResult] = useState<{
+    store: ColumnStore
+    state: TableEngineState
+  } | null>(null)
+  const [failed, setFailed] = useState(false)
+
+  // Workerの作成・破棄
+  useEffect(() => {
+    if (!enabled) return
+    const worker = createEngineWorker()
+    workerRef.current = worker
+    // CSPなどでスクリプトを読み込めない場合は作成後にエラーイベントが届く
+    if (worker) {
+      worker.onerror = () => {
+        worker.terminate()
+        if (workerRef.current === worker) workerRef.current = null
+        setFailed(true)
+      }
+    }
+    return () => {
+      worker?.terminate()
+      workerRef.current = null
+    }
+  }, [enabled])
+
+  // データが変わったらWorkerに送る（関数は送れないため除く）
+  useEffect(() => {
+    const worker = workerRef.current
+    if (!enabled || !worker) return
+    const request: EngineRequest = {
+      type: 'load',
+      store: { ...store, remapPosition: undefined },
+    }
+    worker.postMessage(request)
+  }, [enabled, store])
+
+  // テーブルの状態が変わったら再計算を依頼
+  useEffect(() => {
+    const worker = workerRef.current
+    if (!enabled || !worker) return
+
+    const id = ++queryIdRef.current
+    const searchColumns = query.searchColumns
+    worker.onmessage = (event: MessageEvent<EngineResponse>) => {
+      const { id: responseId, result: engineResult } = event.data
+      // 新しい問い合わせを送った後に届いた古い結果は破棄
+      if (responseId !== queryIdRef.current) return
+
+      const searchMatches: CellPosition[] = []
+      engineResult.matchRows.forEach((rowIndex, i) => {
+        searchMatches.push({
+          rowIndex,
+          columnId: searchColumns[engineResult.matchColumns[i]],
+        })
+      })
+      setResult({
+        store,
+        state: {
+          rowIndices: Array.from(engineResult.rowIndices),
+          searchMatches,
+          filters: query.filters,
+        },
+      })
+    }
+    const request: EngineRequest = { type: 'query', id, query }
+    worker.postMessage(request)
+  }, [enabled, store, query])
+
+  // 別のデータに対する結果は使わない
+  if (!enabled || failed || result?.store !== store) return null
+  return result.state
+}
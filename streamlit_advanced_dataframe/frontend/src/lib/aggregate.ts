@@ -0,0 +1,337 @@
+/**
+ * 集計行（サマリー行）の集計
+ * カラムの値を型付き配列に変換して保持し、フィルタの変更時は
+ * 追加・除外された行の分だけ集計値を更新する
+ */
+
+import { getCellValue } from '@/lib/columnStore'
+import { typedColumnNumbers } from '@/lib/typedColumn'
+import { ColumnStore, SummaryAggregate } from '@/types/table'
+
+/**
+ * カラムごとの集計方法
+ * truePercentはBoolカラムのデフォルト（True率）
+ */
+export type AggregateKind = SummaryAggregate | 'truePercent'
+
+/**
+ * 集計するカラムの指定
+ */
+export interface AggregateSpec {
+  /** カラムID */
+  id: string
+  /** 集計方法 */
+  kind: AggregateKind
+}
+
+/**
+ * 集計行の値（カラムIDごと、値がない場合は空文字）
+ */
+export type SummaryValues = Record<string, string | number>
+
+/**
+ * 集計行の集計器
+ */
+export interface SummaryAggregator {
+  /** 集計対象の行インデックスを渡して集計行の値を取得 */
+  update: (rowIndices: readonly number[]) => SummaryValues
+}
+
+/**
+ * 1カラム分の集計状態
+ */
+interface ColumnAccumulator {
+  id: string
+  kind: AggregateKind
+  /** 数値（Boolは1/0、欠損値・数値以外はNaN） */
+  numbers: Float64Array | null
+  /** 値のID（辞書エンコードされたカラムは辞書のコード、欠損値は-1） */
+  ids: Int32Array | null
+  /** 集計対象の行に含まれる値のIDごとの件数 */
+  idCounts: Int32Array | null
+  /** 集計対象の行のうち欠損値でない行の数 */
+  count: number
+  /** 合計（Neumaierの補償加算、sum + sumCompensationが合計値） */
+  sum: number
+  /** 合計の丸め誤差の補償値 */
+  sumCompensation: number
+  distinct: number
+  min: number
+  max: number
+  /** 除外された行が最小値・最大値だった（再計算が必要） */
+  extremaStale: boolean
+}
+
+/**
+ * 各集計方法が使う配列（数値: sum/mean/min/max/truePercent、ID: count/distinct）
+ */
+const NUMERIC_KINDS: ReadonlySet<AggregateKind> = new Set([
+  'sum',
+  'mean',
+  'min',
+  'max',
+  'truePercent',
+])
+
+/**
+ * カラムの値を数値の型付き配列に変換（型付き配列で保持していないカラム用）
+ */
+function toNumbers(store: ColumnStore, columnId: string): Float64Array {
+  const numbers = new Float64Array(store.rowCount)
+  for (let i = 0; i < numbers.length; i++) {
+    const value = getCellValue(store, i, columnId)
+    numbers[i] =
+      typeof value === 'number'
+        ? value
+        : typeof value === 'boolean'
+          ? Number(value)
+          : NaN
+  }
+  return numbers
+}
+
+/**
+ * カラムの値をIDの型付き配列に変換（同じ値は同じID）
+ * 辞書エンコードされたカラムは辞書のコードをそのままIDとする
+ */
+function toIds(
+  store: ColumnStore,
+  columnId: string,
+): { ids: Int32Array; idCount: number } {
+  const ids = new Int32Array(store.rowCount)
+  const codes = store.columns.get(columnId)
+  const dictionary = store.dictionaries?.get(columnId)
+  if (codes && dictionary) {
+    for (let i = 0; i < ids.length; i++) {
+      const code = codes[i]
+      ids[i] = code === null ? -1 : (code as number)
+    }
+    return { ids, idCount: dictionary.length }
+  }
+
+  const idMap = new Map<unknown, number>()
+  for (let i = 0; i < ids.length; i++) {
+    const value = getCellValue(store, i, columnId)
+    if (value === null || value === undefined) {
+      ids[i] = -1
+      continue
+    }
+    let id = idMap.get(value)
+    if (id === undefined) {
+      id = idMap.size
+      idMap.set(value, id)
+    }
+    ids[i] = id
+  }
+  return { ids, idCount: idMap.size }
+}
+
+/**
+ * 合計に値を加算（Neumaierの補償加算）
+ * フィルタの変更のたびに行の値を加算・減算するため、丸め誤差を補償値に
+ * 蓄積して誤差が積み重ならないようにする
+ */
+function addToSum(acc: ColumnAccumulator, value: number): void {
+  const total = acc.sum + value
+  acc.sumCompensation +=
+    Math.abs(acc.sum) >= Math.abs(value)
+      ? acc.sum - total + value
+      : value - total + acc.sum
+  acc.sum = total
+}
+
+/**
+ * 集計状態を空（集計対象の行なし）に戻す
+ */
+function resetAccumulator(acc: ColumnAccumulator): void {
+  acc.count = 0
+  acc.sum = 0
+  acc.sumCompensation = 0
+  acc.distinct = 0
+  acc.min = Infinity
+  acc.max = -Infinity
+  acc.extremaStale = false
+  acc.idCounts?.fill(0)
+}
+
+/**
+ * 行を集計対象に追加
+ */
+function addRow(acc: ColumnAccumulator, rowIndex: number): void {
+  if (acc.numbers) {
+    const value = acc.numbers[rowIndex]
+    if (Number.isNaN(value)) return
+    acc.count++
+    addToSum(acc, value)
+    if (value < acc.min) acc.min = value
+    if (value > acc.max) acc.max = value
+    return
+  }
+  if (acc.ids && acc.idCounts) {
+    const id = acc.ids[rowIndex]
+    if (id < 0) return
+    acc.count++
+    if (acc.idCounts[id]++ === 0) acc.distinct++
+  }
+}
+
+/**
+ * 行を集計対象から除外
+ */
+function removeRow(acc: ColumnAccumulator, rowIndex: number): void {
+  if (acc.numbers) {
+    const value = acc.numbers[rowIndex]
+    if (Number.isNaN(value)) return
+    acc.count--
+    if (acc.count === 0) {
+      // 集計対象がなくなった場合は誤差を残さない
+      acc.sum = 0
+      acc.sumCompensation = 0
+    } else {
+      addToSum(acc, -value)
+    }
+    if (value === acc.min || value === acc.max) acc.extremaStale = true
+    return
+  }
+  if (acc.ids && acc.idCounts) {
+    const id = acc.ids[rowIndex]
+    if (id < 0) return
+    acc.count--
+    if (--acc.idCounts[id] === 0) acc.distinct--
+  }
+}
+
+/**
+ * 最小値・最大値を集計対象の行から再計算
+ */
+function recomputeExtrema(acc: ColumnAccumulator, included: Uint8Array): void {
+  const numbers = acc.numbers
+  if (!numbers) return
+  let min = Infinity
+  let max = -Infinity
+  for (let i = 0; i < included.length; i++) {
+    if (included[i] === 0) continue
+    const value = numbers[i]
+    if (value < min) min = value
+    if (value > max) max = value
+  }
+  acc.min = min
+  acc.max = max
+  acc.extremaStale = false
+}
+
+/**
+ * 集計状態から集計行の値を取得
+ */
+function accumulatorValue(
+  acc: ColumnAccumulator,
+  included: Uint8Array,
+): string | number {
+  if (acc.kind === 'none' || acc.count === 0) return ''
+
+  const sum = acc.sum + acc.sumCompensation
+  switch (acc.kind) {
+    case 'sum':
+      return sum
+    case 'mean':
+      return sum / acc.count
+    case 'min':
+    case 'max':
+      if (acc.extremaStale) recomputeExtrema(acc, included)
+      return acc.kind === 'min' ? acc.min : acc.max
+    case 'count':
+      return acc.count
+    case 'distinct':
+      return acc.distinct
+    case 'truePercent':
+      return `${Math.round((sum / acc.count) * 100)}%`
+  }
+}
+
+/**
+ * 集計器を作成
+ *
+ * カラムの値はここで一度だけ型付き配列に変換する。update()は前回の集計対象と
+ * 比較し、変化した行が少なければその行だけを追加・除外する（多ければ再集計）。
+ * ソートは集計対象の行の集合を変えないため、ソート後の行を渡しても結果は同じ。
+ *
+ * @param store - カラム単位のデータストア
+ * @param specs - 集計するカラムと集計方法
+ */
+export function createSummaryAggregator(
+  store: ColumnStore,
+  specs: readonly AggregateSpec[],
+): SummaryAggregator {
+  const accumulators: ColumnAccumulator[] = specs.map(({ id, kind }) => {
+    const acc: ColumnAccumulator = {
+      id,
+      kind,
+      numbers: null,
+      ids: null,
+      idCounts: null,
+      count: 0,
+      sum: 0,
+      sumCompensation: 0,
+      distinct: 0,
+      min: Infinity,
+      max: -Infinity,
+      extremaStale: false,
+    }
+    if (kind === 'none') return acc
+
+    if (NUMERIC_KINDS.has(kind)) {
+      // 型付き配列のカラムは値をそのまま使う
+      const typedColumn = store.typedColumns?.get(id)
+      acc.numbers = typedColumn
+        ? typedColumnNumbers(typedColumn)
+        : toNumbers(store, id)
+    } else {
+      const { ids, idCount } = toIds(store, id)
+      acc.ids = ids
+      acc.idCounts = new Int32Array(idCount)
+    }
+    return acc
+  })
+
+  let included: Uint8Array | null = null
+
+  const update = (rowIndices: readonly number[]): SummaryValues => {
+    const next = new Uint8Array(store.rowCount)
+    for (const rowIndex of rowIndices) next[rowIndex] = 1
+
+    // 前回の集計対象から変化した行
+    const changed: number[] = []
+    if (included) {
+      for (let i = 0; i < next.length; i++) {
+        if (next[i] !== included[i]) changed.push(i)
+      }
+    }
+
+    if (!included || changed.length > rowIndices.length) {
+      // 初回、または変化が集計対象より多い場合は再集計
+      accumulators.forEach((acc) => {
+        resetAccumulator(acc)
+        for (const rowIndex of rowIndices) addRow(acc, rowIndex)
+      })
+    } else {
+      accumulators.forEach((acc) => {
+        for (const rowIndex of changed) {
+          if (next[rowIndex]) {
+            addRow(acc, rowIndex)
+          } else {
+            removeRow(acc, rowIndex)
+          }
+        }
+      })
+    }
+    included = next
+
+    const summaryValues: SummaryValues = {}
+    accumulators.forEach((acc) => {
+      summaryValues[acc.id] = accumulatorValue(acc, next)
+    })
+    return summaryValues
+  }
+
+  return { update }
+}
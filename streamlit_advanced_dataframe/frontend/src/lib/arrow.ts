@@ -0,0 +1,168 @@
+/**
+ * Arrow IPCペイロードのデコード
+ * Pythonから送られたArrow IPCストリーム（バイト列）をカラム単位のストアに変換する
+ */
+
+import {
+  createTypedColumn,
+  markValid,
+  setTypedValue,
+} from '@/lib/typedColumn'
+import { ColumnStore, TypedColumn, TypedColumnType } from '@/types/table'
+import { DataType, tableFromIPC, Vector } from 'apache-arrow'
+
+/**
+ * Arrowのセル値をJSONペイロード互換の値に正規化
+ * - Int64/UInt64（bigint）→ number
+ * - Date → エポックミリ秒（to_jsonのepoch形式と同じ）
+ * - undefined → null
+ */
+function normalizeArrowValue(value: unknown): unknown {
+  if (typeof value === 'bigint') return Number(value)
+  if (value instanceof Date) return value.getTime()
+  return value ?? null
+}
+
+/**
+ * ベクタの値を配列に変換（欠損値はnull）
+ */
+function vectorValues(vector: Vector): unknown[] {
+  const values: unknown[] = new Array(vector.length)
+  for (let i = 0; i < vector.length; i++) {
+    values[i] = vector.isValid(i) ? normalizeArrowValue(vector.get(i)) : null
+  }
+  return values
+}
+
+/**
+ * 辞書エンコードされたベクタのコードを配列に変換（欠損値はnull）
+ * 辞書はIPCストリーム内で共有されるため、最初のチャンクの辞書を使用する
+ */
+function dictionaryCodes(vector: Vector): {
+  codes: (number | null)[]
+  dictionary: unknown[]
+} {
+  const codes: (number | null)[] = new Array(vector.length)
+  let offset = 0
+  vector.data.forEach((chunk) => {
+    for (let i = 0; i < chunk.length; i++) {
+      codes[offset + i] = vector.isValid(offset + i)
+        ? Number(chunk.values[i])
+        : null
+    }
+    offset += chunk.length
+  })
+
+  const dictionaryVector = vector.data[0]?.dictionary
+  return {
+    codes,
+    dictionary: dictionaryVector ? vectorValues(dictionaryVector) : [],
+  }
+}
+
+/**
+ * 型付き配列で保持するカラムの型を判定（数値・Bool・日時以外はnull）
+ */
+function typedColumnType(type: DataType): TypedColumnType | null {
+  if (DataType.isInt(type) || DataType.isFloat(type)) return 'number'
+  if (DataType.isBool(type)) return 'boolean'
+  if (DataType.isTimestamp(type) || DataType.isDate(type)) return 'datetime'
+  return null
+}
+
+/**
+ * ベクタを型付き配列のカラムに変換
+ * 浮動小数点数はチャンクの値のバッファをそのままコピーする
+ */
+function typedColumnFromVector(
+  vector: Vector,
+  type: TypedColumnType,
+): TypedColumn {
+  const column = createTypedColumn(type, vector.length)
+  let offset = 0
+  vector.data.forEach((chunk) => {
+    const chunkValues = chunk.values
+    if (
+      chunkValues instanceof Float64Array ||
+      chunkValues instanceof Float32Array
+    ) {
+      column.values.set(chunkValues.subarray(0, chunk.length), offset)
+      for (let i = 0; i < chunk.length; i++) {
+        if (vector.isValid(offset + i)) {
+          markValid(column, offset + i)
+        } else {
+          column.values[offset + i] = 0
+        }
+      }
+    } else {
+      for (let i = 0; i < chunk.length; i++) {
+        setTypedValue(
+          column,
+          offset + i,
+          vector.isValid(offset + i)
+            ? normalizeArrowValue(vector.get(offset + i))
+            : null,
+        )
+      }
+    }
+    offset += chunk.length
+  })
+  return column
+}
+
+/**
+ * Pythonで計算したソート用の順位（Arrow IPCストリーム）をデコード
+ * 各カラムは欠損値のないint32のため、値の配列をそのまま使う
+ */
+export function decodeSortRanks(buffer: Uint8Array): Map<string, Int32Array> {
+  const table = tableFromIPC(buffer)
+  const ranks = new Map<string, Int32Array>()
+  table.schema.fields.forEach((field, colIndex) => {
+    const vector = table.getChildAt(colIndex)
+    if (vector) ranks.set(field.name, Int32Array.from(vector.toArray()))
+  })
+  return ranks
+}
+
+/**
+ * Arrow IPCストリームをカラム単位のストアにデコード
+ *
+ * カラムごとにベクタを走査して値の配列を作る（行オブジェクトは生成しない）。
+ * 辞書エンコードされたカラムは文字列に展開せず、コードと辞書のまま保持する。
+ * 数値・Bool・日時のカラムは型付き配列と欠損値のビットマップで保持する。
+ */
+export function decodeArrowColumns(buffer: Uint8Array): ColumnStore {
+  const table = tableFromIPC(buffer)
+  const rowCount = table.numRows
+  const columns = new Map<string, unknown[]>()
+  const dictionaries = new Map<string, unknown[]>()
+  const typedColumns = new Map<string, TypedColumn>()
+
+  table.schema.fields.forEach((field, colIndex) => {
+    const vector = table.getChildAt(colIndex)
+    if (!vector) return
+
+    if (DataType.isDictionary(field.type)) {
+      const { codes, dictionary } = dictionaryCodes(vector)
+      columns.set(field.name, codes)
+      dictionaries.set(field.name, dictionary)
+      return
+    }
+
+    const typedType = typedColumnType(field.type)
+    if (typedType) {
+      typedColumns.set(field.name, typedColumnFromVector(vector, typedType))
+      return
+    }
+
+    columns.set(field.name, vectorValues(vector))
+  })
+
+  return {
+    rowCount,
+    topLevelCount: rowCount,
+    columns,
+    dictionaries,
+    typedColumns,
+  }
+}
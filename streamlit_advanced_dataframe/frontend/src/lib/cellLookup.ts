@@ -0,0 +1,97 @@
+/**
+ * セルの判定用の索引
+ * 検索の一致箇所とセル選択範囲を行単位にまとめ、描画するセルごとの判定を
+ * 定数時間（選択範囲は範囲の数の対数時間）にする
+ * 行単位の値は変更のない行では同じ参照になるため、行コンポーネントのメモ化にも使う
+ */
+
+import { CellPosition, CellSelection } from '@/types/table'
+
+/** 行インデックスから、その行で選択されているカラムのマスクを取得する関数 */
+export type SelectionMasks = (rowIndex: number) => Uint8Array | undefined
+
+/**
+ * 検索の一致箇所を行インデックス→カラムIDの集合のマップにまとめる
+ *
+ * @param matches - 一致箇所のリスト
+ */
+export function groupMatchesByRow(
+  matches: CellPosition[],
+): Map<number, Set<string>> {
+  const columnsByRow = new Map<number, Set<string>>()
+  matches.forEach(({ rowIndex, columnId }) => {
+    let columns = columnsByRow.get(rowIndex)
+    if (!columns) {
+      columns = new Set()
+      columnsByRow.set(rowIndex, columns)
+    }
+    columns.add(columnId)
+  })
+  return columnsByRow
+}
+
+/**
+ * 昇順の配列で、値がtarget以下になる最後の位置を二分探索（ない場合は-1）
+ */
+function searchSegment(bounds: number[], target: number): number {
+  let low = 0
+  let high = bounds.length
+  while (low < high) {
+    const mid = (low + high) >> 1
+    if (bounds[mid] <= target) {
+      low = mid + 1
+    } else {
+      high = mid
+    }
+  }
+  return low - 1
+}
+
+/**
+ * セル選択範囲の行ごとのマスクを取得する関数を作成
+ *
+ * 選択範囲の上端・下端で行を区間に分け、区間ごとに選択されているカラムの
+ * マスク（columnIdsの位置で1が選択）を持つ。同じ区間の行は同じマスクを返し、
+ * 選択範囲のない行はundefinedを返す。
+ *
+ * @param selections - 選択範囲（矩形）のリスト
+ * @param columnIds - カラムIDのリスト（マスクの位置に対応）
+ */
+export function createSelectionMasks(
+  selections: CellSelection[],
+  columnIds: string[],
+): SelectionMasks {
+  const columnPositions = new Map(columnIds.map((id, i) => [id, i]))
+
+  // 選択範囲を行・カラム位置の矩形に変換（カラムが見つからない範囲は除く）
+  const rects = selections.flatMap(({ start, end }) => {
+    const startCol = columnPositions.get(start.columnId)
+    const endCol = columnPositions.get(end.columnId)
+    if (startCol === undefined || endCol === undefined) return []
+    return [
+      {
+        minRow: Math.min(start.rowIndex, end.rowIndex),
+        maxRow: Math.max(start.rowIndex, end.rowIndex),
+        minCol: Math.min(startCol, endCol),
+        maxCol: Math.max(startCol, endCol),
+      },
+    ]
+  })
+
+  // 区間の境界（各区間は bounds[i] 以上 bounds[i + 1] 未満の行）
+  const bounds = Array.from(
+    new Set(rects.flatMap(({ minRow, maxRow }) => [minRow, maxRow + 1])),
+  ).sort((a, b) => a - b)
+  const masks = bounds.slice(0, -1).map((segmentStart) => {
+    const covering = rects.filter(
+      ({ minRow, maxRow }) =>
+        segmentStart >= minRow && segmentStart <= maxRow,
+    )
+    if (covering.length === 0) return undefined
+    const mask = new Uint8Array(columnIds.length)
+    covering.forEach(({ minCol, maxCol }) => mask.fill(1, minCol, maxCol + 1))
+    return mask
+  })
+
+  return (rowIndex) => masks[searchSegment(bounds, rowIndex)]
+}
@@ -0,0 +1,130 @@
+/**
+ * セルのテキストのキャッシュ
+ * 文字列化・正規化したセルのテキストをカラム単位で一度だけ作成し、
+ * 検索・テキストフィルタ・クリップボードコピーで使い回す
+ * 日時カラムのテキストは表示と同じフォーマットにする
+ */
+
+import { getCellValue } from '@/lib/columnStore'
+import { formatDateTime } from '@/lib/datetime'
+import { ColumnMeta, ColumnStore } from '@/types/table'
+
+/**
+ * カラムのテキスト
+ * 辞書エンコードされたカラムは辞書値ごと、それ以外は行ごとに持つ
+ */
+interface ColumnText {
+  /** セルのテキスト（cellValueTextの結果） */
+  texts: string[]
+  /** 正規化したテキスト（最初の検索時に作成） */
+  normalized?: string[]
+  /** 辞書のコード（辞書エンコードされたカラムのみ） */
+  codes?: unknown[]
+}
+
+// ストアごとのテキスト（カラムとフォーマット単位で作成し、データが変わるまで
+// 使い回す）
+const textCache = new WeakMap<ColumnStore, Map<string, ColumnText>>()
+
+/**
+ * 検索用にテキストを正規化
+ * NFKCで全角英数字・半角カナなどの幅を揃え、小文字に変換する
+ */
+export function normalizeText(text: string): string {
+  return text.normalize('NFKC').toLowerCase()
+}
+
+/**
+ * セル値のテキスト
+ * 日時カラム（エポックミリ秒）は表示と同じフォーマット、それ以外は
+ * String(value ?? '')
+ */
+function cellValueText(value: unknown, meta?: ColumnMeta): string {
+  return meta?.type === 'datetime' && typeof value === 'number'
+    ? formatDateTime(value, meta)
+    : String(value ?? '')
+}
+
+/**
+ * テキストのキャッシュキー
+ * 日時カラムはタイムゾーンと日付のみの表示によってテキストが変わるため、
+ * フォーマットもキーに含める
+ */
+export function cellTextKey(columnId: string, meta?: ColumnMeta): string {
+  if (meta?.type !== 'datetime') return columnId
+  return JSON.stringify([columnId, meta.timezone ?? 'UTC', !!meta.dateOnly])
+}
+
+/**
+ * カラムのテキストを取得（未作成の場合は作成してキャッシュ）
+ */
+function columnText(
+  store: ColumnStore,
+  columnId: string,
+  meta?: ColumnMeta,
+): ColumnText {
+  let storeTexts = textCache.get(store)
+  if (!storeTexts) {
+    storeTexts = new Map()
+    textCache.set(store, storeTexts)
+  }
+  const key = cellTextKey(columnId, meta)
+  const cached = storeTexts.get(key)
+  if (cached) return cached
+
+  let text: ColumnText
+  const codes = store.columns.get(columnId)
+  const dictionary = store.dictionaries?.get(columnId)
+  if (codes && dictionary) {
+    text = {
+      texts: dictionary.map((value) => cellValueText(value, meta)),
+      codes,
+    }
+  } else {
+    const texts: string[] = new Array(store.rowCount)
+    for (let rowIndex = 0; rowIndex < store.rowCount; rowIndex++) {
+      const value = getCellValue(store, rowIndex, columnId)
+      texts[rowIndex] = cellValueText(value, meta)
+    }
+    text = { texts }
+  }
+
+  storeTexts.set(key, text)
+  return text
+}
+
+/**
+ * セルのテキストを取得（日時カラムは表示と同じフォーマット）
+ *
+ * @param meta - カラムのメタデータ（日時カラムのフォーマット用）
+ */
+export function getCellText(
+  store: ColumnStore,
+  rowIndex: number,
+  columnId: string,
+  meta?: ColumnMeta,
+): string {
+  const { texts, codes } = columnText(store, columnId, meta)
+  if (!codes) return texts[rowIndex] ?? ''
+  const code = codes[rowIndex] as number | null | undefined
+  return code == null ? '' : texts[code]
+}
+
+/**
+ * カラムの正規化したテキストを取得
+ *
+ * @param store - カラム単位のデータストア
+ * @param columnId - カラムID
+ * @param meta - カラムのメタデータ（日時カラムのフォーマット用）
+ * @returns 正規化したテキスト（辞書エンコードされたカラムは辞書値ごと、
+ *   それ以外は行ごと）と、辞書エンコードされたカラムの場合は辞書のコード
+ */
+export function normalizedColumnTexts(
+  store: ColumnStore,
+  columnId: string,
+  meta?: ColumnMeta,
+): { normalized: string[]; codes?: unknown[] } {
+  const text = columnText(store, columnId, meta)
+  if (!text.normalized) text.normalized = text.texts.map(normalizeText)
+  return { normalized: text.normalized, codes: text.codes }
+}
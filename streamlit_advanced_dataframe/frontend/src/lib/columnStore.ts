@@ -0,0 +1,88 @@
+/**
+ * カラム単位のデータストア
+ * 値をカラムごとの配列で保持し、行オブジェクトを生成せずにアクセスする
+ */
+
+import { getTypedValue, typedColumnFromValues } from '@/lib/typedColumn'
+import { ColumnStore, TypedColumn } from '@/types/table'
+
+/**
+ * Pythonから送られる階層データ（カラム単位のJSON）
+ */
+export interface HierarchicalPayload {
+  /** 行数（サブ行を含む） */
+  row_count: number
+  /** カラム名ごとの値の配列 */
+  columns: Record<string, unknown[]>
+  /** 各行の親の行インデックス（トップレベルの行は-1） */
+  parents: number[]
+}
+
+/**
+ * 空のストア
+ */
+export const EMPTY_COLUMN_STORE: ColumnStore = {
+  rowCount: 0,
+  topLevelCount: 0,
+  columns: new Map(),
+}
+
+/**
+ * セルの値を取得（辞書エンコードされたカラムは辞書の値に変換）
+ */
+export function getCellValue(
+  store: ColumnStore,
+  rowIndex: number,
+  columnId: string,
+): unknown {
+  const typedColumn = store.typedColumns?.get(columnId)
+  if (typedColumn) return getTypedValue(typedColumn, rowIndex)
+
+  const value = store.columns.get(columnId)?.[rowIndex] ?? null
+  const dictionary = store.dictionaries?.get(columnId)
+  if (dictionary && value !== null) {
+    return dictionary[value as number] ?? null
+  }
+  return value
+}
+
+/**
+ * トップレベルの行インデックスの配列を作成（TanStack Tableのdataに渡す）
+ */
+export function topLevelRowIndices(store: ColumnStore): number[] {
+  return Array.from({ length: store.topLevelCount }, (_, i) => i)
+}
+
+/**
+ * 階層データのペイロードからストアを作成
+ * 親の配列からサブ行のリストを組み立てる（親は常にサブ行より前に並ぶ）
+ * 値がすべて数値（またはすべてboolean）のカラムは型付き配列で保持する
+ */
+export function columnStoreFromHierarchy(
+  payload: HierarchicalPayload,
+): ColumnStore {
+  const rowCount = payload.row_count
+  const children: number[][] = Array.from({ length: rowCount }, () => [])
+  let topLevelCount = 0
+
+  payload.parents.forEach((parent, rowIndex) => {
+    if (parent < 0) {
+      topLevelCount++
+    } else {
+      children[parent].push(rowIndex)
+    }
+  })
+
+  const columns = new Map<string, unknown[]>()
+  const typedColumns = new Map<string, TypedColumn>()
+  Object.entries(payload.columns).forEach(([columnId, values]) => {
+    const typedColumn = typedColumnFromValues(values)
+    if (typedColumn) {
+      typedColumns.set(columnId, typedColumn)
+    } else {
+      columns.set(columnId, values)
+    }
+  })
+
+  return { rowCount, topLevelCount, columns, typedColumns, children }
+}
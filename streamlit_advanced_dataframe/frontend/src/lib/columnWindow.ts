@@ -0,0 +1,84 @@
+/**
+ * カラムの仮想化（横方向）
+ * 横スクロールの表示範囲（+前後のoverscan）にあるカラムのみを描画し、範囲外の
+ * カラムは左右のスペーサーの幅にまとめる
+ */
+
+/**
+ * 描画するカラムの範囲
+ */
+export interface ColumnWindow {
+  /** 描画する最初のリーフカラムの位置 */
+  startIndex: number
+  /** 描画する最後のリーフカラムの次の位置 */
+  endIndex: number
+  /** 描画範囲の左端（px） */
+  left: number
+  /** 描画範囲の右端（px） */
+  right: number
+  /** すべてのカラムの幅の合計（px） */
+  totalWidth: number
+}
+
+/**
+ * 仮想化したカラムの表示範囲を作成
+ *
+ * @param items - 横方向のVirtualizerの描画対象（カラムの位置と左端・右端）
+ * @param totalWidth - すべてのカラムの幅の合計（px）
+ * @returns 描画するカラムの範囲（描画対象がない場合はnull、すべて描画する）
+ */
+export function createColumnWindow(
+  items: { index: number; start: number; end: number }[],
+  totalWidth: number,
+): ColumnWindow | null {
+  if (items.length === 0) return null
+  const first = items[0]
+  const last = items[items.length - 1]
+  return {
+    startIndex: first.index,
+    endIndex: last.index + 1,
+    left: first.start,
+    right: last.end,
+    totalWidth,
+  }
+}
+
+/**
+ * ヘッダ行のうち描画範囲にかかるヘッダと、左右のスペーサーの幅を求める
+ * グループヘッダは子カラムのいずれかが描画範囲にかかる場合に描画する
+ *
+ * @param headers - ヘッダ行のヘッダ（幅はgetSizeで取得）
+ * @param columnWindow - 描画するカラムの範囲（nullの場合はすべて描画）
+ * @returns 描画するヘッダの位置（ヘッダ行での位置）と左右のスペーサーの幅
+ */
+export function windowHeaders(
+  headers: { getSize(): number }[],
+  columnWindow: ColumnWindow | null,
+): { indices: Set<number>; paddingLeft: number; paddingRight: number } {
+  if (!columnWindow) {
+    return {
+      indices: new Set(headers.map((_, i) => i)),
+      paddingLeft: 0,
+      paddingRight: 0,
+    }
+  }
+
+  const indices = new Set<number>()
+  let paddingLeft = 0
+  let renderedEnd = 0
+  let offset = 0
+  headers.forEach((header, i) => {
+    const start = offset
+    offset += header.getSize()
+    if (start < columnWindow.right && offset > columnWindow.left) {
+      if (indices.size === 0) paddingLeft = start
+      indices.add(i)
+      renderedEnd = offset
+    }
+  })
+  // 描画するヘッダがない場合は行全体をスペーサーにする
+  if (indices.size === 0) {
+    return { indices, paddingLeft: offset, paddingRight: 0 }
+  }
+  return { indices, paddingLeft, paddingRight: offset - renderedEnd }
+}
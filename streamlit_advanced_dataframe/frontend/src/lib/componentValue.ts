@@ -0,0 +1,36 @@
+/**
+ * Streamlitへ返すコンポーネントの値
+ * 行選択・ウィンドウ要求・再送要求など、複数の箇所から送る値を1つにまとめる
+ */
+
+import { ComponentValue } from '@/types/table'
+import { Streamlit } from 'streamlit-component-lib'
+
+// iframeにつきコンポーネントは1つのため、モジュールで値を保持する
+let componentValue: ComponentValue = { selection: [] }
+
+/**
+ * コンポーネントの値の一部を更新してStreamlitへ送信
+ */
+export function sendComponentValue(patch: Partial<ComponentValue>): void {
+  componentValue = { ...componentValue, ...patch }
+  Streamlit.setComponentValue(componentValue)
+}
+
+/**
+ * 選択された行の位置を昇順の区間 [開始, 終了)（終了は含まない）の配列に変換
+ * 連続した行の選択を2つの数値で送れるようにする
+ */
+export function selectionRanges(rows: Iterable<number>): [number, number][] {
+  const positions = Int32Array.from(rows).sort()
+  const ranges: [number, number][] = []
+  positions.forEach((position) => {
+    const last = ranges[ranges.length - 1]
+    if (last && position <= last[1]) {
+      last[1] = position + 1
+    } else {
+      ranges.push([position, position + 1])
+    }
+  })
+  return ranges
+}
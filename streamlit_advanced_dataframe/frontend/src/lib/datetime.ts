@@ -0,0 +1,112 @@
+/**
+ * 日時カラムの表示フォーマット
+ * 日時はエポックミリ秒の数値として届くため、表示する（描画される）セルのみ
+ * カラムのタイムゾーンで文字列に変換する
+ */
+
+import { ColumnMeta } from '@/types/table'
+
+// タイムゾーン・日付のみかごとのフォーマッタ（セルごとにロケールを解決しない）
+const formatterCache = new Map<string, Intl.DateTimeFormat>()
+
+/**
+ * フォーマッタを取得（未作成の場合は作成してキャッシュ）
+ */
+function getFormatter(
+  timeZone: string | undefined,
+  dateOnly: boolean,
+): Intl.DateTimeFormat {
+  const key = `${timeZone ?? ''}|${dateOnly}`
+  const cached = formatterCache.get(key)
+  if (cached) return cached
+
+  let formatter: Intl.DateTimeFormat
+  try {
+    formatter = new Intl.DateTimeFormat(undefined, {
+      year: 'numeric',
+      month: '2-digit',
+      day: '2-digit',
+      ...(dateOnly
+        ? {}
+        : { hour: '2-digit', minute: '2-digit', second: '2-digit' }),
+      timeZone,
+    })
+  } catch {
+    // ブラウザが対応していないタイムゾーンはUTCで表示
+    formatter = getFormatter('UTC', dateOnly)
+  }
+  formatterCache.set(key, formatter)
+  return formatter
+}
+
+/**
+ * エポックミリ秒の日時を表示用の文字列に変換
+ *
+ * タイムゾーン付きのカラムはそのタイムゾーン、タイムゾーンなしのカラムは
+ * pandasと同じ値が表示されるようUTCで表示する。
+ *
+ * @param value - エポックミリ秒
+ * @param meta - カラムのメタデータ
+ */
+export function formatDateTime(value: number, meta?: ColumnMeta): string {
+  return getFormatter(
+    meta?.timezone ?? 'UTC',
+    meta?.dateOnly ?? false,
+  ).format(value)
+}
+
+// タイムゾーンごとの、UTCとの時差の計算に使うフォーマッタ
+const offsetFormatterCache = new Map<string, Intl.DateTimeFormat>()
+
+/**
+ * 時刻におけるタイムゾーンのUTCとの時差（ミリ秒）
+ */
+function timeZoneOffset(time: number, timeZone: string): number {
+  let formatter = offsetFormatterCache.get(timeZone)
+  if (!formatter) {
+    try {
+      formatter = new Intl.DateTimeFormat('en-US', {
+        year: 'numeric',
+        month: 'numeric',
+        day: 'numeric',
+        hour: 'numeric',
+        minute: 'numeric',
+        second: 'numeric',
+        hourCycle: 'h23',
+        timeZone,
+      })
+    } catch {
+      // ブラウザが対応していないタイムゾーンはUTCとして扱う（表示と同じ）
+      return 0
+    }
+    offsetFormatterCache.set(timeZone, formatter)
+  }
+  const parts = Object.fromEntries(
+    formatter.formatToParts(time).map(({ type, value }) => [type, value]),
+  )
+  const wallTime = Date.UTC(
+    Number(parts.year),
+    Number(parts.month) - 1,
+    Number(parts.day),
+    Number(parts.hour),
+    Number(parts.minute),
+    Number(parts.second),
+  )
+  return wallTime - Math.floor(time / 1000) * 1000
+}
+
+/**
+ * 日付の0時のタイムゾーンでの時刻を取得（エポックミリ秒）
+ *
+ * 日付範囲フィルタの日付（ローカル時刻の0時のDate）を、カラムの表示と同じ
+ * タイムゾーンの日付として扱う。
+ *
+ * @param date - 日付（ローカル時刻の年月日を使う）
+ * @param timeZone - タイムゾーン（タイムゾーンなしのカラムはUTC）
+ */
+export function startOfDayInTimeZone(date: Date, timeZone: string): number {
+  const wallTime = Date.UTC(date.getFullYear(), date.getMonth(), date.getDate())
+  // 時差は時刻によって変わる（夏時間）ため、求めた時刻の時差で取り直す
+  const guess = wallTime - timeZoneOffset(wallTime, timeZone)
+  return wallTime - timeZoneOffset(guess, timeZone)
+}
@@ -0,0 +1,177 @@
+/**
+ * 差分更新
+ * Pythonから送られた差分（変更された行と行の並び）を前回のストアに適用する
+ */
+
+import { getCellValue } from '@/lib/columnStore'
+import {
+  createTypedColumn,
+  isValidAt,
+  markValid,
+  setTypedValue,
+} from '@/lib/typedColumn'
+import { ColumnStore, TypedColumn } from '@/types/table'
+
+/** 前回のストアから行をコピーする区間 */
+const FROM_PREVIOUS = 0
+
+/**
+ * Pythonから送られる差分（data_delta引数）
+ */
+export interface DataDelta {
+  /** 差分の基準となるデータのフィンガープリント */
+  base: string
+  /**
+   * 新しい行の並びを作る区間の配列: [ソース, 開始位置, 行数]
+   * ソース0は前回のストアの行、ソース1は変更された行（data_delta_rows）
+   */
+  ops: [number, number, number][]
+  /** 変更された各行の前回の位置（挿入された行は-1） */
+  origins: number[]
+}
+
+/**
+ * 前回の行位置 → 新しい行位置の変換関数を作成（削除された行は-1）
+ */
+function createRemap(delta: DataDelta): (position: number) => number {
+  // 前回のストアからコピーした区間: [前回の開始位置, 新しい開始位置, 行数]
+  const runs: [number, number, number][] = []
+  const moved = new Map<number, number>()
+  let newStart = 0
+
+  delta.ops.forEach(([source, start, length]) => {
+    if (source === FROM_PREVIOUS) {
+      runs.push([start, newStart, length])
+    } else {
+      for (let i = 0; i < length; i++) {
+        const origin = delta.origins[start + i]
+        if (origin >= 0) moved.set(origin, newStart + i)
+      }
+    }
+    newStart += length
+  })
+  runs.sort((a, b) => a[0] - b[0])
+
+  return (position) => {
+    const updated = moved.get(position)
+    if (updated !== undefined) return updated
+
+    // 前回の位置を含む区間を二分探索
+    let low = 0
+    let high = runs.length - 1
+    while (low <= high) {
+      const mid = (low + high) >> 1
+      const [start, target, length] = runs[mid]
+      if (position < start) {
+        high = mid - 1
+      } else if (position >= start + length) {
+        low = mid + 1
+      } else {
+        return target + position - start
+      }
+    }
+    return -1
+  }
+}
+
+/**
+ * 型付き配列のカラムに差分を適用
+ * 変更されていない区間は値の配列をまとめてコピーする
+ */
+function applyTypedDelta(
+  previous: TypedColumn,
+  columnId: string,
+  delta: DataDelta,
+  changedRows: ColumnStore,
+  rowCount: number,
+): TypedColumn {
+  const column = createTypedColumn(previous.type, rowCount)
+  let offset = 0
+  delta.ops.forEach(([source, start, length]) => {
+    if (source === FROM_PREVIOUS) {
+      column.values.set(previous.values.subarray(start, start + length), offset)
+      for (let i = 0; i < length; i++) {
+        if (isValidAt(previous, start + i)) markValid(column, offset + i)
+      }
+    } else {
+      for (let i = 0; i < length; i++) {
+        // 欠損値（nullやNaN）の行は有効ビットを立てない
+        const value = getCellValue(changedRows, start + i, columnId)
+        setTypedValue(column, offset + i, value)
+      }
+    }
+    offset += length
+  })
+  return column
+}
+
+/**
+ * 前回のストアに差分を適用して新しいストアを作成
+ *
+ * 変更されていない行はカラムの配列から区間ごとにコピーし、変更された行のみ
+ * デコード済みの値を使う。辞書エンコードされたカラムは前回の辞書を引き継ぎ、
+ * 新しい値は辞書の末尾に追加する。型付き配列のカラムは型付き配列のまま更新する。
+ *
+ * @param previous - 前回のストア（フラットなデータ）
+ * @param delta - 差分
+ * @param changedRows - 変更された行のストア
+ */
+export function applyDelta(
+  previous: ColumnStore,
+  delta: DataDelta,
+  changedRows: ColumnStore,
+): ColumnStore {
+  const rowCount = delta.ops.reduce((sum, [, , length]) => sum + length, 0)
+  const columns = new Map<string, unknown[]>()
+  const dictionaries = new Map<string, unknown[]>()
+
+  previous.columns.forEach((previousValues, columnId) => {
+    const previousDictionary = previous.dictionaries?.get(columnId)
+    const dictionary = previousDictionary?.slice()
+    const codes = new Map(dictionary?.map((value, code) => [value, code]))
+
+    // 変更された行の値（辞書エンコードされたカラムは前回の辞書のコード）
+    const changedValue = (rowIndex: number): unknown => {
+      const value = getCellValue(changedRows, rowIndex, columnId)
+      if (!dictionary || value === null) return value
+      let code = codes.get(value)
+      if (code === undefined) {
+        code = dictionary.push(value) - 1
+        codes.set(value, code)
+      }
+      return code
+    }
+
+    const values: unknown[] = new Array(rowCount)
+    let offset = 0
+    delta.ops.forEach(([source, start, length]) => {
+      for (let i = 0; i < length; i++) {
+        values[offset + i] =
+          source === FROM_PREVIOUS
+            ? previousValues[start + i]
+            : changedValue(start + i)
+      }
+      offset += length
+    })
+
+    columns.set(columnId, values)
+    if (dictionary) dictionaries.set(columnId, dictionary)
+  })
+
+  const typedColumns = new Map<string, TypedColumn>()
+  previous.typedColumns?.forEach((previousColumn, columnId) => {
+    typedColumns.set(
+      columnId,
+      applyTypedDelta(previousColumn, columnId, delta, changedRows, rowCount),
+    )
+  })
+
+  return {
+    rowCount,
+    topLevelCount: rowCount,
+    columns,
+    dictionaries,
+    typedColumns,
+    remapPosition: createRemap(delta),
+  }
+}
@@ -0,0 +1,208 @@
+/**
+ * カラムフィルタの判定
+ * TanStack TableのfilterFnと、辞書エンコードされたカラムの辞書値の判定で共用する
+ */
+
+import { normalizeText } from '@/lib/cellText'
+import { startOfDayInTimeZone } from '@/lib/datetime'
+import { createRangeFilter } from '@/lib/rangeIndex'
+import { getTypedValue } from '@/lib/typedColumn'
+import { ColumnType, TypedColumn } from '@/types/table'
+
+/**
+ * 複数選択フィルタの値の型
+ */
+export interface MultiSelectFilterValue {
+  type: 'multiselect'
+  values: string[]
+}
+
+/**
+ * フィルタ値がMultiSelectFilterValueかどうかを判定する型ガード
+ */
+export function isMultiSelectFilter(
+  value: unknown,
+): value is MultiSelectFilterValue {
+  return (
+    typeof value === 'object' &&
+    value !== null &&
+    'type' in value &&
+    (value as MultiSelectFilterValue).type === 'multiselect'
+  )
+}
+
+/**
+ * 日付範囲フィルタの値をエポックミリ秒の範囲に変換
+ * 開始日の0時〜終了日の23:59:59.999（セルの表示と同じタイムゾーン）。
+ * 未指定の端は±Infinity
+ */
+function dateRangeBounds(
+  filterValue: [Date | undefined, Date | undefined],
+  timeZone: string,
+): [number, number] {
+  const [start, end] = filterValue
+  let high = Infinity
+  if (end !== undefined) {
+    const endDate = new Date(end)
+    const nextDay = new Date(
+      endDate.getFullYear(),
+      endDate.getMonth(),
+      endDate.getDate() + 1,
+    )
+    high = startOfDayInTimeZone(nextDay, timeZone) - 1
+  }
+  return [
+    start !== undefined
+      ? startOfDayInTimeZone(new Date(start), timeZone)
+      : -Infinity,
+    high,
+  ]
+}
+
+/**
+ * 型付き配列のカラム用のフィルタ判定関数を作成（行インデックスで判定）
+ *
+ * 数値範囲・日付範囲はソート済みインデックスの二分探索で一致する行を求める。
+ * それ以外（Boolカラムの選択フィルタなど）はセル値で判定する。
+ */
+export function createTypedColumnFilter(
+  column: TypedColumn,
+  colType: ColumnType,
+  filterValue: unknown,
+  timeZone = 'UTC',
+): (rowIndex: number) => boolean {
+  if (colType === 'number' && Array.isArray(filterValue)) {
+    const [min, max] = filterValue as [number | undefined, number | undefined]
+    if (min === undefined && max === undefined) return () => true
+    return createRangeFilter(column, min ?? -Infinity, max ?? Infinity)
+  }
+
+  if (
+    colType === 'date' &&
+    column.type !== 'boolean' &&
+    Array.isArray(filterValue)
+  ) {
+    const range = filterValue as [Date | undefined, Date | undefined]
+    if (range[0] === undefined && range[1] === undefined) return () => true
+    const [low, high] = dateRangeBounds(range, timeZone)
+    return createRangeFilter(column, low, high)
+  }
+
+  return (rowIndex) =>
+    matchesColumnFilter(
+      getTypedValue(column, rowIndex),
+      colType,
+      filterValue,
+      timeZone,
+    )
+}
+
+/**
+ * 辞書の各値がフィルタに一致するかを判定（辞書のコードごとの判定結果）
+ * 辞書値ごとに一度だけ判定し、行のフィルタはコードの参照で行う
+ */
+export function dictionaryFilterMask(
+  dictionary: readonly unknown[],
+  colType: ColumnType,
+  filterValue: unknown,
+  timeZone = 'UTC',
+): Uint8Array {
+  const mask = new Uint8Array(dictionary.length)
+  dictionary.forEach((dictValue, code) => {
+    mask[code] = matchesColumnFilter(dictValue, colType, filterValue, timeZone)
+      ? 1
+      : 0
+  })
+  return mask
+}
+
+/**
+ * セル値がカラムフィルタの条件に一致するか判定（カラムタイプに応じて処理）
+ * 日付範囲はtimeZone（カラムの表示のタイムゾーン）の日付で判定する
+ */
+export function matchesColumnFilter(
+  cellValue: unknown,
+  colType: ColumnType,
+  filterValue: unknown,
+  timeZone = 'UTC',
+): boolean {
+  switch (colType) {
+    case 'text': {
+      // テキストフィルタ: 文字列の場合は部分一致、オブジェクトの場合は複数選択
+      if (!filterValue || filterValue === '') return true
+
+      // 複数選択フィルタの場合
+      if (isMultiSelectFilter(filterValue)) {
+        const selectedValues = filterValue.values
+        if (selectedValues.length === 0) return true
+        const cellText = String(cellValue ?? '')
+        return selectedValues.includes(cellText)
+      }
+
+      // テキスト検索の場合
+      const searchValue = normalizeText(String(filterValue))
+      return normalizeText(String(cellValue ?? '')).includes(searchValue)
+    }
+    case 'number': {
+      // 数値範囲フィルタ: [min, max]
+      if (!filterValue) return true
+      const [min, max] = filterValue as [
+        number | undefined,
+        number | undefined,
+      ]
+      if (min === undefined && max === undefined) return true
+
+      const numValue = Number(cellValue)
+      if (isNaN(numValue)) return false
+
+      if (min !== undefined && numValue < min) return false
+      if (max !== undefined && numValue > max) return false
+      return true
+    }
+    case 'date': {
+      // 日付範囲フィルタ: [start, end]
+      if (!filterValue) return true
+      const [start, end] = filterValue as [
+        Date | undefined,
+        Date | undefined,
+      ]
+      if (start === undefined && end === undefined) return true
+
+      // セル値をDateオブジェクトに変換
+      let cellDate: Date | null = null
+      if (cellValue instanceof Date) {
+        cellDate = cellValue
+      } else if (typeof cellValue === 'number') {
+        // 日時カラムはエポックミリ秒で届く
+        cellDate = new Date(cellValue)
+      } else if (typeof cellValue === 'string') {
+        cellDate = new Date(cellValue)
+      }
+
+      if (!cellDate || isNaN(cellDate.getTime())) return false
+
+      // 開始日の0時〜終了日の23:59:59.999に含まれるか
+      const [low, high] = dateRangeBounds([start, end], timeZone)
+      const cellTime = cellDate.getTime()
+      return cellTime >= low && cellTime <= high
+    }
+    case 'select': {
+      // セレクトフィルタ: 複数選択のみ
+      if (!filterValue || filterValue === '') return true
+
+      // 複数選択フィルタの場合
+      if (isMultiSelectFilter(filterValue)) {
+        const selectedValues = filterValue.values
+        if (selectedValues.length === 0) return true
+        const cellText = String(cellValue ?? '')
+        return selectedValues.includes(cellText)
+      }
+
+      // テキスト検索の場合（フォールバック）
+      const searchValue = normalizeText(String(filterValue))
+      return normalizeText(String(cellValue ?? '')).includes(searchValue)
+    }
+    default:
+      return true
+  }
+}
@@ -0,0 +1,130 @@
+/**
+ * 範囲フィルタ用のソート済みインデックス
+ * 型付き配列のカラムの行を値の順に並べておき、数値範囲・日付範囲のフィルタを
+ * 二分探索で連続した区間として求める
+ */
+
+import { getCellValue } from '@/lib/columnStore'
+import {
+  createTypedColumn,
+  isValidAt,
+  setTypedValue,
+} from '@/lib/typedColumn'
+import { ColumnStore, TypedColumn } from '@/types/table'
+
+/**
+ * カラムのソート済みインデックス
+ */
+interface RangeIndex {
+  /** 値のある行の行インデックス（値の昇順） */
+  rows: Int32Array
+  /** rowsの各行の値（昇順） */
+  values: Float64Array
+}
+
+// カラムごとのインデックス（最初の範囲フィルタ時に作成し、データが変わるまで使い回す）
+const indexCache = new WeakMap<TypedColumn, RangeIndex>()
+// ストアごとの、日付文字列などを日時に変換したカラム
+const dateColumnCache = new WeakMap<ColumnStore, Map<string, TypedColumn>>()
+
+/**
+ * カラムのソート済みインデックスを取得（未作成の場合は作成してキャッシュ）
+ */
+function rangeIndex(column: TypedColumn): RangeIndex {
+  const cached = indexCache.get(column)
+  if (cached) return cached
+
+  const validRows: number[] = []
+  for (let rowIndex = 0; rowIndex < column.values.length; rowIndex++) {
+    if (isValidAt(column, rowIndex)) validRows.push(rowIndex)
+  }
+  const values = column.values
+  const rows = Int32Array.from(validRows).sort(
+    (a, b) => values[a] - values[b] || a - b,
+  )
+  const index = { rows, values: Float64Array.from(rows, (row) => values[row]) }
+  indexCache.set(column, index)
+  return index
+}
+
+/**
+ * 昇順の配列で、値がtarget以上（inclusive=falseの場合はtargetより大きい）
+ * になる最初の位置を二分探索
+ */
+function searchBound(
+  values: Float64Array,
+  target: number,
+  inclusive: boolean,
+): number {
+  let low = 0
+  let high = values.length
+  while (low < high) {
+    const mid = (low + high) >> 1
+    if (inclusive ? values[mid] < target : values[mid] <= target) {
+      low = mid + 1
+    } else {
+      high = mid
+    }
+  }
+  return low
+}
+
+/**
+ * 値が範囲 [low, high] に含まれる行の判定関数を作成
+ *
+ * 範囲に含まれる行はソート済みインデックスの連続した区間になるため、二分探索で
+ * 区間を求め、その行のみをマスクに記録する。行の判定はマスクの参照で行う。
+ *
+ * @param column - 型付き配列のカラム
+ * @param low - 下限（含む、下限なしは-Infinity）
+ * @param high - 上限（含む、上限なしはInfinity）
+ */
+export function createRangeFilter(
+  column: TypedColumn,
+  low: number,
+  high: number,
+): (rowIndex: number) => boolean {
+  const index = rangeIndex(column)
+  const start = searchBound(index.values, low, true)
+  const end = searchBound(index.values, high, false)
+
+  const mask = new Uint8Array(column.values.length)
+  for (let i = start; i < end; i++) mask[index.rows[i]] = 1
+  return (rowIndex) => mask[rowIndex] === 1
+}
+
+/**
+ * 型付き配列でないカラムの値を日時（エポックミリ秒）に変換したカラムを取得
+ * （未作成の場合は作成してキャッシュ）
+ *
+ * 日付範囲フィルタで行ごとにDateを作らないよう、値の変換はデータにつき一度だけ
+ * 行う。変換できない値は欠損値とする。
+ *
+ * @param store - カラム単位のデータストア
+ * @param columnId - カラムID
+ */
+export function dateColumn(store: ColumnStore, columnId: string): TypedColumn {
+  let storeColumns = dateColumnCache.get(store)
+  if (!storeColumns) {
+    storeColumns = new Map()
+    dateColumnCache.set(store, storeColumns)
+  }
+  const cached = storeColumns.get(columnId)
+  if (cached) return cached
+
+  const column = createTypedColumn('datetime', store.rowCount)
+  for (let rowIndex = 0; rowIndex < store.rowCount; rowIndex++) {
+    const value = getCellValue(store, rowIndex, columnId)
+    // 日時カラムはエポックミリ秒、それ以外は文字列・Dateとして変換
+    const time =
+      value instanceof Date
+        ? value.getTime()
+        : typeof value === 'number' || typeof value === 'string'
+          ? new Date(value).getTime()
+          : NaN
+    setTypedValue(column, rowIndex, isNaN(time) ? null : time)
+  }
+
+  storeColumns.set(columnId, column)
+  return column
+}
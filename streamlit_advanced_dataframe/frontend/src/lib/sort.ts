@@ -0,0 +1,63 @@
+/**
+ * セル値の比較（ソート用）
+ */
+
+// 文字列の比較に使うCollator（比較のたびにlocaleCompareでロケールを解決しない）
+const collator = new Intl.Collator('ja', { sensitivity: 'base' })
+
+/**
+ * 2つのセル値を比較する（日本語対応、nullは末尾）
+ */
+export function compareCellValues(a: unknown, b: unknown): number {
+  // nullやundefinedの処理
+  if (a == null && b == null) return 0
+  if (a == null) return 1
+  if (b == null) return -1
+
+  // 文字列の場合は日本語対応のCollatorを使用
+  if (typeof a === 'string' && typeof b === 'string') {
+    return collator.compare(a, b)
+  }
+
+  // 数値の場合は通常の比較
+  if (typeof a === 'number' && typeof b === 'number') {
+    return a - b
+  }
+
+  // その他の型はデフォルトの比較
+  return a < b ? -1 : a > b ? 1 : 0
+}
+
+/**
+ * 辞書値の順位を計算（辞書エンコードされたカラムのソート用）
+ * 辞書値だけを一度ソートしておき、行の比較はコードの順位の整数比較で行う
+ * 比較結果が等しい値は同じ順位にする（元の順序を保つ安定ソートのため）
+ */
+export function dictionaryRanks(dictionary: readonly unknown[]): Int32Array {
+  const order = dictionary
+    .map((_, code) => code)
+    .sort((a, b) => compareCellValues(dictionary[a], dictionary[b]))
+  const ranks = new Int32Array(dictionary.length)
+  order.forEach((code, i) => {
+    const previous = order[i - 1]
+    ranks[code] =
+      i > 0 && compareCellValues(dictionary[previous], dictionary[code]) === 0
+        ? ranks[previous]
+        : i
+  })
+  return ranks
+}
+
+/**
+ * Pythonで計算した順位で2行を比較（欠損値の順位は-1、末尾）
+ */
+export function compareSortRanks(
+  ranks: Int32Array,
+  rowA: number,
+  rowB: number,
+): number {
+  const a = ranks[rowA]
+  const b = ranks[rowB]
+  if (a < 0 || b < 0) return a === b ? 0 : a < 0 ? 1 : -1
+  return a - b
+}
@@ -0,0 +1,192 @@
+/**
+ * ソートエンジン
+ * カラムごとの行の順位をデータにつき一度だけ計算し、行の比較を整数比較にする
+ * ソート済みの順序を保持し、ソート方向の反転のみの場合は再ソートせずに使い回す
+ */
+
+import { getCellValue } from '@/lib/columnStore'
+import {
+  compareCellValues,
+  compareSortRanks,
+  dictionaryRanks,
+} from '@/lib/sort'
+import { compareTypedValues } from '@/lib/typedColumn'
+import { ColumnStore } from '@/types/table'
+
+/** ソート状態（TanStack TableのSortingState） */
+export type SortSpec = { id: string; desc: boolean }[]
+
+/** 行インデックスで比較する関数（昇順、欠損値は末尾） */
+type RowComparator = (a: number, b: number) => number
+
+/** 前回のソート結果（方向の反転に使う） */
+interface SortedOrder {
+  /** ソート対象の行インデックス（同じ配列の場合のみ使い回す） */
+  rowIndices: ArrayLike<number>
+  /** ソートしたカラムID */
+  columnIds: string[]
+  /** すべて昇順でソートした順序 */
+  ascending: Int32Array
+}
+
+// ストアごとの比較関数（カラム単位で作成し、データが変わるまで使い回す）
+const comparatorCache = new WeakMap<ColumnStore, Map<string, RowComparator>>()
+// ストアごとの前回のソート結果
+const orderCache = new WeakMap<ColumnStore, SortedOrder>()
+
+/**
+ * カラムの各行の順位を計算（等しい値は同じ順位、欠損値は-1）
+ */
+function columnRanks(store: ColumnStore, columnId: string): Int32Array {
+  const ranks = new Int32Array(store.rowCount)
+
+  // 辞書エンコードされたカラムは辞書値の順位を行に展開
+  const codes = store.columns.get(columnId)
+  const dictionary = store.dictionaries?.get(columnId)
+  if (codes && dictionary) {
+    const codeRanks = dictionaryRanks(dictionary)
+    codes.forEach((code, rowIndex) => {
+      ranks[rowIndex] = code == null ? -1 : codeRanks[code as number]
+    })
+    return ranks
+  }
+
+  // それ以外のカラムは値を一度だけ取り出して行をソート
+  const values = Array.from({ length: store.rowCount }, (_, rowIndex) =>
+    getCellValue(store, rowIndex, columnId),
+  )
+  const order = Array.from({ length: store.rowCount }, (_, i) => i).sort(
+    (a, b) => compareCellValues(values[a], values[b]),
+  )
+  order.forEach((rowIndex, i) => {
+    const previous = order[i - 1]
+    ranks[rowIndex] =
+      values[rowIndex] == null
+        ? -1
+        : i > 0 && compareCellValues(values[previous], values[rowIndex]) === 0
+          ? ranks[previous]
+          : i
+  })
+  return ranks
+}
+
+/**
+ * カラムの比較関数を取得（未作成の場合は作成してキャッシュ）
+ *
+ * 型付き配列のカラムは値を直接比較し、それ以外のカラムはPythonで計算した順位、
+ * なければ初回に計算した順位で比較する。
+ *
+ * @param store - カラム単位のデータストア
+ * @param columnId - カラムID
+ * @returns 行インデックスで比較する関数（昇順、欠損値は末尾）
+ */
+export function getRowComparator(
+  store: ColumnStore,
+  columnId: string,
+): RowComparator {
+  let storeComparators = comparatorCache.get(store)
+  if (!storeComparators) {
+    storeComparators = new Map()
+    comparatorCache.set(store, storeComparators)
+  }
+  const cached = storeComparators.get(columnId)
+  if (cached) return cached
+
+  let comparator: RowComparator
+  const typedColumn = store.typedColumns?.get(columnId)
+  if (typedColumn) {
+    comparator = (a, b) => compareTypedValues(typedColumn, a, b)
+  } else {
+    const ranks =
+      store.sortRanks?.get(columnId) ?? columnRanks(store, columnId)
+    comparator = (a, b) => compareSortRanks(ranks, a, b)
+  }
+
+  storeComparators.set(columnId, comparator)
+  return comparator
+}
+
+/**
+ * ソート済みの順序を逆順にする（比較結果が等しい行の並びは保つ）
+ * 安定ソートの昇順と降順は、等しい行のまとまりの順序のみが逆になる
+ */
+function reverseGroups(order: Int32Array, compare: RowComparator): Int32Array {
+  const reversed = new Int32Array(order.length)
+  let end = order.length
+  let offset = 0
+  while (end > 0) {
+    let start = end - 1
+    while (start > 0 && compare(order[start - 1], order[end - 1]) === 0) {
+      start--
+    }
+    reversed.set(order.subarray(start, end), offset)
+    offset += end - start
+    end = start
+  }
+  return reversed
+}
+
+/**
+ * 行インデックスをソート（比較結果が等しい行は元の順序を保つ）
+ *
+ * TanStack Tableと同じ結果になるようにする: 複数カラムの場合は先のカラムを
+ * 優先し、降順は比較結果を反転する（欠損値は先頭になる）。同じ行の配列・
+ * カラムに対して、すべての方向を反転しただけの場合は前回の結果を逆順にする。
+ *
+ * @param store - カラム単位のデータストア
+ * @param rowIndices - ソートする行インデックス
+ * @param sorting - ソート状態
+ * @returns ソートした行インデックス
+ */
+export function sortRowIndices(
+  store: ColumnStore,
+  rowIndices: ArrayLike<number>,
+  sorting: SortSpec,
+): Int32Array {
+  if (sorting.length === 0) return Int32Array.from(rowIndices)
+
+  const comparators = sorting.map(({ id }) => getRowComparator(store, id))
+  // すべて昇順とした場合の比較関数
+  const compareAscending: RowComparator = (a, b) => {
+    for (const compare of comparators) {
+      const result = compare(a, b)
+      if (result !== 0) return result
+    }
+    return 0
+  }
+  const isDescending = sorting[0].desc
+  const isUniform = sorting.every(({ desc }) => desc === isDescending)
+  const columnIds = sorting.map(({ id }) => id)
+
+  // 前回と同じ行・カラムで方向のみが異なる場合は前回の結果を使う
+  const cached = orderCache.get(store)
+  if (
+    isUniform &&
+    cached?.rowIndices === rowIndices &&
+    cached.columnIds.length === columnIds.length &&
+    cached.columnIds.every((id, i) => id === columnIds[i])
+  ) {
+    return isDescending
+      ? reverseGroups(cached.ascending, compareAscending)
+      : cached.ascending.slice()
+  }
+
+  const sorted = Int32Array.from(rowIndices).sort((a, b) => {
+    for (let i = 0; i < comparators.length; i++) {
+      const result = comparators[i](a, b)
+      if (result !== 0) return sorting[i].desc ? -result : result
+    }
+    return a - b
+  })
+
+  if (isUniform) {
+    orderCache.set(store, {
+      rowIndices,
+      columnIds,
+      ascending: isDescending
+        ? reverseGroups(sorted, compareAscending)
+        : sorted.slice(),
+    })
+  }
+  return sorted
+}
@@ -0,0 +1,139 @@
+/**
+ * サブ行の遅延読み込み
+ * トップレベルの行のみが届き、行を展開するとそのサブ行がPythonから届く
+ * 届いたサブ行は上限付きでキャッシュし、トップレベルの行と合わせて1つのストアにする
+ */
+
+import {
+  columnStoreFromHierarchy,
+  HierarchicalPayload,
+} from '@/lib/columnStore'
+import { ColumnStore } from '@/types/table'
+
+/**
+ * 1階層分の行（各行のサブ行の数付き）
+ */
+export interface LazyLevelPayload extends HierarchicalPayload {
+  /** 各行のサブ行の数 */
+  child_counts: number[]
+}
+
+/**
+ * Pythonから届くサブ行
+ */
+export interface SubRowsPayload {
+  /** 展開した行のパス */
+  path: number[]
+  /** サブ行 */
+  data: LazyLevelPayload
+}
+
+// キャッシュするサブ行の行数の上限（超えた場合は古く読み込んだものから破棄）
+const SUB_ROWS_CACHE_ROW_LIMIT = 100_000
+
+// iframeにつきコンポーネントは1つのため、モジュールで保持する
+// 行のパス → サブ行（Mapの挿入順を読み込んだ順として使う）
+const subRowsCache = new Map<string, LazyLevelPayload>()
+let cachedRowCount = 0
+// キャッシュしているサブ行のデータ（data_key）
+let cacheDataKey: string | null = null
+// キャッシュの内容が変わるたびに増やす（ストアの作り直しの判定用）
+let cacheVersion = 0
+
+/**
+ * 遅延読み込みする階層データのペイロードかどうか
+ */
+export function isLazyPayload(payload: unknown): payload is LazyLevelPayload {
+  return (
+    typeof payload === 'object' &&
+    payload !== null &&
+    'child_counts' in payload
+  )
+}
+
+/**
+ * キャッシュからサブ行とその子孫のサブ行を削除
+ */
+function evictSubRows(pathKey: string): void {
+  Array.from(subRowsCache.keys()).forEach((key) => {
+    if (key === pathKey || key.startsWith(`${pathKey}/`)) {
+      cachedRowCount -= subRowsCache.get(key)!.row_count
+      subRowsCache.delete(key)
+    }
+  })
+}
+
+/**
+ * 届いたサブ行をキャッシュに追加
+ *
+ * データが変わった場合（data_keyが異なる場合）はキャッシュを空にする。
+ * 行数の上限を超えた場合は、古く読み込んだサブ行から破棄する（破棄された行を
+ * 再度展開すると、もう一度Pythonに要求する）。
+ *
+ * @param dataKey - データのフィンガープリント
+ * @param subRows - 届いたサブ行（届いていない場合はundefined）
+ * @returns キャッシュのバージョン（内容が変わった場合のみ変わる）
+ */
+export function updateSubRowsCache(
+  dataKey: string | null,
+  subRows: SubRowsPayload | undefined,
+): number {
+  if (dataKey !== cacheDataKey) {
+    subRowsCache.clear()
+    cachedRowCount = 0
+    cacheDataKey = dataKey
+    cacheVersion++
+  }
+
+  const pathKey = subRows?.path.join('/')
+  if (!subRows || pathKey === undefined || subRowsCache.has(pathKey)) {
+    return cacheVersion
+  }
+
+  subRowsCache.set(pathKey, subRows.data)
+  cachedRowCount += subRows.data.row_count
+  for (const key of subRowsCache.keys()) {
+    if (cachedRowCount <= SUB_ROWS_CACHE_ROW_LIMIT) break
+    if (key !== pathKey) evictSubRows(key)
+  }
+  cacheVersion++
+  return cacheVersion
+}
+
+/**
+ * トップレベルの行とキャッシュしたサブ行からストアを作成
+ * 親の後ろにサブ行を追加していく（親は常にサブ行より前に並ぶ）
+ *
+ * @param topLevel - トップレベルの行
+ */
+export function lazyColumnStore(topLevel: LazyLevelPayload): ColumnStore {
+  const columns = new Map(
+    Object.entries(topLevel.columns).map(([id, values]) => [id, [...values]]),
+  )
+  const parents = [...topLevel.parents]
+  const childCounts = [...topLevel.child_counts]
+  const rowPaths = topLevel.parents.map((_, i) => String(i))
+
+  for (let rowIndex = 0; rowIndex < parents.length; rowIndex++) {
+    const level =
+      childCounts[rowIndex] > 0
+        ? subRowsCache.get(rowPaths[rowIndex])
+        : undefined
+    if (!level) continue
+    for (let i = 0; i < level.row_count; i++) {
+      parents.push(rowIndex)
+      childCounts.push(level.child_counts[i])
+      rowPaths.push(`${rowPaths[rowIndex]}/${i}`)
+      columns.forEach((values, id) =>
+        values.push(level.columns[id]?.[i] ?? null),
+      )
+    }
+  }
+
+  const store = columnStoreFromHierarchy({
+    row_count: parents.length,
+    columns: Object.fromEntries(columns),
+    parents,
+  })
+  return { ...store, childCounts, rowPaths }
+}
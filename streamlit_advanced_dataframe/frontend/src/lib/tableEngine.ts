@@ -0,0 +1,185 @@
+/**
+ * テーブルエンジン
+ * フィルタ・ソート・グローバル検索を行インデックスの配列に対して計算する
+ * （Web Workerで実行し、メインスレッドには行インデックスのみを返す）
+ */
+
+import { getCellValue } from '@/lib/columnStore'
+import {
+  createTypedColumnFilter,
+  dictionaryFilterMask,
+  matchesColumnFilter,
+} from '@/lib/filter'
+import { dateColumn } from '@/lib/rangeIndex'
+import { SortSpec, sortRowIndices } from '@/lib/sortEngine'
+import {
+  createTextIndexFilter,
+  displayPositions,
+  findSearchMatches,
+} from '@/lib/textIndex'
+import { ColumnMeta, ColumnStore, ColumnType } from '@/types/table'
+
+/**
+ * エンジンへの問い合わせ（テーブルの状態）
+ */
+export interface EngineQuery {
+  /** ソート状態（TanStack TableのSortingState） */
+  sorting: SortSpec
+  /** カラムフィルタ（TanStack TableのColumnFiltersState） */
+  filters: { id: string; value: unknown }[]
+  /** フィルタタイプ（カラムIDごと） */
+  columnTypes: Map<string, ColumnType>
+  /**
+   * 日時カラムのメタデータ（カラムIDごと）
+   * 日付範囲フィルタのタイムゾーンと、検索するテキストのフォーマットに使う
+   */
+  datetimeMeta: Map<string, ColumnMeta>
+  /** グローバル検索クエリ（空文字の場合は検索しない） */
+  searchQuery: string
+  /** 検索対象のカラムID（一致箇所はこの順序で並ぶ） */
+  searchColumns: string[]
+}
+
+/**
+ * エンジンの計算結果
+ */
+export interface EngineResult {
+  /** フィルタ・ソート後の行インデックス（表示順） */
+  rowIndices: Int32Array
+  /** 検索の一致箇所の表示位置（rowIndices内の位置） */
+  matchRows: Int32Array
+  /** 検索の一致箇所のカラム（searchColumns内の位置） */
+  matchColumns: Int32Array
+}
+
+/** Workerへ送るメッセージ */
+export type EngineRequest =
+  | { type: 'load'; store: ColumnStore }
+  | { type: 'query'; id: number; query: EngineQuery }
+
+/** Workerから届くメッセージ */
+export interface EngineResponse {
+  id: number
+  result: EngineResult
+}
+
+// ストアごとのトップレベルの行インデックス
+// （前回のソート結果を使い回せるよう、同じストアには同じ配列を渡す）
+const topLevelRows = new WeakMap<ColumnStore, Int32Array>()
+
+/**
+ * 行インデックスで判定するフィルタ関数を作成
+ * 型付き配列・辞書・ソート済みインデックス・トライグラム索引を使い、
+ * セルごとの変換を避ける
+ *
+ * @param timeZone - 日付範囲を判定するタイムゾーン（カラムの表示と同じ）
+ */
+export function createRowFilter(
+  store: ColumnStore,
+  columnId: string,
+  colType: ColumnType,
+  filterValue: unknown,
+  timeZone = 'UTC',
+): (rowIndex: number) => boolean {
+  const typedColumn = store.typedColumns?.get(columnId)
+  if (typedColumn) {
+    return createTypedColumnFilter(typedColumn, colType, filterValue, timeZone)
+  }
+
+  const codes = store.columns.get(columnId)
+  const dictionary = store.dictionaries?.get(columnId)
+  if (codes && dictionary) {
+    const mask = dictionaryFilterMask(
+      dictionary,
+      colType,
+      filterValue,
+      timeZone,
+    )
+    const nullMatches = matchesColumnFilter(null, colType, filterValue)
+    return (rowIndex) => {
+      const code = codes[rowIndex] as number | null
+      return code == null ? nullMatches : mask[code] === 1
+    }
+  }
+
+  // 日付範囲は日時に変換したカラムのソート済みインデックスで一致する行を求める
+  if (colType === 'date') {
+    return createTypedColumnFilter(
+      dateColumn(store, columnId),
+      colType,
+      filterValue,
+      timeZone,
+    )
+  }
+
+  // テキストの部分一致はトライグラム索引で一致する行を求める
+  if (colType === 'text' || colType === 'select') {
+    const textFilter = createTextIndexFilter(store, columnId, filterValue)
+    if (textFilter) return textFilter
+  }
+
+  return (rowIndex) =>
+    matchesColumnFilter(
+      getCellValue(store, rowIndex, columnId),
+      colType,
+      filterValue,
+      timeZone,
+    )
+}
+
+/**
+ * フィルタ・ソート・グローバル検索を計算
+ *
+ * TanStack Tableと同じ結果になるようにする: フィルタはすべての条件を満たす行、
+ * ソートは降順で比較結果を反転し、等しい行は元の順序を保つ。
+ * すべての行をソートしてからフィルタするため、フィルタの変更では再ソートせず、
+ * ソート方向の反転では前回のソート結果を使い回す。
+ *
+ * @param store - カラム単位のデータストア（フラットなデータ）
+ * @param query - テーブルの状態
+ */
+export function runQuery(store: ColumnStore, query: EngineQuery): EngineResult {
+  // ソート（比較結果が等しい行は元の順序を保つ）
+  let allRows = topLevelRows.get(store)
+  if (!allRows) {
+    allRows = Int32Array.from({ length: store.topLevelCount }, (_, i) => i)
+    topLevelRows.set(store, allRows)
+  }
+  const sorted = sortRowIndices(store, allRows, query.sorting)
+
+  // フィルタ（ソート済みの順序を保つ）
+  const rowFilters = query.filters.flatMap(({ id, value }) => {
+    const colType = query.columnTypes.get(id)
+    const timeZone = query.datetimeMeta.get(id)?.timezone ?? undefined
+    return colType ? [createRowFilter(store, id, colType, value, timeZone)] : []
+  })
+  const rowIndices =
+    rowFilters.length > 0
+      ? sorted.filter((rowIndex) =>
+          rowFilters.every((rowFilter) => rowFilter(rowIndex)),
+        )
+      : sorted
+
+  // グローバル検索（トライグラム索引から表示順・カラム順に一致箇所を列挙）
+  const matches = query.searchQuery.trim()
+    ? findSearchMatches(
+        store,
+        query.searchColumns,
+        query.searchQuery,
+        displayPositions(store.rowCount, rowIndices),
+        query.datetimeMeta,
+      )
+    : []
+  const columnIndices = new Map(
+    query.searchColumns.map((columnId, i) => [columnId, i]),
+  )
+
+  return {
+    rowIndices,
+    matchRows: Int32Array.from(matches, (match) => match.rowIndex),
+    matchColumns: Int32Array.from(
+      matches,
+      (match) => columnIndices.get(match.columnId) ?? -1,
+    ),
+  }
+}
@@ -0,0 +1,284 @@
+/**
+ * 部分一致検索用のトライグラム索引
+ * グローバル検索とテキストフィルタで使用し、セルごとの文字列変換・走査を避ける
+ */
+
+import {
+  cellTextKey,
+  normalizeText,
+  normalizedColumnTexts,
+} from '@/lib/cellText'
+import { CellPosition, ColumnMeta, ColumnStore } from '@/types/table'
+
+/** 索引に使うn-gramの長さ */
+const GRAM_LENGTH = 3
+
+/**
+ * 文字列の集合に対するトライグラム索引
+ */
+interface TextIndex {
+  /** 各項目の正規化したテキスト */
+  texts: string[]
+  /** トライグラム → そのトライグラムを含む項目の番号（昇順） */
+  postings: Map<string, Int32Array>
+  /** 前回のクエリと一致した項目（クエリを伸ばしたときの絞り込み用） */
+  previous?: { query: string; entries: Int32Array }
+}
+
+/**
+ * カラムの索引
+ * 辞書エンコードされたカラムは辞書値を索引し、コードごとの行を別に持つ
+ */
+interface ColumnTextIndex {
+  index: TextIndex
+  /** 辞書のコードごとの行インデックス（辞書エンコードされたカラムのみ） */
+  rowsByCode?: Int32Array[]
+}
+
+// ストアごとの索引（最初の検索時にカラムとフォーマット単位で作成し、データが
+// 変わるまで使い回す）
+const indexCache = new WeakMap<ColumnStore, Map<string, ColumnTextIndex>>()
+
+/**
+ * テキストの配列からトライグラム索引を作成
+ */
+function buildTextIndex(texts: string[]): TextIndex {
+  const lists = new Map<string, number[]>()
+  texts.forEach((text, entry) => {
+    for (let i = 0; i + GRAM_LENGTH <= text.length; i++) {
+      const gram = text.slice(i, i + GRAM_LENGTH)
+      let list = lists.get(gram)
+      if (!list) {
+        list = []
+        lists.set(gram, list)
+      }
+      // 同じ項目内で繰り返すトライグラムは一度だけ登録
+      if (list[list.length - 1] !== entry) list.push(entry)
+    }
+  })
+
+  const postings = new Map<string, Int32Array>()
+  lists.forEach((list, gram) => postings.set(gram, Int32Array.from(list)))
+  return { texts, postings }
+}
+
+/**
+ * 昇順の2つの配列の共通部分
+ */
+function intersect(a: Int32Array, b: Int32Array): Int32Array {
+  const result: number[] = []
+  let i = 0
+  let j = 0
+  while (i < a.length && j < b.length) {
+    if (a[i] === b[j]) {
+      result.push(a[i])
+      i++
+      j++
+    } else if (a[i] < b[j]) {
+      i++
+    } else {
+      j++
+    }
+  }
+  return Int32Array.from(result)
+}
+
+/**
+ * クエリを含む項目の番号を取得（昇順）
+ *
+ * クエリのトライグラムの出現リストの共通部分を候補とし、候補のみ実際に
+ * 部分一致を確認する。トライグラムを作れない短いクエリは全項目を確認する。
+ * 入力中にクエリを伸ばした場合（前回のクエリを含む場合）は、前回一致した
+ * 項目のみを確認する。
+ *
+ * @param index - トライグラム索引
+ * @param query - 正規化した検索文字列（空でないこと）
+ */
+function findEntries(index: TextIndex, query: string): Int32Array {
+  const entries = findEntriesFrom(index, query)
+  index.previous = { query, entries }
+  return entries
+}
+
+/**
+ * 前回の結果または索引を使ってクエリを含む項目を検索
+ */
+function findEntriesFrom(index: TextIndex, query: string): Int32Array {
+  const { texts, postings, previous } = index
+
+  // 前回のクエリを含むクエリの一致は前回の一致の部分集合
+  // （前回が短いクエリの場合は、出現リストの方が候補を絞り込める）
+  if (
+    previous &&
+    query.includes(previous.query) &&
+    (previous.query.length >= GRAM_LENGTH || query.length < GRAM_LENGTH)
+  ) {
+    if (query === previous.query) return previous.entries
+    return previous.entries.filter((entry) => texts[entry].includes(query))
+  }
+
+  if (query.length < GRAM_LENGTH) {
+    const entries: number[] = []
+    texts.forEach((text, entry) => {
+      if (text.includes(query)) entries.push(entry)
+    })
+    return Int32Array.from(entries)
+  }
+
+  const lists: Int32Array[] = []
+  for (let i = 0; i + GRAM_LENGTH <= query.length; i++) {
+    const list = postings.get(query.slice(i, i + GRAM_LENGTH))
+    if (!list) return new Int32Array(0)
+    lists.push(list)
+  }
+  // 短いリストから共通部分を取り、候補を早く絞り込む
+  lists.sort((a, b) => a.length - b.length)
+  let candidates = lists[0]
+  for (let i = 1; i < lists.length && candidates.length > 0; i++) {
+    candidates = intersect(candidates, lists[i])
+  }
+
+  return candidates.filter((entry) => texts[entry].includes(query))
+}
+
+/**
+ * カラムの索引を取得（未作成の場合は作成してキャッシュ）
+ */
+function columnTextIndex(
+  store: ColumnStore,
+  columnId: string,
+  meta?: ColumnMeta,
+): ColumnTextIndex {
+  let storeIndexes = indexCache.get(store)
+  if (!storeIndexes) {
+    storeIndexes = new Map()
+    indexCache.set(store, storeIndexes)
+  }
+  const key = cellTextKey(columnId, meta)
+  const cached = storeIndexes.get(key)
+  if (cached) return cached
+
+  // 正規化したテキストはキャッシュを共有する
+  const { normalized, codes } = normalizedColumnTexts(store, columnId, meta)
+  const columnIndex: ColumnTextIndex = { index: buildTextIndex(normalized) }
+  if (codes) {
+    const rowLists: number[][] = normalized.map(() => [])
+    codes.forEach((code, rowIndex) => {
+      if (code != null) rowLists[code as number].push(rowIndex)
+    })
+    columnIndex.rowsByCode = rowLists.map((rows) => Int32Array.from(rows))
+  }
+
+  storeIndexes.set(key, columnIndex)
+  return columnIndex
+}
+
+/**
+ * セルのテキストがクエリを含む行のインデックスを取得（昇順）
+ *
+ * @param store - カラム単位のデータストア
+ * @param columnId - カラムID
+ * @param query - 正規化した検索文字列（空でないこと）
+ * @param meta - カラムのメタデータ（日時カラムは表示と同じテキストで検索）
+ */
+export function findMatchingRows(
+  store: ColumnStore,
+  columnId: string,
+  query: string,
+  meta?: ColumnMeta,
+): Int32Array {
+  const { index, rowsByCode } = columnTextIndex(store, columnId, meta)
+  const entries = findEntries(index, query)
+  if (!rowsByCode) return entries
+
+  // 辞書エンコードされたカラム: 一致した辞書値の行をまとめる
+  // （欠損値の行は空文字のため、空でないクエリには一致しない）
+  const rows: number[] = []
+  entries.forEach((code) => {
+    rowsByCode[code].forEach((rowIndex) => rows.push(rowIndex))
+  })
+  return Int32Array.from(rows).sort()
+}
+
+/**
+ * テキストフィルタ（部分一致）の判定関数を索引から作成
+ * 一致する行のマスクを一度だけ作り、行の判定はマスクの参照で行う
+ *
+ * @param store - カラム単位のデータストア
+ * @param columnId - カラムID
+ * @param filterValue - フィルタ値（文字列の場合のみ索引を使用）
+ * @returns 判定関数（索引を使えないフィルタ値の場合はnull）
+ */
+export function createTextIndexFilter(
+  store: ColumnStore,
+  columnId: string,
+  filterValue: unknown,
+): ((rowIndex: number) => boolean) | null {
+  if (typeof filterValue !== 'string' || filterValue === '') return null
+
+  const mask = new Uint8Array(store.rowCount)
+  findMatchingRows(store, columnId, normalizeText(filterValue)).forEach(
+    (rowIndex) => {
+      mask[rowIndex] = 1
+    },
+  )
+  return (rowIndex) => mask[rowIndex] === 1
+}
+
+/**
+ * グローバル検索の一致箇所を取得（表示順・カラム順）
+ *
+ * カラムごとに索引から一致する行を求め、表示位置に変換して並べる。
+ * 計算量は行数×カラム数ではなく一致件数に比例する。
+ *
+ * @param store - カラム単位のデータストア
+ * @param columnIds - 検索対象のカラムID（一致箇所はこの順序で並ぶ）
+ * @param query - 検索文字列（空白のみでないこと）
+ * @param positions - 行インデックス → 表示位置（表示されない行は-1）
+ * @param datetimeMeta - 日時カラムのメタデータ（カラムIDごと）
+ */
+export function findSearchMatches(
+  store: ColumnStore,
+  columnIds: readonly string[],
+  query: string,
+  positions: Int32Array,
+  datetimeMeta?: ReadonlyMap<string, ColumnMeta>,
+): CellPosition[] {
+  const normalizedQuery = normalizeText(query)
+  const matches: { position: number; columnIndex: number }[] = []
+
+  columnIds.forEach((columnId, columnIndex) => {
+    const meta = datetimeMeta?.get(columnId)
+    findMatchingRows(store, columnId, normalizedQuery, meta).forEach(
+      (rowIndex) => {
+        const position = positions[rowIndex]
+        if (position >= 0) matches.push({ position, columnIndex })
+      },
+    )
+  })
+
+  matches.sort(
+    (a, b) => a.position - b.position || a.columnIndex - b.columnIndex,
+  )
+  return matches.map(({ position, columnIndex }) => ({
+    rowIndex: position,
+    columnId: columnIds[columnIndex],
+  }))
+}
+
+/**
+ * 表示順の行インデックスから、行インデックス → 表示位置の配列を作成
+ *
+ * @param rowCount - ストアの行数
+ * @param rowIndices - 表示順の行インデックス
+ */
+export function displayPositions(
+  rowCount: number,
+  rowIndices: ArrayLike<number>,
+): Int32Array {
+  const positions = new Int32Array(rowCount).fill(-1)
+  for (let i = 0; i < rowIndices.length; i++) {
+    positions[rowIndices[i]] = i
+  }
+  return positions
+}
@@ -0,0 +1,122 @@
+/**
+ * 型付き配列のカラム（数値・Bool・日時）
+ * 値を型付き配列、欠損値をビットマップで保持し、セルごとのボックス化を避ける
+ */
+
+import { TypedColumn, TypedColumnType } from '@/types/table'
+
+/**
+ * 空の型付き配列のカラムを作成（全行が欠損値）
+ */
+export function createTypedColumn(
+  type: TypedColumnType,
+  length: number,
+): TypedColumn {
+  return {
+    type,
+    values:
+      type === 'boolean' ? new Uint8Array(length) : new Float64Array(length),
+    validity: new Uint8Array(Math.ceil(length / 8)),
+  }
+}
+
+/**
+ * 行に値があるか（欠損値でないか）
+ */
+export function isValidAt(column: TypedColumn, rowIndex: number): boolean {
+  return ((column.validity[rowIndex >> 3] >> (rowIndex & 7)) & 1) === 1
+}
+
+/**
+ * 行に値があることを記録（値の配列は変更しない）
+ */
+export function markValid(column: TypedColumn, rowIndex: number): void {
+  column.validity[rowIndex >> 3] |= 1 << (rowIndex & 7)
+}
+
+/**
+ * 行の値を設定（null・NaN・数値に変換できない値の場合は欠損値）
+ */
+export function setTypedValue(
+  column: TypedColumn,
+  rowIndex: number,
+  value: unknown,
+): void {
+  const bit = 1 << (rowIndex & 7)
+  const number = value === null || value === undefined ? NaN : Number(value)
+  if (Number.isNaN(number)) {
+    column.values[rowIndex] = 0
+    column.validity[rowIndex >> 3] &= ~bit
+    return
+  }
+  column.values[rowIndex] = number
+  column.validity[rowIndex >> 3] |= bit
+}
+
+/**
+ * 行の値を取得（欠損値はnull、Boolカラムはboolean）
+ */
+export function getTypedValue(
+  column: TypedColumn,
+  rowIndex: number,
+): number | boolean | null {
+  if (!isValidAt(column, rowIndex)) return null
+  const value = column.values[rowIndex]
+  return column.type === 'boolean' ? value === 1 : value
+}
+
+/**
+ * 2行の値を比較（ソート用、欠損値は末尾）
+ */
+export function compareTypedValues(
+  column: TypedColumn,
+  rowA: number,
+  rowB: number,
+): number {
+  const validA = isValidAt(column, rowA)
+  const validB = isValidAt(column, rowB)
+  if (!validA || !validB) {
+    return validA === validB ? 0 : validA ? -1 : 1
+  }
+  return column.values[rowA] - column.values[rowB]
+}
+
+/**
+ * 値の配列から型付き配列のカラムを作成
+ * 欠損値以外がすべて数値（またはすべてboolean）の場合のみ作成し、それ以外はnull
+ */
+export function typedColumnFromValues(
+  values: readonly unknown[],
+): TypedColumn | null {
+  let type: TypedColumnType | null = null
+  for (const value of values) {
+    if (value === null || value === undefined) continue
+    const valueType =
+      typeof value === 'number'
+        ? 'number'
+        : typeof value === 'boolean'
+          ? 'boolean'
+          : null
+    if (valueType === null || (type !== null && valueType !== type)) {
+      return null
+    }
+    type = valueType
+  }
+  if (type === null) return null
+
+  const column = createTypedColumn(type, values.length)
+  values.forEach((value, rowIndex) => setTypedValue(column, rowIndex, value))
+  return column
+}
+
+/**
+ * 数値の配列に変換（Boolは1/0、欠損値はNaN）
+ * 集計など欠損値をNaNとして扱えば済む処理用
+ */
+export function typedColumnNumbers(column: TypedColumn): Float64Array {
+  const numbers = Float64Array.from(column.values)
+  for (let i = 0; i < numbers.length; i++) {
+    if (!isValidAt(column, i)) numbers[i] = NaN
+  }
+  return numbers
+}
@@ -5,9 +5,67 @@
 
 /**
  * テーブルの行データ型
- * Phase 1では任意のキー・値を持つオブジェクト
+ * 値はColumnStoreにカラムごとに保持し、TanStack Tableには行インデックスのみを渡す
  */
-export type RowData = Record<string, unknown>
+export type RowData = number
+
+/**
+ * カラム単位のデータストア（行オブジェクトを生成しない）
+ * 行インデックス0〜topLevelCount-1がDataFrameの行（ウィンドウモードではウィンドウ内の行）、
+ * それ以降が階層データのサブ行
+ */
+export interface ColumnStore {
+  /** 行数（サブ行を含む） */
+  rowCount: number
+  /** トップレベルの行数 */
+  topLevelCount: number
+  /**
+   * カラムIDごとの値の配列（行インデックスでアクセス）
+   * 辞書エンコードされたカラムは辞書のコード（欠損値はnull）
+   * 型付き配列で保持するカラムは含まない
+   */
+  columns: Map<string, unknown[]>
+  /** 型付き配列で保持するカラム（数値・Bool・日時、カラムIDごと） */
+  typedColumns?: Map<string, TypedColumn>
+  /** 辞書エンコードされたカラムの辞書（カラムIDごと） */
+  dictionaries?: Map<string, unknown[]>
+  /**
+   * Pythonで計算したソート用の順位（カラムIDごと、欠損値は-1）
+   * precompute_sort指定時のみ、テキストとして比較するカラムについて届く
+   */
+  sortRanks?: Map<string, Int32Array>
+  /** 各行のサブ行の行インデックス（階層データのみ） */
+  children?: number[][]
+  /**
+   * 各行のサブ行の数（サブ行を遅延読み込みする階層データのみ）
+   * 未読み込みのサブ行も数える（childrenが空でも展開できる）
+   */
+  childCounts?: number[]
+  /** 各行のパス（"3/0"の形式、サブ行を遅延読み込みする階層データのみ） */
+  rowPaths?: string[]
+  /**
+   * 前回のストアの行位置 → このストアの行位置（削除された行は-1）
+   * 差分更新で作られたストアのみ（行選択の位置の引き継ぎに使用）
+   */
+  remapPosition?: (position: number) => number
+}
+
+/**
+ * 型付き配列で保持するカラムの型（日時はエポックミリ秒）
+ */
+export type TypedColumnType = 'number' | 'boolean' | 'datetime'
+
+/**
+ * 型付き配列で保持するカラム
+ * 欠損値の行は値を0とし、ビットマップで区別する
+ */
+export interface TypedColumn {
+  type: TypedColumnType
+  /** 値（BoolカラムはUint8Array（0/1）、それ以外はFloat64Array） */
+  values: Float64Array | Uint8Array
+  /** 値がある行のビットマップ（行iはバイトi>>3のビットi&7、1なら値あり） */
+  validity: Uint8Array
+}
 
 /**
  * カラム定義の基本型
@@ -28,6 +86,55 @@ export interface ColumnConfig {
   prefix?: string
   /** セル値の後に表示する文字列（例: "%", " USD"） */
   suffix?: string
+  /**
+   * 集計行の集計方法（未指定の場合は数値カラムが合計、BoolカラムがTrue率、
+   * その他は空白）
+   */
+  aggregate?: SummaryAggregate
+  /** カラムのメタデータ（Python側でdtypeから計算） */
+  meta?: ColumnMeta
+}
+
+/**
+ * 集計行の集計方法
+ * - sum: 合計 / mean: 平均 / min: 最小値 / max: 最大値（数値・日時・Boolカラム）
+ * - count: 欠損値でない値の数 / distinct: ユニーク値の数（全カラム）
+ * - none: 集計しない
+ */
+export type SummaryAggregate =
+  | 'sum'
+  | 'mean'
+  | 'min'
+  | 'max'
+  | 'count'
+  | 'distinct'
+  | 'none'
+
+/**
+ * カラムのメタデータ
+ * Python側でpandasのdtypeから計算され、ブラウザでの全行走査を不要にする
+ */
+export interface ColumnMeta {
+  /** 論理型（datetimeはエポックミリ秒の数値として届く） */
+  type: 'number' | 'boolean' | 'datetime' | 'string' | 'empty' | 'other'
+  /** 自動判定されたフィルタタイプ */
+  filterType: ColumnType
+  /** 欠損値を含むか */
+  nullable: boolean
+  /** ユニーク値の数（ハッシュできない値の場合はnull） */
+  cardinality: number | null
+  /** 最小値（数値・日時カラムのみ） */
+  min?: number
+  /** 最大値（数値・日時カラムのみ） */
+  max?: number
+  /** ソート済みのユニーク値（テキスト・セレクトフィルタで10個以下の場合のみ） */
+  values?: string[]
+  /** pandasのdtype（datetime64カラムのみ、例: "datetime64[ns, Asia/Tokyo]"） */
+  dtype?: string
+  /** タイムゾーン（datetime64カラムのみ、タイムゾーンなしの場合はnull） */
+  timezone?: string | null
+  /** すべての値の時刻が0時か（datetime64カラムのみ、日付のみで表示する） */
+  dateOnly?: boolean
 }
 
 /**
@@ -78,8 +185,8 @@ export interface ColumnGroup {
  * Streamlitから受け取るProps
  */
 export interface StreamlitProps {
-  /** テーブルに表示するデータ（行の配列） */
-  data: RowData[]
+  /** テーブルに表示するデータ（カラム単位のストア） */
+  data: ColumnStore
   /** カラム設定の配列 */
   columns: ColumnConfig[]
   /** テーブルの高さ（px）、未指定時は自動調整 */
@@ -88,6 +195,8 @@ export interface StreamlitProps {
   useContainerWidth?: boolean
   /** 行選択モード: 'single-row' | 'multi-row' | undefined */
   selectionMode?: 'single-row' | 'multi-row'
+  /** 選択を区間の配列で返すか（デフォルト: false） */
+  selectionRanges?: boolean
   /** フィルタ適用時の行数表示を有効化するか（デフォルト: false） */
   showRowCount?: boolean
   /** 表示するカラム名のリスト（順序も反映） */
@@ -96,10 +205,56 @@ export interface StreamlitProps {
   headerGroups?: ColumnGroup[]
   /** 行展開機能を有効化するか（デフォルト: false） */
   expandable?: boolean
-  /** サブ行データのキー名（デフォルト: 'subRows'） */
-  subRowsKey?: string
   /** サマリー行の表示を有効化するか（デフォルト: true） */
   showSummary?: boolean
+  /** ウィンドウあたりの行数（指定時はウィンドウモード） */
+  windowSize?: number
+  /** ソート・フィルタ後の行数（ウィンドウモード時のみ） */
+  rowCount?: number
+  /** DataFrame全体の行数（ウィンドウモード時のみ） */
+  totalRowCount?: number
+  /** 受け取ったウィンドウの先頭行の位置（ウィンドウモード時のみ） */
+  rowOffset?: number
+  /** ウィンドウの各行の元のDataFrameでの位置（ソート・フィルタ時のみ） */
+  rowPositions?: number[]
+  /** Python側で計算したサマリー行の値（ウィンドウモード時のみ） */
+  summary?: Record<string, string | number>
+  /** フィルタ・ソート・グローバル検索をWeb Workerで計算するか（デフォルト: false） */
+  useWorker?: boolean
+}
+
+/**
+ * Streamlitへ返すコンポーネントの値
+ */
+export interface ComponentValue {
+  /** 選択された行のインデックス（元のDataFrameの位置） */
+  selection: number[]
+  /** 選択された行の区間 [開始, 終了)（区間で返す場合のみ、昇順） */
+  selection_ranges?: [number, number][]
+  /** 要求するウィンドウ（ウィンドウモード時のみ） */
+  window?: {
+    /** ウィンドウの先頭行の位置 */
+    offset: number
+  }
+  /** ソート状態（ウィンドウモード時のみ、Python側で適用） */
+  sorting?: { id: string; desc: boolean }[]
+  /** カラムフィルタの値（ウィンドウモード時のみ、Python側で適用） */
+  filters?: { id: string; value: unknown }[]
+  /**
+   * 全データの再送要求（差分更新時のみ）
+   * 差分の基準となるデータを持っていない場合に新しい値を送る
+   */
+  resync?: number
+  /**
+   * サブ行を要求する行（サブ行の遅延読み込み時のみ）
+   * 同じ行を再度要求する場合もPythonが再実行されるよう、要求時刻を含める
+   */
+  expand?: {
+    /** 行のパス（トップレベルの行の位置、以降は各階層でのサブ行の位置） */
+    path: number[]
+    /** 要求時刻 */
+    requested: number
+  }
 }
 
 /**
@@ -0,0 +1,30 @@
+/**
+ * テーブルエンジンのWeb Worker
+ * データを保持し、問い合わせごとにフィルタ・ソート・検索の結果（行インデックス）を返す
+ */
+
+import { EngineRequest, EngineResponse, runQuery } from '@/lib/tableEngine'
+import { ColumnStore } from '@/types/table'
+
+let store: ColumnStore | null = null
+
+self.onmessage = (event: MessageEvent<EngineRequest>) => {
+  const request = event.data
+
+  if (request.type === 'load') {
+    store = request.store
+    return
+  }
+
+  if (!store) return
+  const result = runQuery(store, request.query)
+  const response: EngineResponse = { id: request.id, result }
+  // 結果の配列はコピーせずに転送
+  self.postMessage(response, {
+    transfer: [
+      result.rowIndices.buffer,
+      result.matchRows.buffer,
+      result.matchColumns.buffer,
+    ],
+  })
+}